@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Offline analytics over the orchestrator event log
+Loads events, agent status changes, phase_timeline and agents from
+orchestrator.db in chunks into columnar NumPy arrays with categorical
+codes, and answers dwell-time, status-transition and throughput questions
+with vectorized operations. The columns are cached next to the database
+as .npy files; later runs read only events appended since (or nothing,
+if the database file is unchanged).
+
+Requires NumPy (pip install numpy).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # the orchestrator itself never needs it
+    np = None
+
+from event_codec import decode_fields
+
+CACHE_VERSION = 1
+CHUNK_ROWS = 50_000
+
+# Events whose payload sets an agent's status
+STATUS_EVENTS = ("AGENT_UPDATED", "JOB_COMPLETED")
+# Project-level event that resets its "agents" to IN_PROGRESS
+PHASE_TRANSITION = "PHASE_TRANSITION"
+PHASE_START_STATUS = "IN_PROGRESS"
+COMPLETED = "COMPLETED"
+
+# Column name -> dtype, per cached table
+TABLES = {
+    "events": {"id": "int64", "project": "int32", "agent": "int32", "type": "int32", "ts": "int64"},
+    # One row per status change: from status events, plus one per agent a
+    # phase transition resets
+    "status": {"event": "int64", "project": "int32", "agent": "int32", "status": "int32", "ts": "int64"},
+    "timeline": {"project": "int32", "phase": "int32", "start": "float64", "end": "float64"},
+    "agents": {"project": "int32", "agent": "int32", "status": "int32",
+               "todos_completed": "int64", "todos_total": "int64"},
+}
+CATEGORIES = ("agent", "type", "status")
+
+
+class AnalyticsError(Exception):
+    """Raised when analytics cannot run (no NumPy, unreadable database)"""
+    pass
+
+
+def _require_numpy():
+    if np is None:
+        raise AnalyticsError("analytics needs NumPy: pip install numpy")
+
+
+def _epoch(iso: Optional[str]) -> float:
+    """Timeline timestamps are naive local isoformat() strings"""
+    if not iso:
+        return float("nan")
+    try:
+        return datetime.fromisoformat(iso).timestamp()
+    except ValueError:
+        return float("nan")
+
+
+class Categories:
+    """Categorical codes: names[code] == name"""
+
+    def __init__(self, names: Optional[List[str]] = None):
+        self.names: List[str] = list(names or [])
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def code(self, name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        code = self.index.get(name)
+        if code is None:
+            code = self.index[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+class _Columns:
+    """Growable set of equally long columns, filled chunk by chunk"""
+
+    def __init__(self, dtypes: Dict[str, str]):
+        self.dtypes = dtypes
+        self.chunks: Dict[str, List] = {name: [] for name in dtypes}
+
+    def append(self, **arrays):
+        for name, dtype in self.dtypes.items():
+            self.chunks[name].append(np.asarray(arrays[name], dtype=dtype))
+
+    def build(self, base: Optional[Dict] = None) -> Dict:
+        columns = {}
+        for name, dtype in self.dtypes.items():
+            parts = ([base[name]] if base is not None else []) + self.chunks[name]
+            columns[name] = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        return columns
+
+
+# ----------------------------------------------------------------------------
+# Loading and caching
+# ----------------------------------------------------------------------------
+
+def _fingerprint(db_path: Path) -> List[int]:
+    """Changes whenever the database (or its write-ahead log) is written"""
+    parts = []
+    for path in (db_path, db_path.with_name(db_path.name + "-wal")):
+        try:
+            st = path.stat()
+        except OSError:
+            parts += [0, 0]
+            continue
+        parts += [st.st_mtime_ns, st.st_size]
+    return parts
+
+
+class EventAnalytics:
+    """Columnar view of one orchestrator database"""
+
+    def __init__(self, db_path: str = "orchestrator.db", cache_dir: Optional[str] = None):
+        _require_numpy()
+        self.db_path = Path(db_path)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.db_path.with_name(f".{self.db_path.stem}.analytics")
+        self.tables: Dict[str, Dict] = {}
+        self.categories: Dict[str, Categories] = {name: Categories() for name in CATEGORIES}
+        # How the last load() went: "cached", "incremental" or "full"
+        self.load_mode = ""
+        self.load_seconds = 0.0
+
+    # -- cache ---------------------------------------------------------------
+
+    def _read_cache(self) -> Optional[Dict]:
+        try:
+            meta = json.loads((self.cache_dir / "meta.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if meta.get("version") != CACHE_VERSION or meta.get("db") != str(self.db_path.resolve()):
+            return None
+        try:
+            for table, dtypes in TABLES.items():
+                columns = {name: np.load(self.cache_dir / f"{table}.{name}.npy", mmap_mode="r")
+                           for name in dtypes}
+                if any(len(column) != meta["rows"][table] for column in columns.values()):
+                    return None
+                self.tables[table] = columns
+        except (OSError, ValueError, KeyError):
+            return None
+        self.categories = {name: Categories(meta["categories"][name]) for name in CATEGORIES}
+        return meta
+
+    def _write_cache(self, meta: Dict):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / "meta.json").unlink(missing_ok=True)  # invalid until rewritten
+        for table, columns in self.tables.items():
+            for name, column in columns.items():
+                target = self.cache_dir / f"{table}.{name}.npy"
+                tmp = target.with_name(target.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, np.ascontiguousarray(column))
+                os.replace(tmp, target)
+        meta = dict(meta, version=CACHE_VERSION, db=str(self.db_path.resolve()),
+                    rows={table: len(next(iter(columns.values()))) for table, columns in self.tables.items()},
+                    categories={name: cats.names for name, cats in self.categories.items()})
+        tmp = self.cache_dir / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.cache_dir / "meta.json")
+
+    # -- scanning ------------------------------------------------------------
+
+    def load(self, refresh: bool = False) -> "EventAnalytics":
+        """Fill the columns from the cache, scanning only what it lacks"""
+        start = time.perf_counter()
+        if not self.db_path.exists():
+            raise AnalyticsError(f"Database not found: {self.db_path}")
+        fingerprint = _fingerprint(self.db_path)
+        meta = None if refresh else self._read_cache()
+        if meta is not None and meta["fingerprint"] == fingerprint:
+            self.load_mode = "cached"
+            self.load_seconds = time.perf_counter() - start
+            return self
+
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, isolation_level=None)
+        try:
+            conn.execute("BEGIN")  # one snapshot for symbols, events and the small tables
+            symbols = self._symbols(conn)
+            max_id, count = conn.execute("SELECT COALESCE(MAX(id), 0), COUNT(*) FROM events").fetchone()
+            # The event log is append-only, so a cache is extended unless
+            # rows it holds have gone (e.g. the project was deleted)
+            base = None
+            after_id = 0
+            if meta is not None:
+                new = conn.execute("SELECT COUNT(*) FROM events WHERE id > ?", (meta["max_event_id"],)).fetchone()[0]
+                if meta["max_event_id"] <= max_id and meta["rows"]["events"] + new == count:
+                    base = {table: {name: np.asarray(column) for name, column in self.tables[table].items()}
+                            for table in ("events", "status")}
+                    after_id = meta["max_event_id"]
+            if base is None:
+                self.categories = {name: Categories() for name in CATEGORIES}
+            self._scan_events(conn, symbols, after_id, base)
+            self._scan_timeline(conn)
+            self._scan_agents(conn)
+        except sqlite3.Error as e:
+            raise AnalyticsError(f"Cannot read {self.db_path}: {e}")
+        finally:
+            conn.close()
+
+        self.load_mode = "full" if after_id == 0 else "incremental"
+        self._write_cache({"fingerprint": fingerprint, "max_event_id": max_id})
+        self.load_seconds = time.perf_counter() - start
+        return self
+
+    @staticmethod
+    def _symbols(conn) -> List[str]:
+        rows = conn.execute("SELECT id, name FROM event_symbols").fetchall()
+        names = [""] * (max((row[0] for row in rows), default=0) + 1)
+        for symbol, name in rows:
+            names[symbol] = name
+        return names
+
+    def _symbol_codes(self, category: str, symbol_ids, symbols: List[str]):
+        """Vectorized symbol ID -> categorical code (0 / NULL -> -1)"""
+        cats = self.categories[category]
+        unique, inverse = np.unique(symbol_ids, return_inverse=True)
+        lookup = np.array([cats.code(symbols[s]) if s > 0 else -1 for s in unique.tolist()], dtype=np.int32)
+        return lookup[inverse]
+
+    def _scan_events(self, conn, symbols: List[str], after_id: int, base: Optional[Dict]):
+        symbol_index = {name: i for i, name in enumerate(symbols) if name}
+        status_types = [symbol_index[t] for t in STATUS_EVENTS if t in symbol_index]
+        transition_type = symbol_index.get(PHASE_TRANSITION, -1)
+        wanted = status_types + [transition_type]
+        symbol_name = symbols.__getitem__
+        agents, statuses = self.categories["agent"], self.categories["status"]
+
+        events = _Columns(TABLES["events"])
+        changes = _Columns(TABLES["status"])
+        # Payloads are only fetched (and decoded) for the few event types
+        # that carry a status
+        cursor = conn.execute(f"""
+            SELECT id, project_id, COALESCE(agent_id, 0), type_id, ts,
+                   CASE WHEN type_id IN ({",".join("?" * len(wanted))}) THEN data END
+            FROM events WHERE id > ? ORDER BY id
+        """, (*wanted, after_id))
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            ids, projects, agent_ids, type_ids, stamps, payloads = zip(*rows)
+            agent_codes = self._symbol_codes("agent", np.array(agent_ids, dtype=np.int64), symbols)
+            events.append(id=ids, project=projects, agent=agent_codes,
+                          type=self._symbol_codes("type", np.array(type_ids, dtype=np.int64), symbols),
+                          ts=stamps)
+
+            change_rows = []
+            for i, payload in enumerate(payloads):
+                if payload is None:
+                    continue
+                try:
+                    data = decode_fields(payload, symbol_name)
+                except (ValueError, IndexError):
+                    continue
+                if not isinstance(data, dict):
+                    continue
+                if type_ids[i] == transition_type:
+                    for name in data.get("agents") or ():
+                        change_rows.append((ids[i], projects[i], agents.code(name),
+                                            statuses.code(PHASE_START_STATUS), stamps[i]))
+                elif isinstance(data.get("status"), str) and agent_codes[i] >= 0:
+                    change_rows.append((ids[i], projects[i], int(agent_codes[i]),
+                                        statuses.code(data["status"]), stamps[i]))
+            if change_rows:
+                event, project, agent, status, ts = zip(*change_rows)
+                changes.append(event=event, project=project, agent=agent, status=status, ts=ts)
+
+        self.tables["events"] = events.build(base["events"] if base else None)
+        self.tables["status"] = changes.build(base["status"] if base else None)
+
+    def _scan_timeline(self, conn):
+        timeline = _Columns(TABLES["timeline"])
+        cursor = conn.execute("SELECT project_id, phase_number, started_at, completed_at FROM phase_timeline")
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            projects, phases, started, completed = zip(*rows)
+            timeline.append(project=projects, phase=phases,
+                            start=[_epoch(s) for s in started], end=[_epoch(c) for c in completed])
+        self.tables["timeline"] = timeline.build()
+
+    def _scan_agents(self, conn):
+        agents = _Columns(TABLES["agents"])
+        names, statuses = self.categories["agent"], self.categories["status"]
+        cursor = conn.execute("""
+            SELECT project_id, name, status, COALESCE(todos_completed, 0), COALESCE(todos_total, 0)
+            FROM agents
+        """)
+        while True:
+            rows = cursor.fetchmany(CHUNK_ROWS)
+            if not rows:
+                break
+            projects, agent_names, status_names, completed, total = zip(*rows)
+            agents.append(project=projects, agent=[names.code(n) for n in agent_names],
+                          status=[statuses.code(s) for s in status_names],
+                          todos_completed=completed, todos_total=total)
+        self.tables["agents"] = agents.build()
+
+    # -- queries -------------------------------------------------------------
+
+    def _intervals(self):
+        """Closed status intervals: (project, agent, status, next_status, start, seconds)
+
+        An agent's status holds from one status change to its next; the
+        current (open) status of each agent is not counted.
+        """
+        s = self.tables["status"]
+        order = np.lexsort((s["event"], s["ts"], s["agent"], s["project"]))
+        project, agent = s["project"][order], s["agent"][order]
+        status, ts = s["status"][order], s["ts"][order]
+        same = (project[1:] == project[:-1]) & (agent[1:] == agent[:-1])
+        return (project[:-1][same], agent[:-1][same], status[:-1][same], status[1:][same],
+                ts[:-1][same], (ts[1:] - ts[:-1])[same])
+
+    def phase_at(self, project, ts):
+        """Phase each (project, ts) fell in per phase_timeline; -1 if none"""
+        t = self.tables["timeline"]
+        started = ~np.isnan(t["start"])
+        tl_project, tl_phase, tl_start = t["project"][started], t["phase"][started], t["start"][started]
+        order = np.lexsort((tl_start, tl_project))
+        tl_project, tl_phase, tl_start = tl_project[order], tl_phase[order], tl_start[order]
+        # Search (project, start) pairs as one sorted key per project block
+        offset = float(max(np.max(tl_start, initial=0), np.max(ts, initial=0))) + 1.0
+        keys = tl_project * offset + tl_start
+        idx = np.searchsorted(keys, project * offset + ts, side="right") - 1
+        found = idx >= 0
+        found[found] &= tl_project[idx[found]] == project[found]
+        phases = np.full(len(ts), -1, dtype=np.int32)
+        phases[found] = tl_phase[idx[found]]
+        return phases
+
+    def dwell_times(self, status: Optional[str] = None) -> Dict[int, Dict[str, Dict]]:
+        """{phase: {status: {intervals, total_minutes, mean_minutes, p90_minutes}}}
+
+        Time an agent spends in a status, attributed to the phase in which
+        the status was entered. Phase -1 collects changes outside any
+        recorded phase.
+        """
+        project, agent, state, _, start, seconds = self._intervals()
+        if status is not None:
+            code = self.categories["status"].index.get(status)
+            keep = state == code
+            project, state, start, seconds = project[keep], state[keep], start[keep], seconds[keep]
+        phase = self.phase_at(project, start)
+        n_status = max(len(self.categories["status"]), 1)
+        phases = np.unique(phase)
+        group = np.searchsorted(phases, phase) * n_status + state
+        counts = np.bincount(group, minlength=len(phases) * n_status)
+        totals = np.bincount(group, weights=seconds, minlength=len(phases) * n_status)
+        # p90 per group: sort by (group, seconds) and index into each block
+        order = np.lexsort((seconds, group))
+        sorted_seconds = seconds[order]
+        ends = np.cumsum(counts)
+        result: Dict[int, Dict[str, Dict]] = {}
+        for g in np.flatnonzero(counts).tolist():
+            first = ends[g] - counts[g]
+            p90 = sorted_seconds[first + int(np.ceil(0.9 * counts[g])) - 1]
+            result.setdefault(int(phases[g // n_status]), {})[self.categories["status"].names[g % n_status]] = {
+                "intervals": int(counts[g]),
+                "total_minutes": float(totals[g]) / 60,
+                "mean_minutes": float(totals[g]) / counts[g] / 60,
+                "p90_minutes": float(p90) / 60,
+            }
+        return result
+
+    def transition_matrix(self, phase: Optional[int] = None) -> Tuple[List[str], "np.ndarray"]:
+        """(status names, counts[from, to]) of status changes, optionally in one phase"""
+        project, _, state, next_state, start, _ = self._intervals()
+        if phase is not None:
+            keep = self.phase_at(project, start) == phase
+            state, next_state = state[keep], next_state[keep]
+        changed = state != next_state
+        n = len(self.categories["status"])
+        counts = np.bincount(state[changed] * n + next_state[changed], minlength=n * n).reshape(n, n)
+        return list(self.categories["status"].names), counts
+
+    def agent_throughput(self) -> Dict[str, Dict]:
+        """Per agent name, across projects: events, status changes, completions,
+        active time (first to last event per project) and completions per day"""
+        names = self.categories["agent"].names
+        n = len(names)
+        e = self.tables["events"]
+        has_agent = e["agent"] >= 0
+        agent, project, ts = e["agent"][has_agent], e["project"][has_agent], e["ts"][has_agent]
+        events = np.bincount(agent, minlength=n)
+
+        # Active span per (project, agent) pair, summed per agent
+        pair = project.astype(np.int64) * n + agent
+        pairs, inverse = np.unique(pair, return_inverse=True)
+        first = np.full(len(pairs), np.iinfo(np.int64).max)
+        last = np.full(len(pairs), np.iinfo(np.int64).min)
+        np.minimum.at(first, inverse, ts)
+        np.maximum.at(last, inverse, ts)
+        active = np.bincount(pairs % n, weights=(last - first), minlength=n)
+
+        s = self.tables["status"]
+        changes = np.bincount(s["agent"], minlength=n)
+        completed_code = self.categories["status"].index.get(COMPLETED, -1)
+        completions = np.bincount(s["agent"][s["status"] == completed_code], minlength=n)
+
+        a = self.tables["agents"]
+        todos = np.bincount(a["agent"], weights=a["todos_completed"], minlength=n)
+
+        result = {}
+        for code in np.flatnonzero(events + changes + todos).tolist():
+            days = active[code] / 86400
+            result[names[code]] = {
+                "events": int(events[code]),
+                "status_changes": int(changes[code]),
+                "completions": int(completions[code]),
+                "todos_completed": int(todos[code]),
+                "active_hours": float(active[code]) / 3600,
+                "completions_per_day": float(completions[code] / days) if days > 0 else None,
+            }
+        return result
+
+
+# ----------------------------------------------------------------------------
+# CLI
+# ----------------------------------------------------------------------------
+
+def _print_dwell(result: Dict[int, Dict[str, Dict]]):
+    print(f"  {'phase':>5} {'status':<14} {'intervals':>9} {'mean':>10} {'p90':>10} {'total':>12}")
+    for phase in sorted(result):
+        for status, stats in sorted(result[phase].items()):
+            print(f"  {phase if phase >= 0 else '-':>5} {status:<14} {stats['intervals']:>9} "
+                  f"{stats['mean_minutes']:>9.1f}m {stats['p90_minutes']:>9.1f}m {stats['total_minutes'] / 60:>11.1f}h")
+
+
+def _print_transitions(names: List[str], counts):
+    width = max([len(n) for n in names] + [6])
+    print("  " + " " * width + " -> " + " ".join(f"{n[:width]:>{width}}" for n in names))
+    for i, name in enumerate(names):
+        print(f"  {name:<{width}}    " + " ".join(f"{int(c):>{width}}" for c in counts[i]))
+
+
+def _print_throughput(result: Dict[str, Dict]):
+    print(f"  {'agent':<14} {'events':>8} {'changes':>8} {'completed':>9} {'todos':>7} {'active':>9} {'per day':>8}")
+    for agent, stats in sorted(result.items()):
+        rate = f"{stats['completions_per_day']:.2f}" if stats["completions_per_day"] is not None else "-"
+        print(f"  {agent:<14} {stats['events']:>8} {stats['status_changes']:>8} {stats['completions']:>9} "
+              f"{stats['todos_completed']:>7} {stats['active_hours']:>8.1f}h {rate:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized analytics over the orchestrator event log")
+    parser.add_argument("query", choices=["dwell", "transitions", "throughput"])
+    parser.add_argument("--db", default="orchestrator.db", help="Database path (default: orchestrator.db)")
+    parser.add_argument("--status", help="dwell: only this status (e.g. BLOCKED)")
+    parser.add_argument("--phase", type=int, help="transitions: only changes within this phase")
+    parser.add_argument("--refresh", action="store_true", help="Rebuild the column cache from scratch")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args()
+
+    try:
+        analytics = EventAnalytics(args.db).load(refresh=args.refresh)
+    except AnalyticsError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args.query == "dwell":
+        result = analytics.dwell_times(args.status)
+    elif args.query == "transitions":
+        names, counts = analytics.transition_matrix(args.phase)
+        result = {"statuses": names, "counts": counts.tolist()}
+    else:
+        result = analytics.agent_throughput()
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    rows = len(analytics.tables["events"]["id"])
+    print(f"📊 {rows} events ({analytics.load_mode} load, {analytics.load_seconds:.2f}s)\n")
+    if args.query == "dwell":
+        _print_dwell(result)
+    elif args.query == "transitions":
+        _print_transitions(result["statuses"], counts)
+    else:
+        _print_throughput(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Content-addressed artifact store
+Keeps agent outputs under .artifacts/objects by sha256, deduplicating
+identical blobs across phases and reruns, and places them in the tree by
+reflink, hardlink or copy. File digests are memoized by stat fingerprint,
+so "is this still the locked spec?" is a stat and a dictionary lookup.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from validation_cache import RACY_WINDOW_NS
+
+try:
+    import fcntl
+except ImportError:  # Windows: no reflinks
+    fcntl = None
+
+STORE_DIR = ".artifacts"
+INDEX_VERSION = 1
+CHUNK_SIZE = 1 << 20
+
+# Placement methods in order of preference
+PLACE_METHODS = ("reflink", "hardlink", "copy")
+
+# linux/fs.h: clone a whole file (btrfs, XFS, bcachefs, overlayfs on those)
+FICLONE = 0x40049409
+
+# Phase 2 locks the architect's contract as the master spec
+SPEC_SOURCE = "agents/architect/output/api.openapi.yaml"
+SPEC_LOCKED = "specs/api.openapi.yaml"
+SPEC_REF = "spec"
+
+# [st_ino, st_mtime_ns, st_size]
+Fingerprint = List[int]
+
+
+class ArtifactError(Exception):
+    """Raised when an artifact cannot be stored or placed"""
+    pass
+
+
+def _fingerprint(st: os.stat_result) -> Fingerprint:
+    return [st.st_ino, st.st_mtime_ns, st.st_size]
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    """Copy-on-write clone of src at dst; False if the filesystem can't"""
+    if fcntl is None:
+        return False
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            return True
+        except OSError:
+            return False
+
+
+def hash_file(path: Path) -> Tuple[str, int]:
+    """(sha256 hex digest, size) of a file, read in chunks"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ArtifactStore:
+    """Blobs under <project>/.artifacts/objects/<2 hex>/<sha256>
+
+    Objects are read-only. A hardlinked placement shares the object's inode,
+    so it is read-only too; re-placing goes through a rename and never
+    writes into an object. Refs (e.g. the locked spec) are one file each
+    under refs/, written atomically so concurrent processes can't lose them.
+    """
+
+    def __init__(self, project_root: str = ".", store_dir: str = STORE_DIR):
+        self.project_root = Path(project_root)
+        self.root = self.project_root / store_dir
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._dirty = False
+        # project-relative path -> fingerprint + [digest]
+        self._files: Dict[str, List] = {}
+        try:
+            data = json.loads(self.index_path.read_text())
+            if data.get("version") == INDEX_VERSION:
+                self._files = data.get("files", {})
+        except (OSError, ValueError):
+            pass
+
+    # ------------------------------------------------------------------
+    # Digests
+    # ------------------------------------------------------------------
+
+    def _remember(self, rel: str, st: os.stat_result, digest: str):
+        # Writes within the racy window may not have moved the mtime yet
+        if st.st_mtime_ns >= time.time_ns() - RACY_WINDOW_NS:
+            return
+        entry = _fingerprint(st) + [digest]
+        with self._lock:
+            if self._files.get(rel) != entry:
+                self._files[rel] = entry
+                self._dirty = True
+
+    def digest(self, rel: str, st: Optional[os.stat_result] = None) -> Optional[str]:
+        """Content digest of a project file (None if missing), hashed only
+        when its stat fingerprint changed"""
+        path = self.project_root / rel
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        entry = self._files.get(rel)
+        if entry is not None and entry[:3] == _fingerprint(st):
+            return entry[3]
+        digest, _ = hash_file(path)
+        self._remember(rel, st, digest)
+        return digest
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+
+    def has(self, digest: str) -> bool:
+        """Whether an intact object exists
+
+        Hardlinked placements share the object's inode, so a privileged
+        in-place edit of one changes the object's stat and gets it re-hashed.
+        """
+        path = self.object_path(digest)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return self.digest(path.relative_to(self.project_root).as_posix(), st) == digest
+
+    def put(self, rel: str) -> Tuple[str, int]:
+        """Store a project file; returns (digest, size). Identical content
+        is stored once."""
+        path = self.project_root / rel
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            raise ArtifactError(f"Cannot store {rel}: {e.strerror}")
+        digest = self.digest(rel, st)
+        if self.has(digest):
+            return digest, st.st_size
+
+        target = self.object_path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            if not _reflink(path, tmp):
+                shutil.copyfile(path, tmp)
+            # The source may have changed since it was hashed: name the
+            # object after what was actually captured
+            captured, size = hash_file(tmp)
+            if captured != digest:
+                digest, target = captured, self.object_path(captured)
+                target.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(tmp, 0o444)
+            os.replace(tmp, target)
+        except OSError as e:
+            raise ArtifactError(f"Cannot store {rel}: {e}")
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return digest, size
+
+    def place(self, digest: str, rel: str, methods: Iterable[str] = PLACE_METHODS) -> str:
+        """Materialize an object at a project path; returns the method used"""
+        source = self.object_path(digest)
+        if not self.has(digest):
+            raise ArtifactError(f"Unknown or damaged artifact {digest[:12]}")
+        target = self.project_root / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        for method in methods:
+            try:
+                if method == "reflink":
+                    if not _reflink(source, tmp):
+                        continue
+                elif method == "hardlink":
+                    os.link(source, tmp)
+                else:
+                    shutil.copyfile(source, tmp)
+                os.replace(tmp, target)
+            except OSError:
+                continue
+            finally:
+                if tmp.exists():
+                    tmp.unlink()
+            self._remember(rel, os.stat(target), digest)
+            return method
+        raise ArtifactError(f"Cannot place {digest[:12]} at {rel}")
+
+    # ------------------------------------------------------------------
+    # Refs
+    # ------------------------------------------------------------------
+
+    def ref(self, name: str) -> Optional[str]:
+        try:
+            return (self.root / "refs" / name).read_text().strip() or None
+        except OSError:
+            return None
+
+    def set_ref(self, name: str, digest: str):
+        path = self.root / "refs" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{name}.{os.getpid()}.tmp")
+        tmp.write_text(digest + "\n")
+        os.replace(tmp, path)
+
+    def save(self):
+        """Atomically persist the digest index if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"version": INDEX_VERSION, "files": self._files})
+            self._dirty = False
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(payload)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            # Read-only checkout: digests are just recomputed next time
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+
+def store_tree(store: ArtifactStore, rel_dir: str) -> Dict[str, Tuple[str, int]]:
+    """Store every file below a project directory; {rel: (digest, size)}"""
+    stored = {}
+    base = store.project_root / rel_dir
+    for dirpath, dirnames, filenames in os.walk(base):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            rel = Path(dirpath, name).relative_to(store.project_root).as_posix()
+            stored[rel] = store.put(rel)
+    return stored
+
+
+def lock_spec(store: ArtifactStore, methods: Iterable[str] = PLACE_METHODS) -> Tuple[str, int, str]:
+    """Lock the architect's spec as the master contract
+
+    Returns (digest, size, placement method). The digest is kept as the
+    'spec' ref, so later lock checks compare hashes instead of documents.
+    """
+    digest, size = store.put(SPEC_SOURCE)
+    method = store.place(digest, SPEC_LOCKED, methods)
+    store.set_ref(SPEC_REF, digest)
+    store.save()
+    return digest, size, method
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for orchestrator storage, phase validators and CLI startup
+Writes results as JSON and compares them against a stored baseline
+"""
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from database import Database
+
+REPO_ROOT = Path(__file__).resolve().parent
+
+SCALES = {
+    "smoke": {"projects": 50, "events": 10_000, "tree_files": 1_000, "iterations": 50, "validator_runs": 3},
+    "realistic": {"projects": 1_000, "events": 500_000, "tree_files": 10_000, "iterations": 200, "validator_runs": 5},
+    "extreme": {"projects": 10_000, "events": 10_000_000, "tree_files": 100_000, "iterations": 200, "validator_runs": 3},
+}
+
+AGENTS = ["architect", "planner", "backend", "frontend", "qa", "devops", "docs"]
+STATUSES = ["READY", "IN_PROGRESS", "BLOCKED", "COMPLETED"]
+EVENT_TYPES = ["AGENT_UPDATED", "AGENT_UPDATED", "AGENT_UPDATED", "PHASE_TRANSITION", "PROJECT_CREATED"]
+SEED_BATCH = 50_000
+
+
+# ----------------------------------------------------------------------------
+# Timing helpers
+# ----------------------------------------------------------------------------
+
+def summarize(samples: List[float]) -> Dict:
+    """Latency statistics (milliseconds) for a list of durations in seconds"""
+    ordered = sorted(samples)
+    n = len(ordered)
+    total = sum(ordered)
+    return {
+        "runs": n,
+        "min_ms": ordered[0] * 1000,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p90_ms": ordered[min(n - 1, int(n * 0.9))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "mean_ms": total / n * 1000,
+        "ops_per_sec": n / total if total else 0.0,
+    }
+
+
+def time_op(func: Callable[[int], None], iterations: int) -> Dict:
+    """Run func(i) iterations times and summarize per-call latency"""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+# ----------------------------------------------------------------------------
+# Database seeding
+# ----------------------------------------------------------------------------
+
+def seed_database(db_path: Path, projects: int, events: int, rng: random.Random) -> Database:
+    """Bulk-load a database with synthetic projects, agents, timelines and events"""
+    db = Database(str(db_path))
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    base = datetime(2024, 1, 1)
+
+    conn.executemany(
+        "INSERT INTO projects (id, name, version, current_phase, status, started_at, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((pid, f"Project {pid}", "1.0.0", rng.randint(1, 6), "IN_PROGRESS",
+          (base + timedelta(minutes=pid)).isoformat(), (base + timedelta(minutes=pid)).isoformat())
+         for pid in range(1, projects + 1))
+    )
+    conn.executemany(
+        "INSERT INTO agents (project_id, name, phase, status, progress, todos_completed, todos_total) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((pid, agent, "WAITING", rng.choice(STATUSES), f"{rng.randint(0, 100)}%", rng.randint(0, 40), 40)
+         for pid in range(1, projects + 1) for agent in AGENTS)
+    )
+    conn.executemany(
+        "INSERT INTO phase_timeline (project_id, phase_number, started_at, completed_at, duration_minutes) "
+        "VALUES (?, ?, ?, ?, ?)",
+        ((pid, phase, base.isoformat(), (base + timedelta(minutes=30 * phase)).isoformat(), 30 * phase)
+         for pid in range(1, projects + 1) for phase in range(1, 4))
+    )
+    conn.commit()
+
+    # Every symbol the payloads use is committed up front, so encoding below
+    # never has to create one inside the bulk-load transaction
+    db.intern_symbols(AGENTS + EVENT_TYPES + STATUSES + [
+        "EXECUTING", "phase", "status", "progress", "todos_completed", "todos_total", "updated_at", "last_update"])
+    cursor = conn.cursor()
+    epoch = base.replace(tzinfo=timezone.utc).timestamp()
+
+    def event_rows(start: int, count: int):
+        for i in range(start, start + count):
+            ts = base + timedelta(seconds=i)
+            agent = rng.choice(AGENTS)
+            data = {
+                "phase": "EXECUTING",
+                "status": rng.choice(STATUSES),
+                "progress": f"{rng.randint(0, 100)}%",
+                "todos_completed": rng.randint(0, 40),
+                "todos_total": 40,
+                "updated_at": ts.isoformat(),
+                "last_update": ts.isoformat(),
+            }
+            yield db.event_row(cursor, rng.randint(1, projects), agent, rng.choice(EVENT_TYPES), data,
+                               int(epoch) + i)
+
+    for start in range(0, events, SEED_BATCH):
+        conn.executemany(
+            "INSERT INTO events (project_id, agent_id, type_id, data, ts) VALUES (?, ?, ?, ?, ?)",
+            event_rows(start, min(SEED_BATCH, events - start))
+        )
+        conn.commit()
+    conn.close()
+    return db
+
+
+def bench_database(workdir: Path, scale: Dict, rng: random.Random) -> Dict:
+    """Time the Database API against a seeded database"""
+    results = {}
+    db_path = workdir / "orchestrator.db"
+
+    start = time.perf_counter()
+    db = seed_database(db_path, scale["projects"], scale["events"], rng)
+    results["db.seed"] = {
+        "runs": 1,
+        "seconds": time.perf_counter() - start,
+        "projects": scale["projects"],
+        "events": scale["events"],
+        "db_bytes": db_path.stat().st_size,
+    }
+
+    iterations = scale["iterations"]
+    project_ids = [rng.randint(1, scale["projects"]) for _ in range(iterations)]
+    agents = [rng.choice(AGENTS) for _ in range(iterations)]
+
+    results["db.create_project"] = time_op(
+        lambda i: db.create_project(f"Bench {i}", "1.0.0"), iterations)
+    results["db.update_agent"] = time_op(
+        lambda i: db.update_agent(project_ids[i], agents[i], {"status": "IN_PROGRESS", "progress": f"{i % 100}%"}),
+        iterations)
+    results["db.log_event"] = time_op(
+        lambda i: db.log_event(project_ids[i], agents[i], "BENCHMARK", {"iteration": i}), iterations)
+    results["db.get_events"] = time_op(
+        lambda i: db.get_events(project_ids[i], limit=100), iterations)
+
+    exported = []
+    results["db.export_to_json"] = time_op(
+        lambda i: exported.append(db.export_to_json(project_ids[i])), iterations)
+    results["db.import_from_json"] = time_op(
+        lambda i: db.import_from_json(exported[i]), min(iterations, len(exported)))
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Validator benchmarks
+# ----------------------------------------------------------------------------
+
+def spec_route_files(spec_text: str) -> Dict[str, str]:
+    """Next.js route handlers (path -> source) serving every operation in the spec"""
+    try:
+        import yaml
+    except ImportError:
+        return {}  # Phase 3 skips route coverage without PyYAML
+    from route_index import DEFAULT_API_BASE, HTTP_METHODS, spec_base_path
+
+    spec = yaml.safe_load(spec_text)
+    base = spec_base_path(spec) or DEFAULT_API_BASE
+    files = {}
+    for path, item in (spec.get("paths") or {}).items():
+        segments = [s for s in f"{base}/{path}".split("/") if s]
+        directory = "/".join(f"[{s[1:-1]}]" if s.startswith("{") else s for s in segments)
+        files[f"src/app/{directory}/route.ts"] = "".join(
+            f"export async function {method}() {{}}\n"
+            for method in HTTP_METHODS if method.lower() in item)
+    return files
+
+
+def build_project_tree(root: Path, total_files: int):
+    """Create a project tree that passes phases 1-5 plus filler files"""
+    written = set()
+
+    def write(rel: str, content: str):
+        written.add(rel)
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+    completed = json.dumps({"status": "COMPLETED"})
+    spec_source = REPO_ROOT / "specs" / "api.openapi.yaml"
+    spec = spec_source.read_text() if spec_source.exists() else (
+        "openapi: 3.0.3\ninfo:\n  title: Bench\n  version: 1.0.0\npaths:\n"
+        + "".join(f"  /r{i}:\n    get:\n      responses:\n        '200':\n          description: ok\n" for i in range(40))
+    )
+
+    write("agents/architect/output/architecture.md", "# Architecture\n" + "x" * 2000)
+    write("agents/architect/output/api.openapi.yaml", spec)
+    write("agents/architect/output/database_schema.prisma", "model User {\n  id String @id\n}\n" * 10)
+    write("agents/architect/output/report.json", completed)
+    write("agents/planner/output/execution_plan.json", json.dumps({"phases": [1, 2, 3]}))
+    write("agents/planner/output/task_list.json", json.dumps({"tasks": [{"id": 1}]}))
+    write("agents/planner/output/report.json", completed)
+    write("specs/api.openapi.yaml", spec)
+    for rel, source in spec_route_files(spec).items():
+        write(rel, source)
+    write("src/components/Button.tsx", "export const Button = () => null\n")
+    write("__tests__/button.test.tsx", "test('x', () => {})\n")
+    write("Dockerfile", "FROM node:20\n")
+    write("docker-compose.yml", "services: {}\n")
+    write(".github/workflows/ci.yml", "name: ci\n")
+    for doc in ("API.md", "ARCHITECTURE.md", "SETUP.md", "DEPLOYMENT.md"):
+        write(f"docs/{doc}", "# Doc\n" + "y" * 600)
+
+    # Filler: most files in dependency trees, the rest in deep source dirs
+    created = 0
+    for i in range(max(0, total_files - len(written))):
+        if i % 4:
+            rel = f"node_modules/pkg{i % 500}/lib/sub{i % 7}/file{i}.js"
+        else:
+            rel = f"src/lib/mod{i % 200}/deep{i % 5}/file{i}.ts"
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        created += 1
+    return created + len(written)
+
+
+def bench_validators(workdir: Path, scale: Dict) -> Dict:
+    """Time each phase validator against a synthetic tree"""
+    import phase_validators
+
+    root = workdir / "tree"
+    start = time.perf_counter()
+    files = build_project_tree(root, scale["tree_files"])
+    results = {"validators.build_tree": {"runs": 1, "seconds": time.perf_counter() - start, "files": files}}
+
+    # A fresh validator per run, as the orchestrator and CLI use them
+    for phase in range(1, 7):
+        name = type(phase_validators.get_validator(phase, str(root))).__name__
+        results[f"validators.{name}"] = time_op(
+            lambda i, phase=phase: phase_validators.get_validator(phase, str(root)).validate(),
+            scale["validator_runs"])
+    return results
+
+
+# ----------------------------------------------------------------------------
+# CLI cold start
+# ----------------------------------------------------------------------------
+
+def bench_cold_start(workdir: Path, runs: int = 5) -> Dict:
+    """Time fresh interpreter runs of the orchestrator and validator CLIs"""
+    results = {}
+    cli_dir = workdir / "cli"
+    cli_dir.mkdir(exist_ok=True)
+    commands = {
+        "cli.orchestrator_help": [sys.executable, str(REPO_ROOT / "orchestrator.py"), "--help"],
+        "cli.orchestrator_status": [sys.executable, str(REPO_ROOT / "orchestrator.py"), "--status"],
+        "cli.phase_validators": [sys.executable, str(REPO_ROOT / "phase_validators.py"), "1"],
+    }
+    for name, cmd in commands.items():
+        results[name] = time_op(
+            lambda i: subprocess.run(cmd, cwd=cli_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+            runs)
+    return results
+
+
+# ----------------------------------------------------------------------------
+# Baseline comparison
+# ----------------------------------------------------------------------------
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[Dict]:
+    """Compare median latencies; return one row per benchmark present in both"""
+    rows = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        key = "median_ms" if "median_ms" in result else "seconds"
+        if key not in base or not base[key]:
+            continue
+        ratio = result[key] / base[key]
+        rows.append({
+            "name": name,
+            "metric": key,
+            "baseline": base[key],
+            "current": result[key],
+            "ratio": ratio,
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def run(scale_name: str, sections: List[str], seed: int, workdir: Optional[Path]) -> Dict:
+    scale = SCALES[scale_name]
+    rng = random.Random(seed)
+    results = {}
+    own_workdir = workdir is None
+    workdir = Path(tempfile.mkdtemp(prefix="orchestrator-bench-")) if own_workdir else workdir
+    workdir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        if "db" in sections:
+            print(f"⏱  Database ({scale['projects']} projects, {scale['events']} events)...")
+            results.update(bench_database(workdir, scale, rng))
+        if "validators" in sections:
+            print(f"⏱  Validators ({scale['tree_files']} files)...")
+            results.update(bench_validators(workdir, scale))
+        if "cli" in sections:
+            print("⏱  CLI cold start...")
+            results.update(bench_cold_start(workdir))
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "scale": scale_name,
+            "seed": seed,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark orchestrator storage, validators and CLI")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="smoke")
+    parser.add_argument("--only", action="append", choices=["db", "validators", "cli"],
+                        help="Run only the given section (repeatable)")
+    parser.add_argument("--output", default="benchmark_results.json", help="Where to write results JSON")
+    parser.add_argument("--compare", metavar="BASELINE", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown before flagging a regression (default: 0.25 = 25%%)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workdir", help="Keep seeded databases and trees in this directory")
+    args = parser.parse_args()
+
+    sections = args.only or ["db", "validators", "cli"]
+    report = run(args.scale, sections, args.seed, Path(args.workdir) if args.workdir else None)
+    Path(args.output).write_text(json.dumps(report, indent=2))
+    print(f"\n✅ Results written to {args.output}\n")
+
+    for name, result in sorted(report["results"].items()):
+        if "median_ms" in result:
+            print(f"  {name:<40} median={result['median_ms']:9.3f}ms  p90={result['p90_ms']:9.3f}ms")
+        else:
+            print(f"  {name:<40} {result['seconds']:9.3f}s")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        rows = compare(report, baseline, args.threshold)
+        regressions = [r for r in rows if r["regression"]]
+        print(f"\nComparison against {args.compare} (threshold +{args.threshold:.0%}):")
+        for r in rows:
+            flag = "❌ REGRESSION" if r["regression"] else "✅"
+            print(f"  {flag:<13} {r['name']:<40} {r['baseline']:10.3f} -> {r['current']:10.3f} ({r['ratio']:.2f}x)")
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) detected")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Streaming coverage gate
+Aggregates Jest/Istanbul coverage-final.json and lcov.info reports per
+directory with bounded memory and enforces per-area coverage thresholds
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+METRICS = ("lines", "branches", "functions")
+
+# Per directory: [lines_total, lines_hit, branches_total, branches_hit, functions_total, functions_hit]
+DirectoryTotals = Dict[str, List[int]]
+
+CHUNK_SIZE = 1 << 20
+
+_LCOV_SUMMARY = ("LF", "LH", "BRF", "BRH", "FNF", "FNH")
+
+_SCALAR_END = re.compile(r"[\s,\]}]")
+
+# Report directories, in lookup order; lcov.info is preferred when both exist
+REPORT_DIRS = ("coverage", "backend/coverage", "frontend/coverage")
+REPORT_FILES = ("lcov.info", "coverage-final.json")
+
+# Matches the Phase 6 checklist; override with orchestration.coverage
+NEXTJS_AREAS = {
+    "backend": {"paths": ["src/app/api", "src/lib"], "lines": 80},
+    "frontend": {"paths": ["src/components", "src/app", "src/hooks"], "lines": 75},
+}
+SPLIT_AREAS = {
+    "backend": {"paths": ["backend"], "lines": 80},
+    "frontend": {"paths": ["frontend"], "lines": 75},
+}
+
+
+class CoverageError(ValueError):
+    """Raised for invalid coverage configuration or unreadable reports"""
+    pass
+
+
+def parse_gate_config(raw: Any) -> Tuple[Optional[List[str]], Optional[Dict[str, Dict]]]:
+    """Validate an `orchestration.coverage` mapping into (reports, areas)"""
+    if not isinstance(raw, dict):
+        raise CoverageError("coverage must be a mapping")
+    reports = raw.get("reports")
+    if reports is not None and (not isinstance(reports, list) or not all(isinstance(r, str) for r in reports)):
+        raise CoverageError("coverage.reports must be a list of paths")
+    areas = raw.get("areas")
+    if areas is not None:
+        if not isinstance(areas, dict) or not areas:
+            raise CoverageError("coverage.areas must map area names to settings")
+        for name, area in areas.items():
+            if not isinstance(area, dict) or not isinstance(area.get("paths"), list) or not area["paths"]:
+                raise CoverageError(f"coverage area '{name}' needs a non-empty paths list")
+            for metric in METRICS:
+                value = area.get(metric)
+                if value is not None and (not isinstance(value, (int, float)) or not 0 <= value <= 100):
+                    raise CoverageError(f"coverage area '{name}': {metric} must be a percentage")
+    return (reports, areas)
+
+
+class _DirectoryMap:
+    """Source file path -> project-relative directory, resolved once per directory"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self._dirs: Dict[str, str] = {}
+
+    def __call__(self, path: str) -> str:
+        directory = path.replace("\\", "/").rpartition("/")[0]
+        relative = self._dirs.get(directory)
+        if relative is None:
+            relative = directory
+            if os.path.isabs(directory):
+                try:
+                    relative = os.path.relpath(directory, self.root).replace("\\", "/")
+                except ValueError:
+                    pass
+            elif relative.startswith("./"):
+                relative = relative[2:]
+            self._dirs[directory] = relative if relative not in ("", ".") else "."
+            relative = self._dirs[directory]
+        return relative
+
+
+def _add(totals: DirectoryTotals, directory: str, counts: List[int]):
+    row = totals.get(directory)
+    if row is None:
+        totals[directory] = list(counts)
+    else:
+        for i, value in enumerate(counts):
+            row[i] += value
+
+
+def parse_lcov(stream: IO[str], root: str) -> DirectoryTotals:
+    """Aggregate an lcov.info stream record by record
+
+    LF/LH, BRF/BRH and FNF/FNH summaries are used when present, otherwise
+    the DA/BRDA/FNDA detail lines are counted.
+    """
+    totals: DirectoryTotals = {}
+    directory_of = _DirectoryMap(root)
+    directory = None
+    summary: Dict[str, int] = {}
+    detail = [0] * 6
+    for line in stream:
+        # DA lines dominate, so test for them first and avoid int() parsing
+        if line.startswith("DA:"):
+            detail[0] += 1
+            if line.split(",", 2)[1].strip() not in ("0", "-"):
+                detail[1] += 1
+            continue
+        tag, _, value = line.rstrip("\n").partition(":")
+        if tag == "SF":
+            directory = directory_of(value)
+            summary = {}
+            detail = [0] * 6
+        elif tag in _LCOV_SUMMARY:
+            summary[tag] = int(value)
+        elif tag == "BRDA":
+            detail[2] += 1
+            if value.rsplit(",", 1)[-1].strip() not in ("-", "0"):
+                detail[3] += 1
+        elif tag == "FNDA":
+            detail[5] += value.split(",", 1)[0].strip() != "0"
+        elif tag == "FN":
+            detail[4] += 1
+        elif tag == "end_of_record" and directory is not None:
+            _add(totals, directory, [summary.get(key, detail[i]) for i, key in enumerate(_LCOV_SUMMARY)])
+            directory = None
+    return totals
+
+
+def iter_json_object(stream: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """Yield (key, value) pairs of a top-level JSON object without loading it whole
+
+    Only one value plus one chunk is held in memory at a time.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        # Grow geometrically so a value spanning many chunks is re-scanned O(log n) times
+        chunk = stream.read(max(chunk_size, len(buf) - pos))
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_ws():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf) or not fill():
+                return
+
+    def decode():
+        nonlocal pos
+        while True:
+            if pos >= len(buf):
+                raise CoverageError("unexpected end of coverage report")
+            # A bare scalar (1.5e3, true) is only complete once its delimiter is buffered
+            if buf[pos] not in "{[\"" and not _SCALAR_END.search(buf, pos) and fill():
+                continue
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not fill():
+                    raise  # malformed, not just incomplete
+                continue
+            pos = end
+            return value
+
+    skip_ws()
+    if pos >= len(buf) or buf[pos] != "{":
+        raise CoverageError("expected a JSON object")
+    pos += 1
+    skip_ws()
+    if buf[pos:pos + 1] == "}":
+        return
+    while True:
+        skip_ws()
+        key = decode()
+        skip_ws()
+        if buf[pos:pos + 1] != ":":
+            raise CoverageError(f"expected ':' after key {key!r}")
+        pos += 1
+        skip_ws()
+        yield key, decode()
+        skip_ws()
+        separator = buf[pos:pos + 1]
+        pos += 1
+        if separator == "}":
+            return
+        if separator != ",":
+            raise CoverageError("expected ',' or '}' in coverage report")
+
+
+def istanbul_counts(entry: Dict) -> List[int]:
+    """Line, branch and function totals for one Istanbul file entry
+
+    Lines follow istanbul-lib-coverage: a line is covered if any statement
+    starting on it ran.
+    """
+    lines: Dict[int, int] = {}
+    hits = entry.get("s") or {}
+    for key, loc in (entry.get("statementMap") or {}).items():
+        line = loc["start"]["line"]
+        lines[line] = max(lines.get(line, 0), hits.get(key, 0))
+    branches = [c for counts in (entry.get("b") or {}).values() for c in counts]
+    functions = list((entry.get("f") or {}).values())
+    return [
+        len(lines), sum(1 for c in lines.values() if c > 0),
+        len(branches), sum(1 for c in branches if c > 0),
+        len(functions), sum(1 for c in functions if c > 0),
+    ]
+
+
+def parse_istanbul(stream: IO[str], root: str) -> DirectoryTotals:
+    totals: DirectoryTotals = {}
+    directory_of = _DirectoryMap(root)
+    for key, entry in iter_json_object(stream):
+        if isinstance(entry, dict):
+            _add(totals, directory_of(entry.get("path") or key), istanbul_counts(entry))
+    return totals
+
+
+def load_report(path: Path, root: str) -> DirectoryTotals:
+    """Per-directory totals for an lcov.info or coverage-final.json report"""
+    try:
+        with open(path, encoding="utf-8") as stream:
+            if path.suffix == ".json":
+                return parse_istanbul(stream, root)
+            return parse_lcov(stream, root)
+    except (ValueError, KeyError, TypeError, IndexError) as e:
+        raise CoverageError(f"Invalid coverage report {path.name}: {e}")
+
+
+def merge(into: DirectoryTotals, other: DirectoryTotals):
+    for directory, counts in other.items():
+        row = into.get(directory)
+        if row is None:
+            into[directory] = list(counts)
+        else:
+            for i, value in enumerate(counts):
+                row[i] += value
+
+
+def _area_of(directory: str, prefixes: List[Tuple[str, str]]) -> Optional[str]:
+    for prefix, area in prefixes:  # longest prefix first
+        if directory == prefix or directory.startswith(prefix + "/"):
+            return area
+    return None
+
+
+def percent(hit: int, total: int) -> float:
+    return 100.0 * hit / total if total else 100.0
+
+
+def check_thresholds(totals: DirectoryTotals, areas: Dict[str, Dict]) -> List[str]:
+    """One error per area and metric below its threshold"""
+    prefixes = sorted(((p.rstrip("/"), name) for name, area in areas.items() for p in area["paths"]),
+                      key=lambda item: len(item[0]), reverse=True)
+    area_totals = {name: [0] * 6 for name in areas}
+    area_dirs: Dict[str, List[Tuple[str, List[int]]]] = {name: [] for name in areas}
+    for directory, counts in totals.items():
+        area = _area_of(directory, prefixes)
+        if area is not None:
+            area_dirs[area].append((directory, counts))
+            for i, value in enumerate(counts):
+                area_totals[area][i] += value
+
+    errors = []
+    for name, area in areas.items():
+        label = name.capitalize()
+        if not area_dirs[name]:
+            errors.append(f"{label} coverage: no files from {', '.join(area['paths'])} in the coverage report")
+            continue
+        for i, metric in enumerate(METRICS):
+            threshold = area.get(metric)
+            total, hit = area_totals[name][2 * i], area_totals[name][2 * i + 1]
+            if threshold is None or percent(hit, total) >= threshold:
+                continue
+            worst = min(area_dirs[name], key=lambda d: percent(d[1][2 * i + 1], d[1][2 * i]))
+            errors.append(
+                f"{label} coverage: {metric} {percent(hit, total):.1f}% < {threshold}% "
+                f"(lowest: {worst[0]} {percent(worst[1][2 * i + 1], worst[1][2 * i]):.1f}%)")
+    return errors
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize coverage reports per directory")
+    parser.add_argument("reports", nargs="+", help="lcov.info or coverage-final.json files")
+    parser.add_argument("--root", default=".", help="Project root for relative paths")
+    args = parser.parse_args()
+
+    totals: DirectoryTotals = {}
+    for report in args.reports:
+        merge(totals, load_report(Path(report), os.path.abspath(args.root)))
+    print(f"{'directory':<48} {'lines':>8} {'branches':>9} {'functions':>10}")
+    for directory in sorted(totals):
+        c = totals[directory]
+        print(f"{directory:<48} {percent(c[1], c[0]):7.1f}% {percent(c[3], c[2]):8.1f}% {percent(c[5], c[4]):9.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,21 +6,173 @@ Replaces file-based SHARED_CONTEXT.json with SQLite database
 
 import sqlite3
 import json
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from contextlib import contextmanager
 
+from event_bus import Event, bus
+from event_codec import PLAIN, decode_payload, encode_payload
+from forecast import AGENT, PHASE, Histograms, agent_key, bucket_of
+from metrics import registry as metrics, instrumented, current_operation
+from orchestration_config import DEFAULT_AGENTS
+
+
+class _InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that records query latency and rows touched"""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._record(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._record(time.perf_counter() - start)
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            metrics.inc("orchestrator_db_rows_total", op=current_operation())
+        return row
+
+    def fetchall(self):
+        rows = super().fetchall()
+        if rows:
+            metrics.inc("orchestrator_db_rows_total", len(rows), op=current_operation())
+        return rows
+
+    def _record(self, elapsed: float):
+        op = current_operation()
+        metrics.observe("orchestrator_db_query_seconds", elapsed, op=op)
+        if self.rowcount > 0:
+            metrics.inc("orchestrator_db_rows_total", self.rowcount, op=op)
+
+
+class _InstrumentedConnection(sqlite3.Connection):
+    """Connection that hands out instrumented cursors and times commits"""
+
+    def cursor(self, factory=_InstrumentedCursor):
+        return super().cursor(factory)
+
+    def commit(self):
+        start = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            metrics.observe("orchestrator_db_commit_seconds",
+                            time.perf_counter() - start, op=current_operation())
+
+
+# Agent columns a completed job may set from its result payload
+JOB_AGENT_FIELDS = ("phase", "status", "progress", "todos_completed", "todos_total")
+
+# Audit log. Agent names, event types and payload keys are IDs into
+# event_symbols; data is an event_codec payload; ts is unix seconds (UTC).
+EVENTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        project_id INTEGER NOT NULL,
+        agent_id INTEGER,
+        type_id INTEGER NOT NULL,
+        data BLOB,
+        ts INTEGER DEFAULT (CAST(strftime('%s', 'now') AS INTEGER)),
+        FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+    )
+"""
+
+EVENT_SYMBOLS_TABLE = """
+    CREATE TABLE IF NOT EXISTS event_symbols (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+"""
+
+# Rows re-encoded per batch when migrating a text-layout events table
+EVENT_MIGRATION_BATCH = 10_000
+
+# Agent timing columns loaded from agents/<name>/output/report.json. Added
+# after the first schema, so older databases get them by ALTER TABLE.
+AGENT_REPORT_COLUMNS = (
+    ("started_at", "TEXT"),
+    ("completed_at", "TEXT"),
+    ("duration_minutes", "REAL"),
+    ("todos_created", "INTEGER"),
+    ("report_digest", "TEXT"),
+    ("report_phase", "INTEGER"),
+)
+
+
+def _reencode_payload(text: Optional[str], symbol_id) -> Optional[bytes]:
+    """Encode a legacy JSON text payload; rows json.dumps() wouldn't reproduce
+    byte for byte are kept verbatim"""
+    if text is None:
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return PLAIN + text.encode()
+    if json.dumps(data) != text:
+        return PLAIN + text.encode()
+    return encode_payload(data, symbol_id)
+
+
+def _report_text(value) -> Optional[str]:
+    return value if isinstance(value, str) and value else None
+
+
+def _report_number(value, kind=float):
+    """Numeric report field, or None when absent or malformed"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return kind(value)
+
+
+def _report_timestamp(value) -> Optional[str]:
+    """ISO-8601 report timestamp, or None if it doesn't parse"""
+    if not isinstance(value, str):
+        return None
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return value
+
+
+def _minutes_between(started_at: str, completed_at: str) -> Optional[float]:
+    try:
+        delta = (datetime.fromisoformat(completed_at.replace("Z", "+00:00"))
+                 - datetime.fromisoformat(started_at.replace("Z", "+00:00")))
+    except (TypeError, ValueError):  # naive vs aware timestamps
+        return None
+    return round(delta.total_seconds() / 60, 2)
+
 
 class Database:
     """SQLite database for orchestrator state"""
 
-    def __init__(self, db_path: str = "orchestrator.db"):
+    def __init__(self, db_path: str = "orchestrator.db", timeout: float = 30.0):
         self.db_path = Path(db_path)
+        self.timeout = timeout  # seconds to wait for another process's write lock
+        # Committed event symbols only; IDs from an open transaction could roll back
+        self._symbol_ids: Dict[str, int] = {}
+        self._symbol_names: Dict[int, str] = {}
+        # connection -> symbols its open transaction created or looked up
+        self._pending_symbols: Dict[sqlite3.Connection, Dict[str, int]] = {}
+        # connection -> events to publish on the bus once it commits
+        self._unpublished: Dict[sqlite3.Connection, List[Event]] = {}
         self.init_database()
 
+    @instrumented("init_database")
     def init_database(self):
         """Initialize database schema"""
+        self._migrate_events()
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
@@ -59,19 +211,11 @@ class Database:
                     UNIQUE (project_id, name)
                 )
             """)
+            self._add_missing_columns(cursor, "agents", AGENT_REPORT_COLUMNS)
 
-            # Events table (audit log)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    project_id INTEGER NOT NULL,
-                    agent_name TEXT,
-                    event_type TEXT NOT NULL,
-                    data TEXT,
-                    timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
-                )
-            """)
+            # Events table (audit log), compactly encoded
+            cursor.execute(EVENT_SYMBOLS_TABLE)
+            cursor.execute(EVENTS_TABLE.format(table="events"))
 
             # Phase timeline table
             cursor.execute("""
@@ -87,52 +231,340 @@ class Database:
                 )
             """)
 
+            # Agent job queue (lease-based, shared by worker processes)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_id INTEGER NOT NULL,
+                    agent_name TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT DEFAULT 'QUEUED',
+                    priority INTEGER DEFAULT 0,
+                    attempts INTEGER DEFAULT 0,
+                    max_attempts INTEGER DEFAULT 3,
+                    worker_id TEXT,
+                    lease_expires_at REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    started_at TEXT,
+                    completed_at TEXT,
+                    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+                )
+            """)
+
+            # Content-addressed agent outputs recorded per phase (see artifact_store.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_id INTEGER NOT NULL,
+                    phase_number INTEGER NOT NULL,
+                    path TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    recorded_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE,
+                    UNIQUE (project_id, phase_number, path)
+                )
+            """)
+
+            # Phase validation runs and their per-check results (see validation_report.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS validation_runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_id INTEGER NOT NULL,
+                    phase_number INTEGER NOT NULL,
+                    success INTEGER NOT NULL,
+                    error_count INTEGER NOT NULL,
+                    duration_seconds REAL NOT NULL,
+                    bytes_read INTEGER NOT NULL,
+                    started_at TEXT NOT NULL,
+                    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS validation_checks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_id INTEGER NOT NULL,
+                    check_id TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    cached INTEGER NOT NULL,
+                    duration_seconds REAL NOT NULL,
+                    bytes_read INTEGER NOT NULL,
+                    errors TEXT,
+                    FOREIGN KEY (run_id) REFERENCES validation_runs (id) ON DELETE CASCADE
+                )
+            """)
+
+            # Duration histograms across all projects (see forecast.py)
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'duration_stats'")
+            backfill = cursor.fetchone() is None
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS duration_stats (
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (scope, key, bucket)
+                )
+            """)
+            if backfill:
+                # One-off seed from existing timelines; kept incrementally from here on
+                cursor.execute("""
+                    SELECT phase_number, duration_minutes FROM phase_timeline
+                    WHERE duration_minutes IS NOT NULL
+                """)
+                for row in cursor.fetchall():
+                    self._record_duration(cursor, PHASE, str(row[0]), row[1])
+
+            # Webhook batches that exhausted their retries (see webhooks.py)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS webhook_dead_letters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    endpoint TEXT NOT NULL,
+                    event_count INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    error TEXT,
+                    attempts INTEGER NOT NULL,
+                    failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             # Indexes for performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_agents_project ON agents(project_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_project ON events(project_id)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_project_ts ON events(project_id, ts)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_phase_timeline_project ON phase_timeline(project_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, priority DESC, id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_lease ON jobs(status, lease_expires_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_project ON jobs(project_id, status)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_artifacts_digest ON artifacts(digest)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_validation_runs_project ON validation_runs(project_id, phase_number)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_validation_checks_run ON validation_checks(run_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_validation_checks_check ON validation_checks(check_id)")
 
             conn.commit()
 
     @contextmanager
     def get_connection(self):
         """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
+        if metrics.enabled:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, factory=_InstrumentedConnection)
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
         conn.row_factory = sqlite3.Row  # Access columns by name
         try:
             yield conn
         finally:
+            self._pending_symbols.pop(conn, None)  # never committed
+            self._unpublished.pop(conn, None)
             conn.close()
 
-    def create_project(self, name: str, version: str = "1.0.0") -> int:
-        """Create a new project"""
+    def _committed(self, conn: sqlite3.Connection):
+        """Cache a just-committed connection's symbols and publish its events"""
+        symbols = self._pending_symbols.pop(conn, None)
+        if symbols:
+            self._symbol_ids.update(symbols)
+            self._symbol_names.update((symbol, name) for name, symbol in symbols.items())
+        events = self._unpublished.pop(conn, None)
+        if events:
+            bus.publish(events)
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction that takes the database write lock up front
+
+        BEGIN IMMEDIATE serializes writers at the start of the transaction,
+        so read-check-write sequences inside it cannot interleave with other
+        processes. Yields a cursor; commits on success, rolls back on error.
+        """
+        with self.get_connection() as conn:
+            conn.isolation_level = None  # BEGIN/COMMIT are issued explicitly
+            start = time.perf_counter()
+            conn.execute("BEGIN IMMEDIATE")
+            metrics.observe("orchestrator_db_lock_wait_seconds",
+                            time.perf_counter() - start, op=current_operation())
+            try:
+                yield conn.cursor()
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            start = time.perf_counter()
+            conn.execute("COMMIT")
+            metrics.observe("orchestrator_db_commit_seconds",
+                            time.perf_counter() - start, op=current_operation())
+            self._committed(conn)
+
+    @staticmethod
+    def _add_missing_columns(cursor, table: str, columns: Tuple[Tuple[str, str], ...]):
+        """ALTER TABLE ADD COLUMN for columns an older database lacks"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        for name, declaration in columns:
+            if name in existing:
+                continue
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+            except sqlite3.OperationalError as e:
+                # Another process migrated the same database first
+                if "duplicate column" not in str(e):
+                    raise
+
+    @staticmethod
+    def _record_duration(cursor, scope: str, key: str, minutes: float, delta: int = 1):
+        """Add (or with delta=-1, withdraw) one sample from a duration histogram"""
+        if minutes < 0:  # clock skew between machines; not a real duration
+            return
+        cursor.execute("""
+            INSERT INTO duration_stats (scope, key, bucket, count) VALUES (?, ?, ?, ?)
+            ON CONFLICT (scope, key, bucket) DO UPDATE SET count = MAX(count + excluded.count, 0)
+        """, (scope, key, bucket_of(minutes), delta))
+
+    def _migrate_events(self):
+        """One-off re-encoding of an events table in the original text layout"""
+        with self.get_connection() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        if "agent_name" not in columns:
+            return
+
+        with self.transaction() as cursor:
+            cursor.execute("PRAGMA table_info(events)")
+            if "agent_name" not in {row[1] for row in cursor.fetchall()}:
+                return  # another process got here first
+            cursor.execute(EVENT_SYMBOLS_TABLE)
+            cursor.execute(EVENTS_TABLE.format(table="events_compact"))
+
+            # Symbols created here commit with the migration, so a local map is safe
+            symbols: Dict[str, int] = {}
+
+            def symbol_id(name: str) -> int:
+                if name not in symbols:
+                    symbols[name] = self._new_symbol(cursor, name)
+                return symbols[name]
+
+            reader = cursor.connection.cursor()
+            reader.execute("""
+                SELECT id, project_id, agent_name, event_type, data,
+                       CAST(strftime('%s', timestamp) AS INTEGER)
+                FROM events ORDER BY id
+            """)
+            while True:
+                rows = reader.fetchmany(EVENT_MIGRATION_BATCH)
+                if not rows:
+                    break
+                cursor.executemany("""
+                    INSERT INTO events_compact (id, project_id, agent_id, type_id, data, ts)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, [(row[0], row[1], None if row[2] is None else symbol_id(row[2]),
+                       symbol_id(row[3]), _reencode_payload(row[4], symbol_id), row[5])
+                      for row in rows])
+            cursor.execute("DROP TABLE events")
+            cursor.execute("ALTER TABLE events_compact RENAME TO events")
+
+        # Hand the freed pages back to the filesystem
+        with self.get_connection() as conn:
+            conn.isolation_level = None
+            conn.execute("VACUUM")
+
+    def _load_symbols(self):
+        with self.get_connection() as conn:
+            rows = conn.execute("SELECT id, name FROM event_symbols").fetchall()
+        self._symbol_names = {row[0]: row[1] for row in rows}
+        self._symbol_ids = {row[1]: row[0] for row in rows}
+
+    @staticmethod
+    def _new_symbol(cursor, name: str) -> int:
+        cursor.execute("INSERT OR IGNORE INTO event_symbols (name) VALUES (?)", (name,))
+        cursor.execute("SELECT id FROM event_symbols WHERE name = ?", (name,))
+        return cursor.fetchone()[0]
+
+    def _symbol_id(self, cursor, name: str) -> int:
+        """Symbol ID for name, creating it within the caller's transaction"""
+        symbol = self._symbol_ids.get(name)
+        if symbol is None:
+            # Held per connection until it commits, as the transaction may
+            # still roll back; the SELECT also finds symbols other processes
+            # committed, so a miss never reloads the whole table
+            pending = self._pending_symbols.setdefault(cursor.connection, {})
+            symbol = pending.get(name)
+            if symbol is None:
+                symbol = pending[name] = self._new_symbol(cursor, name)
+        return symbol
+
+    def _symbol_name(self, symbol: int) -> str:
+        name = self._symbol_names.get(symbol)
+        if name is None:
+            self._load_symbols()
+            name = self._symbol_names[symbol]
+        return name
+
+    def intern_symbols(self, names: List[str]):
+        """Pre-register event symbols (e.g. before a bulk load)"""
+        with self.transaction() as cursor:
+            for name in names:
+                self._new_symbol(cursor, name)
+        self._load_symbols()
+
+    def event_row(self, cursor, project_id: int, agent_name: Optional[str], event_type: str,
+                  data: Any, ts: Optional[int] = None) -> Tuple:
+        """Encoded (project_id, agent_id, type_id, data, ts) for an events INSERT"""
+        symbol_id = lambda name: self._symbol_id(cursor, name)
+        return (project_id, None if agent_name is None else symbol_id(agent_name),
+                symbol_id(event_type), encode_payload(data, symbol_id),
+                int(time.time()) if ts is None else ts)
+
+    def _insert_event(self, cursor, project_id: int, agent_name: Optional[str], event_type: str, data: Dict):
+        """Append an event row using an existing cursor (caller commits)
+
+        The event is published on the event bus after the commit.
+        """
+        ts = int(time.time())
+        cursor.execute("""
+            INSERT INTO events (project_id, agent_id, type_id, data, ts)
+            VALUES (?, ?, ?, ?, ?)
+        """, self.event_row(cursor, project_id, agent_name, event_type, data, ts))
+        if bus.active:
+            self._unpublished.setdefault(cursor.connection, []).append(Event(
+                cursor.lastrowid, project_id, agent_name, event_type, data,
+                time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts))))
+
+    @instrumented("create_project")
+    def create_project(self, name: str, version: str = "1.0.0", agents: Optional[List[str]] = None,
+                       project_id: Optional[int] = None) -> int:
+        """Create a new project with one row per agent (defaults to the built-in seven)
+
+        project_id is normally assigned here; a sharded catalog passes the
+        ID it allocated.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            started_at = datetime.now().isoformat()
             cursor.execute("""
-                INSERT INTO projects (name, version, started_at)
-                VALUES (?, ?, ?)
-            """, (name, version, datetime.now().isoformat()))
+                INSERT INTO projects (id, name, version, started_at)
+                VALUES (?, ?, ?, ?)
+            """, (project_id, name, version, started_at))
 
             project_id = cursor.lastrowid
 
-            # Create agent records
-            agents = ["architect", "planner", "backend", "frontend", "qa", "devops", "docs"]
-            for agent in agents:
-                cursor.execute("""
-                    INSERT INTO agents (project_id, name, phase, status, progress)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (project_id, agent, "WAITING", "READY", "0%"))
+            # Phase 1 starts with the project
+            cursor.execute("""
+                INSERT INTO phase_timeline (project_id, phase_number, started_at)
+                VALUES (?, ?, ?)
+            """, (project_id, 1, started_at))
+
+            # Create agent records in one batch
+            cursor.executemany("""
+                INSERT INTO agents (project_id, name, phase, status, progress)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(project_id, agent, "WAITING", "READY", "0%") for agent in (agents or DEFAULT_AGENTS)])
 
             # Log event inline to avoid nested transaction
-            cursor.execute("""
-                INSERT INTO events (project_id, agent_name, event_type, data)
-                VALUES (?, ?, ?, ?)
-            """, (project_id, None, "PROJECT_CREATED", json.dumps({"name": name, "version": version})))
+            self._insert_event(cursor, project_id, None, "PROJECT_CREATED", {"name": name, "version": version})
 
             conn.commit()
+            self._committed(conn)
             return project_id
 
+    @instrumented("get_active_project")
     def get_active_project(self) -> Optional[Dict]:
         """Get the most recently active project"""
         with self.get_connection() as conn:
@@ -145,6 +577,35 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    @instrumented("list_projects")
+    def list_projects(self) -> List[Dict]:
+        """All projects, by ID"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM projects ORDER BY id")
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("get_stats")
+    def get_stats(self) -> Dict:
+        """Aggregate counts: projects by phase and status, agents by status,
+        events, and jobs by status"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            stats: Dict[str, Any] = {}
+            for key, sql in (
+                ("projects_by_phase", "SELECT current_phase, COUNT(*) FROM projects GROUP BY current_phase"),
+                ("projects_by_status", "SELECT status, COUNT(*) FROM projects GROUP BY status"),
+                ("agents_by_status", "SELECT status, COUNT(*) FROM agents GROUP BY status"),
+                ("jobs_by_status", "SELECT status, COUNT(*) FROM jobs GROUP BY status"),
+            ):
+                cursor.execute(sql)
+                stats[key] = {row[0]: row[1] for row in cursor.fetchall()}
+            stats["projects"] = sum(stats["projects_by_status"].values())
+            cursor.execute("SELECT COUNT(*) FROM events")
+            stats["events"] = cursor.fetchone()[0]
+            return stats
+
+    @instrumented("get_project")
     def get_project(self, project_id: int) -> Optional[Dict]:
         """Get project by ID"""
         with self.get_connection() as conn:
@@ -153,6 +614,7 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    @instrumented("update_project")
     def update_project(self, project_id: int, updates: Dict):
         """Update project fields"""
         if not updates:
@@ -169,6 +631,7 @@ class Database:
             cursor.execute(f"UPDATE projects SET {fields} WHERE id = ?", values)
             conn.commit()
 
+    @instrumented("get_agents")
     def get_agents(self, project_id: int) -> List[Dict]:
         """Get all agents for a project"""
         with self.get_connection() as conn:
@@ -180,6 +643,7 @@ class Database:
             """, (project_id,))
             return [dict(row) for row in cursor.fetchall()]
 
+    @instrumented("get_agent")
     def get_agent(self, project_id: int, agent_name: str) -> Optional[Dict]:
         """Get specific agent"""
         with self.get_connection() as conn:
@@ -191,6 +655,7 @@ class Database:
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    @instrumented("update_agent")
     def update_agent(self, project_id: int, agent_name: str, updates: Dict):
         """Update agent status"""
         if not updates:
@@ -213,28 +678,146 @@ class Database:
         # Log event
         self.log_event(project_id, agent_name, "AGENT_UPDATED", updates)
 
+    @instrumented("apply_agent_updates")
+    def apply_agent_updates(self, updates: List[Tuple[int, str, Dict]]) -> int:
+        """Group-commit many agent updates: [(project_id, agent_name, fields)]
+
+        One transaction for the batch, with rows that set the same fields
+        written by one executemany. Like update_agent, each update logs an
+        AGENT_UPDATED event; an update with no fields is a heartbeat and
+        only refreshes last_update. Updates for agents that do not exist are
+        skipped. Returns the number of agent rows written.
+        """
+        if not updates:
+            return 0
+        now = datetime.now().isoformat()
+        written = 0
+        with self.transaction() as cursor:
+            project_ids = sorted({project_id for project_id, _, _ in updates})
+            cursor.execute(f"""
+                SELECT project_id, name FROM agents WHERE project_id IN ({", ".join("?" * len(project_ids))})
+            """, project_ids)
+            known = {(row[0], row[1]) for row in cursor.fetchall()}
+            updates = [update for update in updates if (update[0], update[1]) in known]
+
+            groups: Dict[Tuple[str, ...], List[Tuple]] = {}
+            for project_id, agent_name, fields in updates:
+                columns = tuple(fields) + (("updated_at",) if fields else ()) + ("last_update",)
+                values = tuple(fields.values()) + ((now,) if fields else ()) + (now,)
+                groups.setdefault(columns, []).append(values + (project_id, agent_name))
+            for columns, rows in groups.items():
+                assignments = ", ".join(f"{c} = ?" for c in columns)
+                cursor.executemany(f"""
+                    UPDATE agents SET {assignments}
+                    WHERE project_id = ? AND name = ?
+                """, rows)
+                written += max(cursor.rowcount, 0)
+            for project_id, agent_name, fields in updates:
+                if fields:
+                    self._insert_event(cursor, project_id, agent_name, "AGENT_UPDATED",
+                                       dict(fields, updated_at=now, last_update=now))
+        return written
+
+    @instrumented("ingest_agent_reports")
+    def ingest_agent_reports(self, project_id: int, reports: Dict[str, Tuple[str, Dict]]) -> List[str]:
+        """Load {agent: (digest, report.json data)} into the agents table
+
+        One transaction for the whole batch. Agents whose stored
+        report_digest already matches are skipped, so re-ingesting unchanged
+        reports writes nothing. Returns the agents that were updated.
+        """
+        if not reports:
+            return []
+        now = datetime.now().isoformat()
+        with self.transaction() as cursor:
+            cursor.execute("SELECT current_phase FROM projects WHERE id = ?", (project_id,))
+            row = cursor.fetchone()
+            phase = row[0] if row else None
+            cursor.execute("""
+                SELECT name, report_digest, report_phase, duration_minutes FROM agents WHERE project_id = ?
+            """, (project_id,))
+            known = {row['name']: row for row in cursor.fetchall()}
+            changed = sorted(agent for agent, (digest, _) in reports.items()
+                             if agent in known and known[agent]['report_digest'] != digest)
+            rows = []
+            for agent in changed:
+                digest, report = reports[agent]
+                started_at = _report_timestamp(report.get("started_at"))
+                completed_at = _report_timestamp(report.get("completed_at"))
+                duration = _report_number(report.get("duration_minutes"))
+                if duration is None and started_at and completed_at:
+                    duration = _minutes_between(started_at, completed_at)
+                todos_created = _report_number(report.get("todos_created"), int)
+                if phase is not None:
+                    # A rewritten report within the same phase replaces its earlier sample
+                    previous = known[agent]
+                    if previous['report_phase'] == phase and previous['duration_minutes'] is not None:
+                        self._record_duration(cursor, AGENT, agent_key(phase, agent),
+                                              previous['duration_minutes'], -1)
+                    if duration is not None:
+                        self._record_duration(cursor, AGENT, agent_key(phase, agent), duration)
+                rows.append((
+                    _report_text(report.get("status")),
+                    _report_text(report.get("progress")),
+                    _report_number(report.get("todos_completed"), int),
+                    todos_created,
+                    started_at, completed_at, duration, todos_created,
+                    digest, phase, now, now, project_id, agent,
+                ))
+            # Missing status/progress/todo fields keep their current values
+            cursor.executemany("""
+                UPDATE agents SET
+                    status = COALESCE(?, status),
+                    progress = COALESCE(?, progress),
+                    todos_completed = COALESCE(?, todos_completed),
+                    todos_total = COALESCE(?, todos_total),
+                    started_at = ?,
+                    completed_at = ?,
+                    duration_minutes = ?,
+                    todos_created = ?,
+                    report_digest = ?,
+                    report_phase = ?,
+                    last_update = ?,
+                    updated_at = ?
+                WHERE project_id = ? AND name = ?
+            """, rows)
+            if changed:
+                self._insert_event(cursor, project_id, None, "AGENT_REPORTS_INGESTED", {
+                    "agents": changed, "skipped": len(reports) - len(changed)})
+        return changed
+
+    @instrumented("log_event")
     def log_event(self, project_id: int, agent_name: Optional[str], event_type: str, data: Dict):
         """Log an event to audit trail"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO events (project_id, agent_name, event_type, data)
-                VALUES (?, ?, ?, ?)
-            """, (project_id, agent_name, event_type, json.dumps(data)))
+            self._insert_event(conn.cursor(), project_id, agent_name, event_type, data)
             conn.commit()
+            self._committed(conn)
 
+    @instrumented("get_events")
     def get_events(self, project_id: int, limit: int = 100) -> List[Dict]:
         """Get recent events for a project"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT * FROM events
+                SELECT id, project_id, agent_id, type_id, data, datetime(ts, 'unixepoch') AS timestamp
+                FROM events
                 WHERE project_id = ?
-                ORDER BY timestamp DESC
+                ORDER BY ts DESC, id DESC
                 LIMIT ?
             """, (project_id, limit))
-            return [dict(row) for row in cursor.fetchall()]
+            rows = cursor.fetchall()
+        name = self._symbol_name
+        return [{
+            "id": row[0],
+            "project_id": row[1],
+            "agent_name": None if row[2] is None else name(row[2]),
+            "event_type": name(row[3]),
+            "data": decode_payload(row[4], name),
+            "timestamp": row[5],
+        } for row in rows]
 
+    @instrumented("update_phase_timeline")
     def update_phase_timeline(self, project_id: int, phase_number: int, started_at: str = None, completed_at: str = None):
         """Update phase timeline"""
         with self.get_connection() as conn:
@@ -242,7 +825,7 @@ class Database:
 
             # Check if record exists
             cursor.execute("""
-                SELECT id, started_at FROM phase_timeline
+                SELECT id, started_at, completed_at FROM phase_timeline
                 WHERE project_id = ? AND phase_number = ?
             """, (project_id, phase_number))
             row = cursor.fetchone()
@@ -252,17 +835,24 @@ class Database:
                 updates = []
                 values = []
 
+                # An explicit start wins over the one create_project recorded
+                # (e.g. when importing SHARED_CONTEXT.json)
+                if started_at:
+                    updates.append("started_at = ?")
+                    values.append(started_at)
+
                 if completed_at:
                     updates.append("completed_at = ?")
                     values.append(completed_at)
 
-                    # Calculate duration if we have both timestamps
-                    if row['started_at']:
-                        start = datetime.fromisoformat(row['started_at'])
-                        end = datetime.fromisoformat(completed_at)
-                        duration = int((end - start).total_seconds() / 60)
-                        updates.append("duration_minutes = ?")
-                        values.append(duration)
+                # Calculate duration if we have both timestamps
+                start_value = started_at or row['started_at']
+                end_value = completed_at or row['completed_at']
+                if updates and start_value and end_value:
+                    # NULL when the timestamps cannot be compared
+                    minutes = _minutes_between(start_value, end_value)
+                    updates.append("duration_minutes = ?")
+                    values.append(None if minutes is None else int(minutes))
 
                 if updates:
                     values.append(row['id'])
@@ -279,6 +869,405 @@ class Database:
 
             conn.commit()
 
+    @instrumented("transition_phase")
+    def transition_phase(self, project_id: int, from_phase: int, to_phase: int,
+                         phase_agents: List[str], timestamp: Optional[str] = None) -> bool:
+        """Atomically move a project from one phase to the next
+
+        Compare-and-set on current_phase: returns False without writing if the
+        project is no longer in from_phase (e.g. a concurrent transition won).
+        In one transaction this closes the old phase_timeline row with its
+        duration, opens the new one, resets the phase's agents and logs a
+        single PHASE_TRANSITION event.
+        """
+        now = timestamp or datetime.now().isoformat()
+
+        with self.transaction() as cursor:
+            cursor.execute("""
+                UPDATE projects SET current_phase = ?, updated_at = ?
+                WHERE id = ? AND current_phase = ?
+            """, (to_phase, now, project_id, from_phase))
+            if cursor.rowcount != 1:
+                return False
+
+            # Close the finished phase; phase 1 falls back to the project start
+            cursor.execute("""
+                SELECT pt.started_at, p.started_at AS project_started_at
+                FROM projects p
+                LEFT JOIN phase_timeline pt
+                    ON pt.project_id = p.id AND pt.phase_number = ?
+                WHERE p.id = ?
+            """, (from_phase, project_id))
+            row = cursor.fetchone()
+            started_at = row[0] or (row[1] if from_phase == 1 else None)
+            duration = None
+            if started_at:
+                # None (stored as NULL) for an unparseable start or one that
+                # cannot be compared with now, e.g. an imported UTC timestamp
+                minutes = _minutes_between(started_at, now)
+                duration = None if minutes is None else int(minutes)
+
+            cursor.execute("""
+                INSERT INTO phase_timeline (project_id, phase_number, started_at, completed_at, duration_minutes)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (project_id, phase_number) DO UPDATE SET
+                    completed_at = excluded.completed_at,
+                    duration_minutes = excluded.duration_minutes
+            """, (project_id, from_phase, started_at, now, duration))
+            if duration is not None:
+                self._record_duration(cursor, PHASE, str(from_phase), duration)
+
+            # Open the new phase (re-entering a phase restarts its clock)
+            cursor.execute("""
+                INSERT INTO phase_timeline (project_id, phase_number, started_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (project_id, phase_number) DO UPDATE SET
+                    started_at = excluded.started_at,
+                    completed_at = NULL,
+                    duration_minutes = NULL
+            """, (project_id, to_phase, now))
+
+            cursor.executemany("""
+                UPDATE agents SET status = 'IN_PROGRESS', progress = '0%', updated_at = ?, last_update = ?
+                WHERE project_id = ? AND name = ?
+            """, [(now, now, project_id, agent) for agent in phase_agents])
+
+            self._insert_event(cursor, project_id, None, "PHASE_TRANSITION", {
+                "from_phase": from_phase,
+                "to_phase": to_phase,
+                "agents": phase_agents,
+                "duration_minutes": duration,
+            })
+
+        return True
+
+    # ------------------------------------------------------------------
+    # Job queue
+    #
+    # Jobs move QUEUED -> RUNNING -> COMPLETED | FAILED. A claim grants the
+    # worker a lease (epoch seconds) that it must renew with heartbeat_job().
+    # Expired leases are reclaimed on every claim, so a crashed worker's job
+    # is retried (or failed after max_attempts) and its agent never stays
+    # IN_PROGRESS. Worker clocks are assumed to be roughly in sync.
+    # ------------------------------------------------------------------
+
+    @instrumented("enqueue_job")
+    def enqueue_job(self, project_id: int, agent_name: str, payload: Optional[Dict] = None,
+                    priority: int = 0, max_attempts: int = 3) -> int:
+        """Queue a unit of work for an agent"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO jobs (project_id, agent_name, payload, priority, max_attempts)
+                VALUES (?, ?, ?, ?, ?)
+            """, (project_id, agent_name, json.dumps(payload or {}), priority, max_attempts))
+            conn.commit()
+            return cursor.lastrowid
+
+    @instrumented("claim_job")
+    def claim_job(self, worker_id: str, lease_seconds: float = 60.0,
+                  project_id: Optional[int] = None) -> Optional[Dict]:
+        """Atomically claim the next queued job, or return None if the queue is empty"""
+        now = time.time()
+        with self.transaction() as cursor:
+            self._reclaim_expired(cursor, now)
+
+            if project_id is None:
+                cursor.execute("""
+                    SELECT id FROM jobs WHERE status = 'QUEUED'
+                    ORDER BY priority DESC, id LIMIT 1
+                """)
+            else:
+                cursor.execute("""
+                    SELECT id FROM jobs WHERE status = 'QUEUED' AND project_id = ?
+                    ORDER BY priority DESC, id LIMIT 1
+                """, (project_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+
+            started_at = datetime.now().isoformat()
+            cursor.execute("""
+                UPDATE jobs SET status = 'RUNNING', worker_id = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, started_at = ?
+                WHERE id = ?
+            """, (worker_id, now + lease_seconds, started_at, row[0]))
+            cursor.execute("SELECT * FROM jobs WHERE id = ?", (row[0],))
+            job = dict(cursor.fetchone())
+
+            cursor.execute("""
+                UPDATE agents SET status = 'IN_PROGRESS', updated_at = ?, last_update = ?
+                WHERE project_id = ? AND name = ?
+            """, (started_at, started_at, job['project_id'], job['agent_name']))
+
+        job['payload'] = json.loads(job['payload']) if job['payload'] else {}
+        return job
+
+    @instrumented("heartbeat_job")
+    def heartbeat_job(self, job_id: int, worker_id: str, lease_seconds: float = 60.0) -> bool:
+        """Extend a lease; False means the lease was lost and the worker must stop"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE jobs SET lease_expires_at = ?
+                WHERE id = ? AND worker_id = ? AND status = 'RUNNING'
+            """, (time.time() + lease_seconds, job_id, worker_id))
+            conn.commit()
+            return cursor.rowcount == 1
+
+    @instrumented("complete_job")
+    def complete_job(self, job_id: int, worker_id: str, result: Optional[Dict] = None) -> bool:
+        """Finish a job and apply its outcome to the agent row
+
+        Agent fields (status, progress, todos_completed, todos_total, phase)
+        present in result are written to the agents row; status defaults to
+        COMPLETED and progress to 100%. Returns False if the lease was lost.
+        """
+        result = result or {}
+        now = datetime.now().isoformat()
+        with self.transaction() as cursor:
+            cursor.execute("""
+                UPDATE jobs SET status = 'COMPLETED', result = ?, completed_at = ?, lease_expires_at = NULL
+                WHERE id = ? AND worker_id = ? AND status = 'RUNNING'
+            """, (json.dumps(result), now, job_id, worker_id))
+            if cursor.rowcount != 1:
+                return False
+
+            cursor.execute("SELECT project_id, agent_name FROM jobs WHERE id = ?", (job_id,))
+            project_id, agent_name = cursor.fetchone()
+
+            updates = {"status": "COMPLETED", "progress": "100%"}
+            updates.update({k: result[k] for k in JOB_AGENT_FIELDS if k in result})
+            updates["updated_at"] = updates["last_update"] = now
+            fields = ", ".join(f"{k} = ?" for k in updates)
+            cursor.execute(f"""
+                UPDATE agents SET {fields}
+                WHERE project_id = ? AND name = ?
+            """, list(updates.values()) + [project_id, agent_name])
+
+            self._insert_event(cursor, project_id, agent_name, "JOB_COMPLETED", {
+                "job_id": job_id, "worker_id": worker_id, "status": updates["status"]})
+        return True
+
+    @instrumented("fail_job")
+    def fail_job(self, job_id: int, worker_id: str, error: str, retry: bool = True) -> bool:
+        """Release a job after an error; requeued while attempts remain"""
+        now = datetime.now().isoformat()
+        with self.transaction() as cursor:
+            cursor.execute("""
+                SELECT project_id, agent_name, attempts, max_attempts FROM jobs
+                WHERE id = ? AND worker_id = ? AND status = 'RUNNING'
+            """, (job_id, worker_id))
+            row = cursor.fetchone()
+            if not row:
+                return False
+            requeue = retry and row['attempts'] < row['max_attempts']
+            self._release_job(cursor, job_id, row['project_id'], row['agent_name'], requeue, error, now)
+        return True
+
+    @instrumented("reclaim_expired_jobs")
+    def reclaim_expired_jobs(self) -> int:
+        """Requeue or fail RUNNING jobs whose lease has expired"""
+        with self.transaction() as cursor:
+            return self._reclaim_expired(cursor, time.time())
+
+    def _reclaim_expired(self, cursor, now: float) -> int:
+        cursor.execute("""
+            SELECT id, project_id, agent_name, attempts, max_attempts FROM jobs
+            WHERE status = 'RUNNING' AND lease_expires_at < ?
+        """, (now,))
+        expired = cursor.fetchall()
+        timestamp = datetime.now().isoformat()
+        for row in expired:
+            self._release_job(cursor, row['id'], row['project_id'], row['agent_name'],
+                              row['attempts'] < row['max_attempts'], "lease expired", timestamp)
+        return len(expired)
+
+    def _release_job(self, cursor, job_id: int, project_id: int, agent_name: str,
+                     requeue: bool, error: str, now: str):
+        """Requeue (agent back to READY) or fail (agent BLOCKED) a running job"""
+        if requeue:
+            cursor.execute("""
+                UPDATE jobs SET status = 'QUEUED', worker_id = NULL, lease_expires_at = NULL, error = ?
+                WHERE id = ?
+            """, (error, job_id))
+        else:
+            cursor.execute("""
+                UPDATE jobs SET status = 'FAILED', lease_expires_at = NULL, error = ?, completed_at = ?
+                WHERE id = ?
+            """, (error, now, job_id))
+
+        # Leave the agent IN_PROGRESS only if another of its jobs is still running
+        cursor.execute("""
+            UPDATE agents SET status = ?, updated_at = ?, last_update = ?
+            WHERE project_id = ? AND name = ? AND NOT EXISTS (
+                SELECT 1 FROM jobs
+                WHERE project_id = ? AND agent_name = ? AND status = 'RUNNING'
+            )
+        """, ("READY" if requeue else "BLOCKED", now, now,
+              project_id, agent_name, project_id, agent_name))
+
+        self._insert_event(cursor, project_id, agent_name, "JOB_REQUEUED" if requeue else "JOB_FAILED",
+                           {"job_id": job_id, "error": error})
+
+    @instrumented("get_job")
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Get job by ID"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    @instrumented("get_jobs")
+    def get_jobs(self, project_id: int, status: Optional[str] = None) -> List[Dict]:
+        """Get jobs for a project, optionally filtered by status"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if status:
+                cursor.execute("""
+                    SELECT * FROM jobs WHERE project_id = ? AND status = ? ORDER BY id
+                """, (project_id, status))
+            else:
+                cursor.execute("SELECT * FROM jobs WHERE project_id = ? ORDER BY id", (project_id,))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("record_artifacts")
+    def record_artifacts(self, project_id: int, phase_number: int, artifacts: Dict[str, Tuple[str, int]]) -> int:
+        """Record {path: (digest, size)} for a phase; returns how many changed
+
+        Paths already recorded with the same digest are left untouched, so
+        re-recording an unchanged phase writes nothing but the event.
+        """
+        now = datetime.now().isoformat()
+        with self.transaction() as cursor:
+            cursor.execute("""
+                SELECT path, digest FROM artifacts WHERE project_id = ? AND phase_number = ?
+            """, (project_id, phase_number))
+            known = {row['path']: row['digest'] for row in cursor.fetchall()}
+            changed = [(project_id, phase_number, path, digest, size, now)
+                       for path, (digest, size) in artifacts.items() if known.get(path) != digest]
+            cursor.executemany("""
+                INSERT INTO artifacts (project_id, phase_number, path, digest, size, recorded_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (project_id, phase_number, path) DO UPDATE SET
+                    digest = excluded.digest,
+                    size = excluded.size,
+                    recorded_at = excluded.recorded_at
+            """, changed)
+            self._insert_event(cursor, project_id, None, "ARTIFACTS_RECORDED", {
+                "phase": phase_number, "count": len(artifacts), "changed": len(changed)})
+        return len(changed)
+
+    @instrumented("get_artifacts")
+    def get_artifacts(self, project_id: int, phase_number: Optional[int] = None) -> List[Dict]:
+        """Recorded artifacts for a project, optionally for one phase"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if phase_number is None:
+                cursor.execute("""
+                    SELECT * FROM artifacts WHERE project_id = ? ORDER BY phase_number, path
+                """, (project_id,))
+            else:
+                cursor.execute("""
+                    SELECT * FROM artifacts WHERE project_id = ? AND phase_number = ? ORDER BY path
+                """, (project_id, phase_number))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("record_validation_run")
+    def record_validation_run(self, project_id: int, run: Dict) -> int:
+        """Store a ValidationRun.to_dict() and its checks; returns the run ID"""
+        with self.transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO validation_runs
+                    (project_id, phase_number, success, error_count, duration_seconds, bytes_read, started_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (project_id, run["phase"], int(run["success"]), len(run["errors"]),
+                  run["duration_seconds"], run["bytes_read"], run["started_at"]))
+            run_id = cursor.lastrowid
+            cursor.executemany("""
+                INSERT INTO validation_checks
+                    (run_id, check_id, status, cached, duration_seconds, bytes_read, errors)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [(run_id, check["id"], check["status"], int(check["cached"]), check["duration_seconds"],
+                   check["bytes_read"], json.dumps(check["errors"]) if check["errors"] else None)
+                  for check in run["checks"]])
+        return run_id
+
+    @instrumented("get_validation_runs")
+    def get_validation_runs(self, project_id: int, phase_number: Optional[int] = None,
+                            limit: int = 20) -> List[Dict]:
+        """Most recent validation runs, newest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if phase_number is None:
+                cursor.execute("""
+                    SELECT * FROM validation_runs WHERE project_id = ? ORDER BY id DESC LIMIT ?
+                """, (project_id, limit))
+            else:
+                cursor.execute("""
+                    SELECT * FROM validation_runs WHERE project_id = ? AND phase_number = ?
+                    ORDER BY id DESC LIMIT ?
+                """, (project_id, phase_number, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("get_check_costs")
+    def get_check_costs(self, project_id: int, limit: int = 10) -> List[Dict]:
+        """Checks ranked by mean uncached duration: where validation time goes"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT c.check_id,
+                       COUNT(*) AS runs,
+                       AVG(c.duration_seconds) AS mean_seconds,
+                       MAX(c.duration_seconds) AS max_seconds,
+                       AVG(c.bytes_read) AS mean_bytes_read,
+                       SUM(c.status = 'FAILED') AS failures
+                FROM validation_checks c
+                JOIN validation_runs r ON r.id = c.run_id
+                WHERE r.project_id = ? AND c.cached = 0
+                GROUP BY c.check_id
+                ORDER BY mean_seconds DESC
+                LIMIT ?
+            """, (project_id, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("get_duration_stats")
+    def get_duration_stats(self) -> Histograms:
+        """All duration histograms: {(scope, key): {bucket: count}}"""
+        histograms: Histograms = {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT scope, key, bucket, count FROM duration_stats WHERE count > 0")
+            for row in cursor.fetchall():
+                histograms.setdefault((row[0], row[1]), {})[row[2]] = row[3]
+        return histograms
+
+    @instrumented("record_dead_letters")
+    def record_dead_letters(self, endpoint: str, events: List[Dict], error: str, attempts: int) -> int:
+        """Park an undeliverable webhook batch; logs no event, which would be
+        dispatched again"""
+        with self.transaction() as cursor:
+            cursor.execute("""
+                INSERT INTO webhook_dead_letters (endpoint, event_count, payload, error, attempts)
+                VALUES (?, ?, ?, ?, ?)
+            """, (endpoint, len(events), json.dumps(events), error, attempts))
+            return cursor.lastrowid
+
+    @instrumented("get_dead_letters")
+    def get_dead_letters(self, endpoint: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """Dead-lettered webhook batches, newest first"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            if endpoint is None:
+                cursor.execute("SELECT * FROM webhook_dead_letters ORDER BY id DESC LIMIT ?", (limit,))
+            else:
+                cursor.execute("""
+                    SELECT * FROM webhook_dead_letters WHERE endpoint = ? ORDER BY id DESC LIMIT ?
+                """, (endpoint, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+    @instrumented("get_phase_timeline")
     def get_phase_timeline(self, project_id: int) -> List[Dict]:
         """Get phase timeline for a project"""
         with self.get_connection() as conn:
@@ -290,6 +1279,7 @@ class Database:
             """, (project_id,))
             return [dict(row) for row in cursor.fetchall()]
 
+    @instrumented("export_to_json")
     def export_to_json(self, project_id: int) -> Dict:
         """Export project to JSON format (compatible with old SHARED_CONTEXT.json)"""
         project = self.get_project(project_id)
@@ -331,12 +1321,16 @@ class Database:
             "overall_progress": project['overall_progress']
         }
 
-    def import_from_json(self, json_data: Dict) -> int:
+    @instrumented("import_from_json")
+    def import_from_json(self, json_data: Dict, project_id: Optional[int] = None) -> int:
         """Import project from JSON format (migrate from SHARED_CONTEXT.json)"""
         # Create project
+        agents_data = json_data.get("agents", {})
         project_id = self.create_project(
             name=json_data.get("project", "Imported Project"),
-            version=json_data.get("version", "1.0.0")
+            version=json_data.get("version", "1.0.0"),
+            agents=list(agents_data) or None,
+            project_id=project_id
         )
 
         # Update project fields
@@ -350,7 +1344,6 @@ class Database:
         self.update_project(project_id, updates)
 
         # Update agents
-        agents_data = json_data.get("agents", {})
         for agent_name, agent_info in agents_data.items():
             self.update_agent(project_id, agent_name, {
                 "phase": agent_info.get("phase", "WAITING"),
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+In-process event bus
+Database publishes every audit event here once its transaction commits;
+subscribers filter by event type, agent and project. Delivery is
+synchronous on the writer's thread, so subscribers must be quick (hand
+work to a queue, as webhooks.py does) and their errors are contained.
+"""
+
+import sys
+import threading
+import traceback
+from typing import Callable, Dict, Iterable, List, Optional
+
+from metrics import registry as metrics
+
+
+class Event:
+    """A committed audit event"""
+
+    __slots__ = ("id", "project_id", "agent_name", "event_type", "data", "timestamp")
+
+    def __init__(self, id: int, project_id: int, agent_name: Optional[str], event_type: str,
+                 data, timestamp: str):
+        self.id = id
+        self.project_id = project_id
+        self.agent_name = agent_name
+        self.event_type = event_type
+        self.data = data
+        self.timestamp = timestamp  # "YYYY-MM-DD HH:MM:SS" UTC, as get_events() returns it
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "project_id": self.project_id,
+            "agent_name": self.agent_name,
+            "event_type": self.event_type,
+            "data": self.data,
+            "timestamp": self.timestamp,
+        }
+
+
+Handler = Callable[[Event], None]
+
+
+class Subscription:
+    """Handler plus the events it wants; None means any"""
+
+    __slots__ = ("handler", "event_types", "agents", "project_id")
+
+    def __init__(self, handler: Handler, event_types: Optional[Iterable[str]] = None,
+                 agents: Optional[Iterable[str]] = None, project_id: Optional[int] = None):
+        self.handler = handler
+        self.event_types = frozenset(event_types) if event_types is not None else None
+        self.agents = frozenset(agents) if agents is not None else None
+        self.project_id = project_id
+
+    def matches(self, event: Event) -> bool:
+        return ((self.event_types is None or event.event_type in self.event_types)
+                and (self.agents is None or event.agent_name in self.agents)
+                and (self.project_id is None or event.project_id == self.project_id))
+
+
+class EventBus:
+    """Publish/subscribe for committed events"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced, never mutated, so publish() iterates without locking
+        self._subscriptions: tuple = ()
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone listens; publishers skip building events otherwise"""
+        return bool(self._subscriptions)
+
+    def subscribe(self, handler: Handler, event_types: Optional[Iterable[str]] = None,
+                  agents: Optional[Iterable[str]] = None, project_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(handler, event_types, agents, project_id)
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+
+    def publish(self, events: List[Event]):
+        """Deliver events in order; a failing handler never reaches the publisher"""
+        subscriptions = self._subscriptions
+        for event in events:
+            for subscription in subscriptions:
+                if not subscription.matches(event):
+                    continue
+                try:
+                    subscription.handler(event)
+                except Exception:
+                    metrics.inc("orchestrator_event_handler_errors_total", event_type=event.event_type)
+                    traceback.print_exc(file=sys.stderr)
+
+
+# Process-wide bus that Database publishes to
+bus = EventBus()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Compact payload encoding for the events table
+Payload keys, agent names, event types and enum-like values (IN_PROGRESS,
+EXECUTING, ...) are interned as integer symbol IDs and ISO timestamps are
+stored as integers, so a typical event payload shrinks to a short JSON
+array; large payloads are zlib-compressed. Decoding reproduces
+json.dumps(data) of the original payload exactly.
+"""
+
+import json
+import re
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+# One-byte tag in front of every stored payload
+PLAIN = b"j"   # json.dumps(data) verbatim (non-object payloads, non-string keys)
+KEYED = b"k"   # JSON array of (code, value) pairs with interned keys, see below
+ZLIB = b"z"    # zlib-compressed KEYED body
+
+# Encoded bodies at least this long are compressed (when that helps)
+ZLIB_THRESHOLD = 256
+
+# KEYED entries are [key_id * 4 + kind, value]
+RAW = 0      # value as is
+SYMBOL = 1   # value is the symbol ID of an enum-like string
+TIME = 2     # naive ISO timestamp as microseconds since the epoch; after the
+             # first one in a payload, as a delta from the previous one
+_KINDS = 4
+
+# String values worth encoding: short upper-case enums (interned like keys,
+# never free text) and ISO timestamps; one match classifies a value
+_VALUE_RE = re.compile(r"(?P<enum>[A-Z][A-Z0-9_]{0,31})|\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{6})?")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+_COMPACT = {"separators": (",", ":"), "ensure_ascii": False}
+
+
+class EventCodecError(ValueError):
+    """Raised when a stored payload cannot be decoded"""
+    pass
+
+
+def _iso_micros(value: str) -> Optional[int]:
+    """Microseconds since the epoch, if value is exactly datetime.isoformat()"""
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.isoformat() != value:
+        return None
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def encode_payload(data: Any, symbol_id: Callable[[str], int]) -> bytes:
+    """Encode an event payload
+
+    KEYED layout: [code, value, code, value, ...] with code = key symbol ID
+    * 4 + kind (RAW, SYMBOL or TIME).
+    """
+    if not isinstance(data, dict) or not all(isinstance(k, str) for k in data):
+        return PLAIN + json.dumps(data).encode()
+    items = []
+    previous_time = None
+    for key, value in data.items():
+        kind = RAW
+        match = _VALUE_RE.fullmatch(value) if type(value) is str else None
+        if match is not None:
+            if match.lastgroup == "enum":
+                kind, value = SYMBOL, symbol_id(value)
+            else:
+                micros = _iso_micros(value)
+                if micros is not None:
+                    kind = TIME
+                    value = micros if previous_time is None else micros - previous_time
+                    previous_time = micros
+        items.append(symbol_id(key) * _KINDS + kind)
+        items.append(value)
+    body = json.dumps(items, **_COMPACT).encode()
+    if len(body) >= ZLIB_THRESHOLD:
+        packed = zlib.compress(body, 6)
+        if len(packed) < len(body):
+            return ZLIB + packed
+    return KEYED + body
+
+
+def decode_payload(blob: Optional[bytes], symbol_name: Callable[[int], str]) -> Optional[str]:
+    """JSON text of a stored payload, as json.dumps() of the original"""
+    if blob is None:
+        return None
+    if blob[:1] == PLAIN:
+        return blob[1:].decode()
+    return json.dumps(decode_fields(blob, symbol_name))
+
+
+def decode_fields(blob: Optional[bytes], symbol_name: Callable[[int], str]) -> Any:
+    """The original payload object of a stored payload"""
+    if blob is None:
+        return None
+    tag, body = blob[:1], blob[1:]
+    if tag == PLAIN:
+        return json.loads(body)
+    if tag == ZLIB:
+        body = zlib.decompress(body)
+    elif tag != KEYED:
+        raise EventCodecError(f"Unknown event payload tag {tag!r}")
+    items = json.loads(body)
+    data: Dict[str, Any] = {}
+    previous_time = None
+    for i in range(0, len(items), 2):
+        key_id, kind = divmod(items[i], _KINDS)
+        value = items[i + 1]
+        if kind == SYMBOL:
+            value = symbol_name(value)
+        elif kind == TIME:
+            if previous_time is not None:
+                value += previous_time
+            previous_time = value
+            value = (_EPOCH + value * _MICROSECOND).isoformat()
+        data[symbol_name(key_id)] = value
+    return data
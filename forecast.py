@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Phase duration forecasting
+Durations of completed phases and agent runs are kept as log-bucketed
+histograms (one row per bucket in the duration_stats table), updated in
+place as each phase completes or agent report arrives. Medians and p90s
+are read off the buckets, so a forecast never rescans project history.
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+# Each bucket spans 10% more than the previous one: quantiles are within ~5%
+BUCKET_GROWTH = 1.1
+_LOG_GROWTH = math.log(BUCKET_GROWTH)
+
+PHASE = "phase"
+AGENT = "agent"
+
+# The estimates printed in the phase instructions, used until there is history
+BASELINE_MINUTES = {
+    1: 25,
+    2: 5,
+    3: 18 * 24 * 60,
+    4: 5 * 24 * 60,
+    5: 2 * 24 * 60,
+    6: 3 * 24 * 60,
+}
+
+# (scope, key) -> {bucket: count}
+Histograms = Dict[Tuple[str, str], Dict[int, int]]
+
+
+def bucket_of(minutes: float) -> int:
+    """Bucket 0 holds sub-minute durations; bucket i >= 1 holds
+    [GROWTH^(i-1), GROWTH^i) minutes"""
+    if minutes < 1:
+        return 0
+    return 1 + int(math.log(minutes) / _LOG_GROWTH)
+
+
+def bucket_value(bucket: int) -> float:
+    """Representative duration of a bucket (its geometric midpoint)"""
+    if bucket <= 0:
+        return 0.5
+    return BUCKET_GROWTH ** (bucket - 0.5)
+
+
+def agent_key(phase: int, agent: str) -> str:
+    return f"{phase}:{agent}"
+
+
+def quantile(counts: Dict[int, int], q: float) -> Optional[float]:
+    total = sum(counts.values())
+    if total <= 0:
+        return None
+    rank = q * total
+    seen = 0
+    for bucket in sorted(counts):
+        seen += counts[bucket]
+        if seen >= rank:
+            return bucket_value(bucket)
+    return bucket_value(max(counts))
+
+
+def format_minutes(minutes: Optional[float]) -> str:
+    if minutes is None:
+        return "?"
+    if minutes < 60:
+        return f"{minutes:.0f}m"
+    if minutes < 24 * 60:
+        hours, rest = divmod(round(minutes), 60)
+        return f"{hours}h {rest:02d}m" if rest else f"{hours}h"
+    return f"{minutes / (24 * 60):.1f}d"
+
+
+class Estimate:
+    """Median/p90 of one phase, and where the numbers came from"""
+
+    __slots__ = ("phase", "median", "p90", "samples", "source", "bottleneck")
+
+    def __init__(self, phase: int, median: float, p90: float, samples: int, source: str,
+                 bottleneck: Optional[str] = None):
+        self.phase = phase
+        self.median = median
+        self.p90 = p90
+        self.samples = samples
+        self.source = source  # "history", "agents" or "baseline"
+        self.bottleneck = bottleneck  # slowest agent of the phase, when known
+
+    def describe(self) -> str:
+        if self.source == "baseline":
+            return f"~{format_minutes(self.median)} (no history yet)"
+        spread = f"median {format_minutes(self.median)}, p90 {format_minutes(self.p90)}"
+        basis = "agent reports" if self.source == "agents" else "projects"
+        return f"{spread} over {self.samples} {basis}"
+
+
+class DurationStats:
+    """Read-only view over the duration histograms"""
+
+    def __init__(self, histograms: Histograms):
+        self.histograms = histograms
+
+    def summary(self, scope: str, key: str) -> Optional[Tuple[int, float, float]]:
+        """(samples, median, p90) or None without history"""
+        counts = self.histograms.get((scope, key))
+        if not counts:
+            return None
+        return (sum(counts.values()), quantile(counts, 0.5), quantile(counts, 0.9))
+
+    def estimate(self, phase: int, workers: Tuple[str, ...],
+                 baseline: Optional[float] = None) -> Optional[Estimate]:
+        """Phase history first; otherwise its agents run in parallel, so the
+        slowest agent's distribution bounds the phase"""
+        agents = [(agent, self.summary(AGENT, agent_key(phase, agent))) for agent in workers]
+        agents = [(agent, s) for agent, s in agents if s is not None]
+        bottleneck = max(agents, key=lambda item: item[1][1])[0] if agents else None
+
+        summary = self.summary(PHASE, str(phase))
+        if summary is not None:
+            return Estimate(phase, summary[1], summary[2], summary[0], "history", bottleneck)
+        if agents:
+            samples = min(s[0] for _, s in agents)
+            return Estimate(phase, max(s[1] for _, s in agents), max(s[2] for _, s in agents),
+                            samples, "agents", bottleneck)
+        if baseline is None:
+            return None
+        return Estimate(phase, baseline, baseline, 0, "baseline", bottleneck)
+
+
+class Forecast:
+    """Remaining time for a project from its current phase onwards"""
+
+    def __init__(self, current_phase: int, elapsed_minutes: float, estimates: List[Estimate]):
+        self.current_phase = current_phase
+        self.elapsed_minutes = elapsed_minutes
+        self.estimates = estimates
+
+    def _remaining(self, attr: str) -> float:
+        total = 0.0
+        for estimate in self.estimates:
+            minutes = getattr(estimate, attr)
+            if estimate.phase == self.current_phase:
+                minutes = max(minutes - self.elapsed_minutes, 0.0)
+            total += minutes
+        return total
+
+    @property
+    def remaining_median(self) -> float:
+        return self._remaining("median")
+
+    @property
+    def remaining_p90(self) -> float:
+        # Summing per-phase p90s is deliberately pessimistic
+        return self._remaining("p90")
+
+    def critical_path(self) -> List[str]:
+        """Phases are sequential; within one, the slowest agent gates it"""
+        return [f"Phase {e.phase}" + (f" ({e.bottleneck})" if e.bottleneck else "") for e in self.estimates]
+
+    def format_lines(self) -> List[str]:
+        if not self.estimates:
+            return ["No remaining phases"]
+        lines = [f"Remaining: ~{format_minutes(self.remaining_median)} "
+                 f"(p90 {format_minutes(self.remaining_p90)})"]
+        for estimate in self.estimates:
+            note = f", {format_minutes(self.elapsed_minutes)} elapsed" if estimate.phase == self.current_phase else ""
+            lines.append(f"  Phase {estimate.phase}: {estimate.describe()}{note}")
+        lines.append("Critical path: " + " -> ".join(self.critical_path()))
+        return lines
+
+
+def forecast(phase_workers: Dict[int, Tuple[str, ...]], current_phase: int,
+             elapsed_minutes: float, stats: DurationStats,
+             baselines: Optional[Dict[int, float]] = None) -> Forecast:
+    """Forecast the current phase and every later one
+
+    baselines: fallback minutes for phases without history (for the
+    built-in phases, BASELINE_MINUTES).
+    """
+    baselines = baselines or {}
+    estimates = []
+    for phase in sorted(phase_workers):
+        if phase < current_phase:
+            continue
+        estimate = stats.estimate(phase, phase_workers[phase], baselines.get(phase))
+        if estimate is not None:
+            estimates.append(estimate)
+    return Forecast(current_phase, elapsed_minutes, estimates)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Agent job worker
+Claims jobs from the orchestrator database queue, keeps their lease alive
+while a handler runs, and reports the result back to the agent row
+"""
+
+import importlib
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from sharding import open_database
+
+Handler = Callable[[Dict], Optional[Dict]]
+
+
+def sleep_handler(job: Dict) -> Dict:
+    """Demo handler: sleeps payload['seconds'] and returns payload['result']"""
+    time.sleep(float(job["payload"].get("seconds", 0)))
+    return job["payload"].get("result", {})
+
+
+def load_handler(spec: str) -> Handler:
+    """Resolve a 'module:function' handler reference"""
+    module_name, _, func_name = spec.partition(":")
+    if not func_name:
+        raise ValueError(f"Handler must look like module:function, got '{spec}'")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+class JobWorker:
+    """Runs queued jobs one at a time with a background lease heartbeat"""
+
+    def __init__(self, db_path: str, handler: Handler, worker_id: Optional[str] = None,
+                 lease_seconds: float = 30.0, poll_interval: float = 0.5,
+                 project_id: Optional[int] = None):
+        self.db = open_database(db_path)
+        self.handler = handler
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.project_id = project_id
+        self.completed = 0
+        self.failed = 0
+
+    def run(self, max_jobs: Optional[int] = None, drain: bool = False):
+        """Process jobs until max_jobs are done, or the queue is empty when drain=True"""
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self.db.claim_job(self.worker_id, self.lease_seconds, self.project_id)
+            if job is None:
+                if drain:
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            self.run_job(job)
+            processed += 1
+
+    def run_job(self, job: Dict):
+        lost = threading.Event()
+        done = threading.Event()
+
+        def heartbeat():
+            interval = self.lease_seconds / 3
+            while not done.wait(interval):
+                if not self.db.heartbeat_job(job["id"], self.worker_id, self.lease_seconds):
+                    lost.set()
+                    return
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        try:
+            result = self.handler(job)
+        except Exception as e:
+            done.set()
+            beat.join()
+            self.db.fail_job(job["id"], self.worker_id, f"{type(e).__name__}: {e}")
+            self.failed += 1
+            return
+        done.set()
+        beat.join()
+
+        # A lost lease means the job was reclaimed; its result is discarded
+        if not lost.is_set() and self.db.complete_job(job["id"], self.worker_id, result):
+            self.completed += 1
+
+
+def _worker_main(db_path: str, handler_spec: str, lease_seconds: float, drain: bool):
+    worker = JobWorker(db_path, load_handler(handler_spec), lease_seconds=lease_seconds)
+    worker.run(drain=drain)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run agent job workers against the orchestrator database")
+    parser.add_argument("--db", default="orchestrator.db",
+                        help="Database file, or a sharded storage directory (default: orchestrator.db)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes to start")
+    parser.add_argument("--handler", default="job_worker:sleep_handler", help="module:function to run per job")
+    parser.add_argument("--lease", type=float, default=30.0, help="Lease length in seconds")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    procs = [
+        multiprocessing.Process(target=_worker_main, args=(args.db, args.handler, args.lease, args.drain))
+        for _ in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    print(f"✅ {args.workers} worker(s) finished in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
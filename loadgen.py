@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Multi-process load generator for orchestrator state
+Starts N simulated agent processes against one shared project (SQLite
+orchestrator.db or SHARED_CONTEXT.json) and reports throughput, p50/p99
+latency, lock-wait time and lost updates per operation. Failed operations
+are reported as errors and excluded from throughput and latency; reads the
+state file could not parse count as corruption.
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from metrics import registry as metrics
+from orchestrator import ProjectOrchestrator
+
+MODES = ("sqlite", "json")
+
+# update: read own agent, then update_agent_status (the lost-update probe)
+# event: Database.log_event (SQLite mode only; JSON mode keeps no event log)
+# transition: compare-and-set to the next phase, without phase validation
+# status: the --status report
+OPERATIONS = ("update", "event", "transition", "status")
+DEFAULT_MIX = "update=60,event=20,transition=5,status=15"
+
+PHASES = 6
+STATE_FILES = {"sqlite": "orchestrator.db", "json": "SHARED_CONTEXT.json"}
+LOCK_WAIT_METRICS = ("orchestrator_db_lock_wait_seconds", "orchestrator_context_lock_wait_seconds")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """"update=60,status=40" -> {operation: weight}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid weight for '{name}': {weight!r}")
+        if mix[name] < 0:
+            raise argparse.ArgumentTypeError(f"negative weight for '{name}'")
+    if not any(mix.values()):
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return mix
+
+
+def agent_name(index: int) -> str:
+    return f"load-{index:03d}"
+
+
+def percentile(ordered: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+# ----------------------------------------------------------------------------
+# Project setup
+# ----------------------------------------------------------------------------
+
+def prepare_project(root: Path, mode: str, workers: int):
+    """Fresh project with one agent per worker, so each worker's agent row
+    has a single writer and any other change to it is a lost update"""
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    agents = [agent_name(i) for i in range(workers)]
+    lines = ["orchestration:", "  agents:"]
+    lines += [f"    - {agent}" for agent in agents]
+    lines.append("  phases:")
+    lines += [f"    - {{number: {n}, name: \"Load phase {n}\", agents: [{', '.join(agents)}]}}"
+              for n in range(1, PHASES + 1)]
+    (root / "project-description.yaml").write_text("\n".join(lines) + "\n")
+    orchestrator = ProjectOrchestrator(str(root), use_database=(mode == "sqlite"))
+    try:
+        orchestrator.initialize_context()
+    finally:
+        orchestrator.close()
+
+
+# ----------------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------------
+
+def run_worker(index: int, root: str, mode: str, mix: Dict[str, float], rate: float,
+               duration: float, seed: int, barrier, results):
+    """One simulated agent; puts its raw samples on the results queue"""
+    metrics.enable()
+    rng = random.Random(seed + index)
+    operations = [op for op in OPERATIONS if mix.get(op)]
+    weights = [mix[op] for op in operations]
+    agent = agent_name(index)
+    latencies: Dict[str, List[float]] = {op: [] for op in operations}
+    errors: Dict[str, int] = {op: 0 for op in operations}
+    first_errors: Dict[str, str] = {}
+    written = 0  # last todos_completed this worker stored for its agent
+    lost = 0
+    conflicts = 0
+    corrupt = 0  # reads that found unparseable state
+    readback_failed = 0
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        orchestrator = ProjectOrchestrator(root, use_database=(mode == "sqlite"))
+        project_id = orchestrator._active_project_id() if orchestrator.use_database else None
+        barrier.wait()
+
+        start = time.perf_counter()
+        deadline = start + duration
+        n = 0
+        while True:
+            # Open loop at a fixed rate: latency counts from the scheduled
+            # start, so a stalled process is not hidden by sending less
+            scheduled = start + n / rate if rate else time.perf_counter()
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            op = rng.choices(operations, weights)[0]
+            try:
+                if op == "update":
+                    seen = orchestrator.get_agent_status(agent).get("todos_completed")
+                    if seen != written:
+                        lost += 1
+                    orchestrator.update_agent_status(agent, {
+                        "status": "IN_PROGRESS", "todos_completed": written + 1})
+                    written += 1
+                elif op == "event":
+                    orchestrator.db.log_event(project_id, agent, "LOAD_TEST", {"worker": index, "seq": n})
+                elif op == "transition":
+                    phase = orchestrator.load_context()["current_phase"]
+                    if not orchestrator.commit_transition(phase, phase % PHASES + 1):
+                        conflicts += 1
+                else:
+                    orchestrator.print_status()
+            except Exception as e:
+                errors[op] += 1
+                corrupt += isinstance(e, json.JSONDecodeError)
+                first_errors.setdefault(op, f"{type(e).__name__}: {e}")
+            else:
+                latencies[op].append(time.perf_counter() - scheduled)
+            n += 1
+        elapsed = time.perf_counter() - start
+
+        # The last update can be lost too
+        try:
+            if orchestrator.get_agent_status(agent).get("todos_completed") != written:
+                lost += 1
+        except Exception as e:
+            readback_failed += 1
+            corrupt += isinstance(e, json.JSONDecodeError)
+        orchestrator.close()
+
+    lock_wait = 0.0
+    histograms = metrics.snapshot()["histograms"]
+    for name in LOCK_WAIT_METRICS:
+        lock_wait += sum(series["sum"] for series in histograms.get(name, []))
+
+    results.put({
+        "worker": index,
+        "elapsed": elapsed,
+        "latencies": latencies,
+        "errors": errors,
+        "first_errors": first_errors,
+        "lost_updates": lost,
+        "readback_failures": readback_failed,
+        "corrupt_reads": corrupt,
+        "updates": written,
+        "conflicts": conflicts,
+        "lock_wait_seconds": lock_wait,
+    })
+
+
+# ----------------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------------
+
+def state_intact(root: Path, mode: str) -> bool:
+    """Whether the shared state is still readable after the run"""
+    path = root / STATE_FILES[mode]
+    try:
+        if mode == "json":
+            json.loads(path.read_text())
+            return True
+        with contextlib.closing(sqlite3.connect(str(path))) as conn:
+            return conn.execute("PRAGMA quick_check").fetchone()[0] == "ok"
+    except (OSError, ValueError, sqlite3.Error):
+        return False
+
+
+def run_mode(mode: str, root: Path, workers: int, mix: Dict[str, float], rate: float,
+             duration: float, seed: int) -> Dict:
+    """Run one load test and aggregate the workers' samples"""
+    if mode == "json" and mix.get("event"):
+        print("⚠️  JSON mode keeps no event log; 'event' operations are skipped")
+        mix = {op: w for op, w in mix.items() if op != "event"}
+    prepare_project(root, mode, workers)
+
+    barrier = multiprocessing.Barrier(workers)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=run_worker, args=(
+        i, str(root), mode, mix, rate, duration, seed, barrier, results)) for i in range(workers)]
+    for process in processes:
+        process.start()
+    # Drain before joining: a child blocks on exit until its results are read
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    wall = max(sample["elapsed"] for sample in samples)
+    operations = {}
+    total_ops = 0
+    for op in OPERATIONS:
+        # Successful operations only; failures are counted, not timed
+        timings = sorted(t for sample in samples for t in sample["latencies"].get(op, ()))
+        op_errors = sum(sample["errors"].get(op, 0) for sample in samples)
+        if not timings and not op_errors:
+            continue
+        total_ops += len(timings)
+        operations[op] = {
+            "ops": len(timings),
+            "ops_per_sec": len(timings) / wall,
+            "p50_ms": percentile(timings, 0.50) * 1000,
+            "p99_ms": percentile(timings, 0.99) * 1000,
+            "max_ms": timings[-1] * 1000 if timings else 0.0,
+            "errors": op_errors,
+        }
+        first = next((sample["first_errors"][op] for sample in samples if op in sample["first_errors"]), None)
+        if first:
+            operations[op]["first_error"] = first
+    return {
+        "mode": mode,
+        "workers": workers,
+        "duration_seconds": wall,
+        "ops": total_ops,
+        "ops_per_sec": total_ops / wall if wall else 0.0,
+        "errors": sum(stats["errors"] for stats in operations.values()),
+        "operations": operations,
+        "lock_wait_seconds": sum(sample["lock_wait_seconds"] for sample in samples),
+        "updates": sum(sample["updates"] for sample in samples),
+        "lost_updates": sum(sample["lost_updates"] for sample in samples),
+        "readback_failures": sum(sample["readback_failures"] for sample in samples),
+        "corrupt_reads": sum(sample["corrupt_reads"] for sample in samples),
+        "state_intact": state_intact(root, mode),
+        "transition_conflicts": sum(sample["conflicts"] for sample in samples),
+    }
+
+
+def print_report(report: Dict):
+    print(f"\n📊 {report['mode']}: {report['workers']} workers, {report['duration_seconds']:.1f}s, "
+          f"{report['ops']} ops ({report['ops_per_sec']:.0f}/s)")
+    print(f"  {'operation':<12} {'ops':>8} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for op, stats in report["operations"].items():
+        print(f"  {op:<12} {stats['ops']:>8} {stats['ops_per_sec']:>9.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['max_ms']:>9.2f} {stats['errors']:>7}")
+        if "first_error" in stats:
+            print(f"    first error: {stats['first_error']}")
+    # Time to acquire BEGIN IMMEDIATE / the context flock; waits inside
+    # implicit SQLite transactions show up in the operation latencies instead
+    print(f"  Lock wait: {report['lock_wait_seconds']:.3f}s total across workers")
+    print(f"  Transition conflicts: {report['transition_conflicts']}")
+    state_file = STATE_FILES[report["mode"]]
+    if report["errors"]:
+        print(f"  ❌ Errors: {report['errors']} operations failed (excluded from ops/s and latency)")
+    if report["corrupt_reads"]:
+        print(f"  ❌ Corruption: {report['corrupt_reads']} reads found {state_file} unparseable")
+    if not report["state_intact"]:
+        print(f"  ❌ Corruption: {state_file} is unreadable after the run")
+    # Without a clean read-back, "no lost updates" would be unproven
+    clean = not (report["lost_updates"] or report["readback_failures"] or report["errors"])
+    readback = (f", {report['readback_failures']} final read-backs failed"
+                if report["readback_failures"] else "")
+    print(f"  {'✅' if clean else '❌'} Lost updates: {report['lost_updates']} detected over "
+          f"{report['updates']} updates{readback}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive concurrent agent load against orchestrator state")
+    parser.add_argument("--mode", choices=MODES + ("both",), default="both",
+                        help="Storage backend to load (default: both)")
+    parser.add_argument("--workers", type=int, default=8, help="Simulated agent processes (default: 8)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run (default: 10)")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Operations per second per worker; 0 = as fast as possible (default)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f"Operation weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workdir", help="Keep the load-test projects in this directory")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if args.workers < 1 or args.duration <= 0 or args.rate < 0:
+        parser.error("--workers and --duration must be positive and --rate non-negative")
+
+    own_workdir = args.workdir is None
+    workdir = Path(tempfile.mkdtemp(prefix="orchestrator-load-")) if own_workdir else Path(args.workdir)
+    modes = MODES if args.mode == "both" else (args.mode,)
+    reports = []
+    try:
+        for mode in modes:
+            print(f"⏱  {mode}: {args.workers} workers for {args.duration:g}s...")
+            report = run_mode(mode, workdir / mode, args.workers, args.mix, args.rate,
+                              args.duration, args.seed)
+            print_report(report)
+            reports.append(report)
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"runs": reports}, indent=2))
+        print(f"\n✅ Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Metrics module for orchestrator instrumentation
+Per-operation counters and latency histograms with Prometheus text export
+"""
+
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Upper bounds (seconds) for latency histograms; tuned for SQLite and file I/O
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Metric metadata: name -> (type, help)
+METRIC_HELP = {
+    "orchestrator_db_operations_total": ("counter", "Database API calls by operation"),
+    "orchestrator_db_operation_seconds": ("histogram", "Wall time of a Database API call"),
+    "orchestrator_db_query_seconds": ("histogram", "Time spent executing SQL statements"),
+    "orchestrator_db_commit_seconds": ("histogram", "Time spent committing transactions"),
+    "orchestrator_db_lock_wait_seconds": ("histogram", "Time spent waiting for the database write lock"),
+    "orchestrator_db_rows_total": ("counter", "Rows written or fetched by operation"),
+    "orchestrator_command_seconds": ("histogram", "Wall time of orchestrator commands"),
+    "orchestrator_phase_transitions_total": ("counter", "Phase transition attempts by outcome"),
+    "orchestrator_validation_seconds": ("histogram", "Wall time of a full phase validation"),
+    "orchestrator_validator_check_seconds": ("histogram", "Wall time of individual validator checks"),
+    "orchestrator_validation_errors_total": ("counter", "Validation errors reported by phase"),
+    "orchestrator_validation_cache_total": ("counter", "Validation check cache lookups by result"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class _Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ("buckets", "counts", "count", "total", "max")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile from bucket upper bounds"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _Timer:
+    """Context manager that observes elapsed time into a histogram"""
+
+    __slots__ = ("registry", "name", "labels", "start")
+
+    def __init__(self, registry: "MetricsRegistry", name: str, labels: Dict[str, str]):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class _NullTimer:
+    """No-op timer returned while collection is disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters and histograms"""
+
+    def __init__(self, enabled: bool = False, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Drop all collected samples"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Increment a counter"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """Record a histogram observation"""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(self.buckets)
+            hist.observe(value)
+
+    def timer(self, name: str, **labels):
+        """Time a block into a histogram; a shared no-op when disabled"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name, labels)
+
+    def snapshot(self) -> Dict:
+        """Return a plain-dict copy of all series"""
+        with self._lock:
+            counters = {
+                name: [{"labels": dict(k), "value": v} for k, v in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {
+                name: [{
+                    "labels": dict(k),
+                    "count": h.count,
+                    "sum": h.total,
+                    "max": h.max,
+                    "p50": h.quantile(0.5),
+                    "p99": h.quantile(0.99),
+                } for k, h in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self) -> str:
+        """Render all series in Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted(self._counters):
+                self._header(lines, name, "counter")
+                for key, value in sorted(self._counters[name].items()):
+                    lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+
+            for name in sorted(self._histograms):
+                self._header(lines, name, "histogram")
+                for key, hist in sorted(self._histograms[name].items()):
+                    cumulative = 0
+                    for bound, n in zip(hist.buckets, hist.counts):
+                        cumulative += n
+                        bucket_key = key + (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(bucket_key)} {cumulative}")
+                    inf_key = key + (("le", "+Inf"),)
+                    lines.append(f"{name}_bucket{_format_labels(inf_key)} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {_format_value(hist.total)}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_prometheus(self, path: str):
+        """Atomically write the Prometheus text dump to a file"""
+        target = Path(path)
+        tmp = target.with_name(f".{target.name}.tmp")
+        tmp.write_text(self.render_prometheus())
+        os.replace(tmp, target)
+
+    def format_summary(self) -> str:
+        """Human-readable summary table for CLI dumps"""
+        snap = self.snapshot()
+        lines = []
+        for name in sorted(snap["histograms"]):
+            lines.append(name)
+            for s in sorted(snap["histograms"][name], key=lambda s: -s["sum"]):
+                label = _format_labels(tuple(sorted(s["labels"].items()))) or "{}"
+                lines.append(
+                    f"  {label:<48} n={s['count']:<7} total={s['sum'] * 1000:9.2f}ms "
+                    f"avg={s['sum'] / s['count'] * 1000:8.3f}ms p99<={s['p99'] * 1000:8.3f}ms "
+                    f"max={s['max'] * 1000:8.3f}ms"
+                )
+        for name in sorted(snap["counters"]):
+            lines.append(name)
+            for s in sorted(snap["counters"][name], key=lambda s: -s["value"]):
+                label = _format_labels(tuple(sorted(s["labels"].items()))) or "{}"
+                lines.append(f"  {label:<48} {_format_value(s['value'])}")
+        return "\n".join(lines) if lines else "(no metrics collected)"
+
+    @staticmethod
+    def _header(lines: List[str], name: str, metric_type: str):
+        help_text = METRIC_HELP.get(name, (metric_type, name))[1]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+
+def _format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    parts = []
+    for k, v in key:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Process-wide registry; enable with ORCHESTRATOR_METRICS=1 or the --metrics flag
+registry = MetricsRegistry(enabled=os.environ.get("ORCHESTRATOR_METRICS", "") not in ("", "0"))
+
+_local = threading.local()
+
+
+def current_operation() -> str:
+    """Name of the Database operation running on this thread"""
+    return getattr(_local, "operation", "other")
+
+
+def instrumented(operation: str):
+    """Decorator that counts and times a Database API call"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            outer = getattr(_local, "operation", None)
+            # Nested calls (e.g. update_agent -> log_event) keep their own label
+            _local.operation = operation
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe("orchestrator_db_operation_seconds",
+                                 time.perf_counter() - start, op=operation)
+                registry.inc("orchestrator_db_operations_total", op=operation)
+                if outer is None:
+                    del _local.operation
+                else:
+                    _local.operation = outer
+        return wrapper
+    return decorator
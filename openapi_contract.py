@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+OpenAPI contract validation
+Structural checks for OpenAPI 3.x specs with memoized `$ref` resolution,
+plus a semantic diff used to verify the locked spec against the architect's
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+    # libyaml is an order of magnitude faster on large specs
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    YAML_AVAILABLE = False
+    YAML_LOADER = None
+
+HTTP_METHODS = ("get", "put", "post", "delete", "options", "head", "patch", "trace")
+PARAMETER_LOCATIONS = ("query", "header", "path", "cookie")
+SCHEMA_TYPES = ("string", "number", "integer", "boolean", "array", "object")
+
+# Documentation-only keys ignored by diff_specs (unless they name a property)
+DOC_KEYS = frozenset(("description", "summary", "example", "examples", "externalDocs"))
+
+# Stop reporting after this many problems; a broken spec produces hundreds
+MAX_ERRORS = 50
+
+_RESPONSE_CODE_RE = re.compile(r"^(default|[1-5][0-9]{2}|[1-5]XX)$")
+_PATH_PARAM_RE = re.compile(r"\{([^}/]+)\}")
+
+
+class SpecError(ValueError):
+    """Raised for unresolvable or cyclic `$ref`s"""
+    pass
+
+
+class _Parse:
+    """One spec parse, shared by every thread that asks for the same bytes"""
+
+    __slots__ = ("done", "spec", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.spec = None
+        self.error: Optional[BaseException] = None
+
+
+_parse_cache: "OrderedDict[str, _Parse]" = OrderedDict()
+_parse_lock = threading.Lock()
+_PARSE_CACHE_SIZE = 8
+
+
+def parse_spec(data: bytes) -> Any:
+    """Parse YAML (or JSON) spec bytes, memoized by content hash
+
+    Concurrent checks that load the same spec wait for a single parse;
+    callers must treat the returned document as read-only.
+    yaml.YAMLError propagates to the caller.
+    """
+    if not YAML_AVAILABLE:
+        raise ImportError("PyYAML is required to parse OpenAPI specs")
+    digest = hashlib.sha256(data).hexdigest()
+    with _parse_lock:
+        entry = _parse_cache.get(digest)
+        owner = entry is None
+        if owner:
+            entry = _parse_cache[digest] = _Parse()
+            while len(_parse_cache) > _PARSE_CACHE_SIZE:
+                _parse_cache.popitem(last=False)
+        else:
+            _parse_cache.move_to_end(digest)
+
+    if owner:
+        try:
+            entry.spec = yaml.load(data, Loader=YAML_LOADER)
+        except BaseException as e:
+            entry.error = e
+            with _parse_lock:
+                _parse_cache.pop(digest, None)
+        finally:
+            entry.done.set()
+    else:
+        entry.done.wait()
+    if entry.error is not None:
+        raise entry.error
+    return entry.spec
+
+
+class RefResolver:
+    """Resolves local `$ref` pointers with memoization and cycle detection
+
+    Only same-document references ('#/...') are supported. A reference that
+    only leads to other references and never to a real object is a cycle;
+    recursive schemas (a property referring back to its parent) are fine.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, spec: Dict):
+        self.spec = spec
+        self._cache: Dict[str, Any] = {}
+
+    def _lookup(self, ref: Any) -> Any:
+        if not isinstance(ref, str):
+            raise SpecError(f"$ref must be a string, got {ref!r}")
+        if not ref.startswith("#"):
+            raise SpecError(f"external $ref '{ref}' is not supported")
+        node = self.spec
+        for token in ref[1:].split("/")[1:]:
+            token = token.replace("~1", "/").replace("~0", "~")
+            if isinstance(node, dict) and token in node:
+                node = node[token]
+            elif isinstance(node, list) and token.isdigit() and int(token) < len(node):
+                node = node[int(token)]
+            else:
+                raise SpecError(f"unresolved $ref '{ref}'")
+        return node
+
+    def resolve(self, ref: str) -> Any:
+        """Follow ref (and any ref chain it starts) to the target node"""
+        if not isinstance(ref, str):
+            raise SpecError(f"$ref must be a string, got {ref!r}")
+        cached = self._cache.get(ref, self._MISSING)
+        if cached is not self._MISSING:
+            if isinstance(cached, SpecError):
+                raise cached
+            return cached
+
+        chain = [ref]
+        try:
+            node = self._lookup(ref)
+            while isinstance(node, dict) and "$ref" in node:
+                nxt = node["$ref"]
+                if not isinstance(nxt, str):
+                    raise SpecError(f"$ref must be a string, got {nxt!r}")
+                if nxt in chain:
+                    raise SpecError(f"$ref cycle: {' -> '.join(chain + [nxt])}")
+                chain.append(nxt)
+                node = self._lookup(nxt)
+        except SpecError as e:
+            for r in chain:
+                self._cache[r] = e
+            raise
+        for r in chain:
+            self._cache[r] = node
+        return node
+
+    def deref(self, node: Any) -> Any:
+        if isinstance(node, dict) and "$ref" in node:
+            return self.resolve(node["$ref"])
+        return node
+
+
+class ContractValidator:
+    """Collects structural problems in an OpenAPI 3.x document"""
+
+    def __init__(self, spec: Any, label: str = "OpenAPI spec"):
+        self.spec = spec
+        self.label = label
+        self.errors: List[str] = []
+        self._truncated = 0
+        self.resolver = RefResolver(spec if isinstance(spec, dict) else {})
+        self._seen_schemas = set()
+
+    def error(self, message: str):
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append(f"{self.label}: {message}")
+        else:
+            self._truncated += 1
+
+    def deref(self, node: Any, where: str) -> Optional[Any]:
+        try:
+            return self.resolver.deref(node)
+        except SpecError as e:
+            self.error(f"{where}: {e}")
+            return None
+
+    def deref_mapping(self, node: Any, where: str, what: str) -> Optional[Dict]:
+        """node (or its $ref target) as a mapping; None after reporting why not"""
+        reported = len(self.errors) + self._truncated
+        resolved = self.deref(node, where)
+        if isinstance(resolved, dict):
+            return resolved
+        if len(self.errors) + self._truncated == reported:  # not a broken $ref
+            self.error(f"{where}: {what} must be a mapping")
+        return None
+
+    def validate(self) -> List[str]:
+        spec = self.spec
+        if not isinstance(spec, dict):
+            self.error("document is not a mapping")
+            return self.errors
+
+        version = spec.get("openapi")
+        if version is not None and not str(version).startswith("3."):
+            self.error(f"unsupported openapi version '{version}' (expected 3.x)")
+
+        info = spec.get("info")
+        if isinstance(info, dict):
+            for key in ("title", "version"):
+                if not info.get(key):
+                    self.error(f"info.{key} is required")
+
+        paths = spec.get("paths")
+        if isinstance(paths, dict):
+            operation_ids: Dict[str, str] = {}
+            for path, item in paths.items():
+                self.check_path(str(path), item, operation_ids)
+        elif paths is not None:
+            self.error("paths must be a mapping")
+
+        components = spec.get("components") or {}
+        if isinstance(components, dict):
+            schemas = components.get("schemas") or {}
+            if isinstance(schemas, dict):
+                for name, schema in schemas.items():
+                    self.check_schema(schema, f"components.schemas.{name}")
+            else:
+                self.error("components.schemas must be a mapping")
+
+        if self._truncated:
+            self.errors.append(f"{self.label}: ... and {self._truncated} more problems")
+        return self.errors
+
+    def check_path(self, path: str, item: Any, operation_ids: Dict[str, str]):
+        if not path.startswith("/"):
+            self.error(f"path '{path}' must start with '/'")
+        item = self.deref_mapping(item, path, "path item")
+        if item is None:
+            return
+
+        template_params = set(_PATH_PARAM_RE.findall(path))
+        shared = self.collect_parameters(item.get("parameters"), path)
+
+        for method in HTTP_METHODS:
+            operation = item.get(method)
+            if operation is None:
+                continue
+            where = f"{method.upper()} {path}"
+            if not isinstance(operation, dict):
+                self.error(f"{where}: operation must be a mapping")
+                continue
+
+            op_id = operation.get("operationId")
+            if op_id is not None:
+                if op_id in operation_ids:
+                    self.error(f"{where}: duplicate operationId '{op_id}' (also {operation_ids[op_id]})")
+                else:
+                    operation_ids[op_id] = where
+
+            params = dict(shared)
+            params.update(self.collect_parameters(operation.get("parameters"), where))
+            declared = {name for (name, location) in params if location == "path"}
+            for name in sorted(template_params - declared):
+                self.error(f"{where}: path parameter '{name}' is not declared")
+            for name in sorted(declared - template_params):
+                self.error(f"{where}: path parameter '{name}' does not appear in the path")
+
+            body = operation.get("requestBody")
+            if body is not None:
+                body = self.deref(body, f"{where} requestBody")
+                if isinstance(body, dict):
+                    self.check_content(body.get("content"), f"{where} requestBody", required=True)
+
+            responses = operation.get("responses")
+            if not isinstance(responses, dict) or not responses:
+                self.error(f"{where}: no responses defined")
+                continue
+            for code, response in responses.items():
+                code = str(code)
+                if not _RESPONSE_CODE_RE.match(code):
+                    self.error(f"{where}: invalid response code '{code}'")
+                response = self.deref_mapping(response, f"{where} {code}", "response")
+                if response is None:
+                    continue
+                if "description" not in response:
+                    self.error(f"{where} {code}: response description is required")
+                self.check_content(response.get("content"), f"{where} {code}")
+
+    def collect_parameters(self, params: Any, where: str) -> Dict[Tuple[str, str], Dict]:
+        found: Dict[Tuple[str, str], Dict] = {}
+        if params is None:
+            return found
+        if not isinstance(params, list):
+            self.error(f"{where}: parameters must be a list")
+            return found
+        for param in params:
+            param = self.deref(param, f"{where} parameters")
+            if not isinstance(param, dict):
+                continue
+            name, location = param.get("name"), param.get("in")
+            if not name or location not in PARAMETER_LOCATIONS:
+                self.error(f"{where}: parameter needs a name and 'in' of {', '.join(PARAMETER_LOCATIONS)}")
+                continue
+            if location == "path" and param.get("required") is not True:
+                self.error(f"{where}: path parameter '{name}' must be required")
+            if (name, location) in found:
+                self.error(f"{where}: duplicate parameter '{name}' in {location}")
+            found[(name, location)] = param
+            if "schema" in param:
+                self.check_schema(param["schema"], f"{where} parameter '{name}'")
+        return found
+
+    def check_content(self, content: Any, where: str, required: bool = False):
+        if content is None:
+            if required:
+                self.error(f"{where}: content is required")
+            return
+        if not isinstance(content, dict):
+            self.error(f"{where}: content must be a mapping of media types")
+            return
+        for media_type, media in content.items():
+            if isinstance(media, dict) and "schema" in media:
+                self.check_schema(media["schema"], f"{where} {media_type}")
+
+    def check_schema(self, schema: Any, where: str):
+        if isinstance(schema, dict) and "$ref" in schema:
+            ref = schema["$ref"]
+            # Each referenced schema is walked once, which also terminates
+            # legitimately recursive schemas
+            if isinstance(ref, str):
+                if ref in self._seen_schemas:
+                    return
+                self._seen_schemas.add(ref)
+                where = ref
+            schema = self.deref(schema, where)
+        if schema is None:
+            return
+        if not isinstance(schema, dict):
+            self.error(f"{where}: schema must be a mapping")
+            return
+        if id(schema) in self._seen_schemas:
+            return
+        self._seen_schemas.add(id(schema))
+
+        schema_type = schema.get("type")
+        if schema_type is not None and schema_type not in SCHEMA_TYPES:
+            self.error(f"{where}: unknown type '{schema_type}'")
+        if schema_type == "array" and "items" not in schema:
+            self.error(f"{where}: array schema must define items")
+
+        properties = schema.get("properties")
+        if properties is not None and not isinstance(properties, dict):
+            self.error(f"{where}: properties must be a mapping")
+            properties = None
+        required = schema.get("required")
+        if required is not None:
+            if not isinstance(required, list):
+                self.error(f"{where}: required must be a list")
+            elif properties is not None and not any(k in schema for k in ("allOf", "oneOf", "anyOf")):
+                for name in required:
+                    if name not in properties:
+                        self.error(f"{where}: required property '{name}' is not defined")
+
+        for name, prop in (properties or {}).items():
+            self.check_schema(prop, f"{where}.{name}")
+        if "items" in schema:
+            self.check_schema(schema["items"], f"{where}[]")
+        additional = schema.get("additionalProperties")
+        if isinstance(additional, dict):
+            self.check_schema(additional, f"{where}{{*}}")
+        for key in ("allOf", "oneOf", "anyOf"):
+            members = schema.get(key)
+            if members is None:
+                continue
+            if not isinstance(members, list) or not members:
+                self.error(f"{where}: {key} must be a non-empty list")
+                continue
+            for i, member in enumerate(members):
+                self.check_schema(member, f"{where}.{key}[{i}]")
+        if "not" in schema:
+            self.check_schema(schema["not"], f"{where}.not")
+
+
+def validate_contract(spec: Any, label: str = "OpenAPI spec") -> List[str]:
+    """Structural and $ref errors for a parsed OpenAPI 3.x document"""
+    return ContractValidator(spec, label).validate()
+
+
+def _pointer(parts: List[str]) -> str:
+    return "#/" + "/".join(str(p).replace("~", "~0").replace("/", "~1") for p in parts)
+
+
+def diff_specs(old: Any, new: Any, limit: int = 10) -> List[str]:
+    """Semantic differences between two parsed specs
+
+    Key order, formatting, comments and documentation-only fields are
+    ignored. Returns at most `limit` entries as 'pointer: change' strings.
+    """
+    diffs: List[str] = []
+
+    def walk(a: Any, b: Any, parts: List[str], parent: Optional[str]):
+        if len(diffs) >= limit:
+            return
+        if isinstance(a, dict) and isinstance(b, dict):
+            ignore = DOC_KEYS if parent != "properties" else ()
+            for key in a:
+                if key in ignore:
+                    continue
+                if key not in b:
+                    diffs.append(f"{_pointer(parts + [key])}: removed")
+                else:
+                    walk(a[key], b[key], parts + [key], key)
+                if len(diffs) >= limit:
+                    return
+            for key in b:
+                if key not in a and key not in ignore:
+                    diffs.append(f"{_pointer(parts + [key])}: added")
+                    if len(diffs) >= limit:
+                        return
+        elif isinstance(a, list) and isinstance(b, list):
+            if len(a) != len(b):
+                diffs.append(f"{_pointer(parts)}: {len(a)} items -> {len(b)} items")
+                return
+            for i, (x, y) in enumerate(zip(a, b)):
+                walk(x, y, parts + [str(i)], parent)
+        elif a != b or type(a) is not type(b):
+            diffs.append(f"{_pointer(parts)}: {a!r} -> {b!r}")
+
+    walk(old, new, [], None)
+    return diffs
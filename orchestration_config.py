@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Agent and phase configuration for the orchestrator
+Loads the optional `orchestration:` section of project-description.yaml,
+validates it once and compiles it into indexed lookup tables
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from coverage_gate import CoverageError, parse_gate_config
+from route_index import DEFAULT_IGNORED_ROUTES, RouteConfigError, parse_route_config
+from validation_rules import RuleError, compile_rules
+from webhooks import Endpoint, WebhookError, parse_webhook_config
+
+# Pseudo-agent for phases the orchestrator performs itself
+ORCHESTRATOR = "orchestrator"
+
+DEFAULT_AGENTS = ["architect", "planner", "backend", "frontend", "devops", "qa", "docs"]
+
+DEFAULT_PHASES = [
+    {"number": 1, "name": "Analysis & Planning", "agents": ["architect", "planner"]},
+    {"number": 2, "name": "Specification", "agents": [ORCHESTRATOR]},
+    {"number": 3, "name": "Implementation", "agents": ["backend", "frontend", "qa"]},
+    {"number": 4, "name": "Infrastructure", "agents": ["devops", "qa"]},
+    {"number": 5, "name": "Documentation", "agents": ["docs"]},
+    {"number": 6, "name": "Validation", "agents": [ORCHESTRATOR]},
+]
+
+_DEFAULT_PHASES_BY_NUMBER = {p["number"]: p for p in DEFAULT_PHASES}
+
+_SECTION_RE = re.compile(r"^orchestration:[ \t]*(#.*)?$", re.MULTILINE)
+_TOP_LEVEL_RE = re.compile(r"^[^\s#]", re.MULTILINE)
+
+
+class ConfigError(ValueError):
+    """Raised when the orchestration configuration is invalid"""
+    pass
+
+
+class OrchestrationConfig:
+    """Validated agents and phases with O(1) lookups"""
+
+    def __init__(self, agents: List, phases: List[Dict], coverage: Optional[Dict] = None,
+                 webhooks: Optional[List] = None, routes: Optional[Dict] = None):
+        self.agents: Tuple[str, ...] = tuple(self._agent_name(a) for a in agents)
+        if not self.agents:
+            raise ConfigError("orchestration.agents must list at least one agent")
+
+        self.agent_index: Dict[str, int] = {}
+        for i, name in enumerate(self.agents):
+            if name == ORCHESTRATOR:
+                raise ConfigError(f"'{ORCHESTRATOR}' is reserved and cannot be declared as an agent")
+            if name in self.agent_index:
+                raise ConfigError(f"Duplicate agent '{name}'")
+            self.agent_index[name] = i
+
+        # number -> {"name", "agents"}; shape kept compatible with ProjectOrchestrator.phases
+        self.phases: Dict[int, Dict] = {}
+        # number -> agents that do work in the phase (orchestrator pseudo-agent removed)
+        self.phase_workers: Dict[int, Tuple[str, ...]] = {}
+        # number -> declarative gate rules (see validation_rules.py), when configured
+        self.phase_rules: Dict[int, List[Dict]] = {}
+        agent_phases: Dict[str, List[int]] = {name: [] for name in self.agents}
+
+        if not phases:
+            raise ConfigError("orchestration.phases must list at least one phase")
+
+        for i, phase in enumerate(phases, 1):
+            if not isinstance(phase, dict):
+                raise ConfigError(f"Phase entry #{i} must be a mapping")
+            number = phase.get("number", i)
+            if not isinstance(number, int) or number < 1:
+                raise ConfigError(f"Phase entry #{i} has invalid number {number!r}")
+            if number in self.phases:
+                raise ConfigError(f"Duplicate phase number {number}")
+
+            members = tuple(phase.get("agents") or ())
+            unknown = [a for a in members if a != ORCHESTRATOR and a not in self.agent_index]
+            if unknown:
+                raise ConfigError(f"Phase {number} references unknown agents: {', '.join(unknown)}")
+
+            self.phases[number] = {
+                "name": phase.get("name") or f"Phase {number}",
+                "agents": list(members),
+            }
+            self.phase_workers[number] = tuple(a for a in members if a != ORCHESTRATOR)
+            if phase.get("rules") is not None:
+                try:
+                    compile_rules(phase["rules"])
+                except RuleError as e:
+                    raise ConfigError(f"Phase {number} rules: {e}")
+                self.phase_rules[number] = phase["rules"]
+            for agent in self.phase_workers[number]:
+                agent_phases[agent].append(number)
+
+        # Coverage gate overrides (report paths, per-area thresholds); None = defaults
+        self.coverage_reports: Optional[List[str]] = None
+        self.coverage_areas: Optional[Dict[str, Dict]] = None
+        if coverage is not None:
+            try:
+                self.coverage_reports, self.coverage_areas = parse_gate_config(coverage)
+            except CoverageError as e:
+                raise ConfigError(str(e))
+
+        # Route handlers the Phase 3 route coverage check does not require in the spec
+        self.ignored_routes: Tuple[str, ...] = DEFAULT_IGNORED_ROUTES
+        if routes is not None:
+            try:
+                self.ignored_routes = parse_route_config(routes)
+            except RouteConfigError as e:
+                raise ConfigError(str(e))
+
+        # Webhook endpoints for the event dispatcher (database mode only)
+        self.webhooks: List[Endpoint] = []
+        if webhooks is not None:
+            try:
+                self.webhooks = parse_webhook_config(webhooks)
+            except WebhookError as e:
+                raise ConfigError(str(e))
+
+        self.phase_numbers: Tuple[int, ...] = tuple(sorted(self.phases))
+        self.agent_phases: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in agent_phases.items()}
+
+    @staticmethod
+    def _agent_name(entry) -> str:
+        if isinstance(entry, dict):
+            entry = entry.get("name")
+        if not isinstance(entry, str) or not entry.strip():
+            raise ConfigError(f"Invalid agent entry: {entry!r}")
+        return entry.strip()
+
+    def has_agent(self, name: str) -> bool:
+        return name in self.agent_index
+
+    def require_agent(self, name: str):
+        """Raise ConfigError for agents not declared in the configuration"""
+        if name not in self.agent_index:
+            raise ConfigError(f"Unknown agent '{name}'")
+
+    def is_builtin_phase(self, number: int) -> bool:
+        """True if the phase is identical to the default phase with that number"""
+        default = _DEFAULT_PHASES_BY_NUMBER.get(number)
+        return default is not None and self.phases.get(number) == {
+            "name": default["name"], "agents": default["agents"]}
+
+    def next_phase(self, phase: int) -> Optional[int]:
+        for number in self.phase_numbers:
+            if number > phase:
+                return number
+        return None
+
+
+_cache: Dict[Tuple[str, int, int], OrchestrationConfig] = {}
+
+
+def _extract_section(text: str) -> Optional[str]:
+    """Return only the top-level `orchestration:` block so the rest of a large
+    project description is never parsed"""
+    match = _SECTION_RE.search(text)
+    if not match:
+        return None
+    end = _TOP_LEVEL_RE.search(text, match.end())
+    return text[match.start():end.start() if end else len(text)]
+
+
+def load_config(project_root: str = ".") -> OrchestrationConfig:
+    """Load agents and phases from project-description.yaml, falling back to defaults
+
+    The compiled config is cached per file (path, mtime, size).
+    """
+    description = Path(project_root) / "project-description.yaml"
+    try:
+        st = description.stat()
+    except OSError:
+        return default_config()
+
+    key = (str(description.resolve()), st.st_mtime_ns, st.st_size)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    section = _extract_section(description.read_text(encoding="utf-8"))
+    try:
+        # Imported lazily: most projects have no orchestration section
+        import yaml
+    except ImportError:
+        yaml = None
+
+    if section is None or yaml is None:
+        config = default_config()
+    else:
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        try:
+            data = (yaml.load(section, Loader=loader) or {}).get("orchestration") or {}
+        except yaml.YAMLError as e:
+            raise ConfigError(f"Invalid YAML in orchestration section: {e}")
+        config = OrchestrationConfig(
+            data.get("agents") or DEFAULT_AGENTS,
+            data.get("phases") or DEFAULT_PHASES,
+            data.get("coverage"),
+            data.get("webhooks"),
+            data.get("routes"),
+        )
+
+    _cache[key] = config
+    return config
+
+
+_default: Optional[OrchestrationConfig] = None
+
+
+def default_config() -> OrchestrationConfig:
+    """The built-in seven agents and six phases"""
+    global _default
+    if _default is None:
+        _default = OrchestrationConfig(DEFAULT_AGENTS, DEFAULT_PHASES)
+    return _default
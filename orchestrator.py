@@ -4,19 +4,44 @@ Multi-Agent Development System Orchestrator
 Manages 7 agents through 6 project phases
 """
 
+import hashlib
 import json
 import os
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from artifact_store import SPEC_LOCKED, SPEC_SOURCE, ArtifactError, ArtifactStore, lock_spec, store_tree
+from forecast import BASELINE_MINUTES, DurationStats, Forecast, forecast
+from metrics import registry as metrics
+from orchestration_config import load_config
+from webhooks import WebhookDispatcher
+
+try:
+    import fcntl
+except ImportError:  # Windows: JSON-mode transitions are not locked
+    fcntl = None
+
 # Database support (optional)
 try:
     from database import Database
+    from sharding import ShardedDatabase
     DATABASE_AVAILABLE = True
 except ImportError:
     DATABASE_AVAILABLE = False
 
+# One SQLite file per project under this directory instead of orchestrator.db;
+# chosen by ORCHESTRATOR_STORAGE=sharded, and kept once the directory exists
+SHARDED_ROOT = "orchestrator-shards"
+
+
+# Agent fields callers may update
+AGENT_FIELDS = ("phase", "status", "progress", "todos_completed", "todos_total")
+
+# Written by each agent when it finishes (see agents/architect/templates/report.json.example)
+AGENT_REPORT = "agents/{agent}/output/report.json"
 
 
 class ProjectOrchestrator:
@@ -28,7 +53,11 @@ class ProjectOrchestrator:
         self.use_database = use_database and DATABASE_AVAILABLE
         
         if self.use_database:
-            self.db = Database(str(self.project_root / "orchestrator.db"))
+            sharded_root = self.project_root / SHARDED_ROOT
+            if os.environ.get("ORCHESTRATOR_STORAGE") == "sharded" or sharded_root.is_dir():
+                self.db = ShardedDatabase(str(sharded_root))
+            else:
+                self.db = Database(str(self.project_root / "orchestrator.db"))
             # Migrate from JSON if exists and DB is empty
             if self.context_file.exists():
                 try:
@@ -42,23 +71,23 @@ class ProjectOrchestrator:
                 except Exception as e:
                     print(f"⚠️  Migration warning: {e}")
         
-        self.agents = [
-            "architect",
-            "planner", 
-            "backend",
-            "frontend",
-            "devops",
-            "qa",
-            "docs"
-        ]
-        self.phases = {
-            1: {"name": "Analysis & Planning", "agents": ["architect", "planner"]},
-            2: {"name": "Specification", "agents": ["orchestrator"]},
-            3: {"name": "Implementation", "agents": ["backend", "frontend", "qa"]},
-            4: {"name": "Infrastructure", "agents": ["devops", "qa"]},
-            5: {"name": "Documentation", "agents": ["docs"]},
-            6: {"name": "Validation", "agents": ["orchestrator"]}
-        }
+        # Agents and phases come from project-description.yaml (or the built-in defaults)
+        self.config = load_config(str(self.project_root))
+        self.agents = list(self.config.agents)
+        self.phases = self.config.phases
+
+        # Webhooks see events committed to the database, so only in DB mode
+        self.webhooks: Optional[WebhookDispatcher] = None
+        if self.use_database and self.config.webhooks:
+            self.webhooks = WebhookDispatcher(self.db, self.config.webhooks).start()
+
+    def close(self):
+        """Flush pending webhook deliveries and stop shard fan-out threads"""
+        if self.webhooks is not None:
+            self.webhooks.close()
+            self.webhooks = None
+        if self.use_database and isinstance(self.db, ShardedDatabase):
+            self.db.close()
     
     def load_context(self) -> Dict:
         """Load current project context"""
@@ -75,15 +104,16 @@ class ProjectOrchestrator:
     def initialize_context(self) -> Dict:
         """Initialize new project context"""
         if self.use_database:
-            project_id = self.db.create_project("Multi-Agent Development System", "1.0.0")
+            project_id = self.db.create_project("Multi-Agent Development System", "1.0.0", self.agents)
             return self.db.export_to_json(project_id)
         else:
+            started_at = datetime.now().isoformat()
             context = {
                 "project": "Multi-Agent Development System",
                 "version": "1.0.0",
                 "current_phase": 1,
                 "status": "INITIALIZED",
-                "started_at": datetime.now().isoformat(),
+                "started_at": started_at,
                 "agents": {agent: {
                     "phase": "WAITING",
                     "status": "READY",
@@ -92,7 +122,7 @@ class ProjectOrchestrator:
                     "todos_total": 0,
                     "last_update": None
                 } for agent in self.agents},
-                "phase_timeline": {},
+                "phase_timeline": {"phase_1_started": started_at},
                 "overall_progress": "0%"
             }
             self.save_context(context)
@@ -123,19 +153,62 @@ class ProjectOrchestrator:
                         "todos_total": agent_info.get("todos_total", 0)
                     })
         else:
-            self.context_file.write_text(json.dumps(context, indent=2))
+            # Replace, never truncate: readers see the old or the new file whole
+            tmp = self.context_file.with_name(f"{self.context_file.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(context, indent=2))
+            os.replace(tmp, self.context_file)
     
+    @contextmanager
+    def _context_lock(self):
+        """Exclusive lock serializing read-modify-write of SHARED_CONTEXT.json"""
+        if fcntl is None:
+            yield
+            return
+        lock_file = self.project_root / "SHARED_CONTEXT.json.lock"
+        with open(lock_file, "w") as f:
+            start = time.perf_counter()
+            fcntl.flock(f, fcntl.LOCK_EX)
+            metrics.observe("orchestrator_context_lock_wait_seconds", time.perf_counter() - start)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _active_project_id(self) -> int:
+        project = self.db.get_active_project()
+        if project:
+            return project['id']
+        return self.db.create_project("Multi-Agent Development System", "1.0.0", self.agents)
+
     def get_agent_status(self, agent: str) -> Dict:
         """Get status of specific agent"""
+        if self.use_database:
+            row = self.db.get_agent(self._active_project_id(), agent)
+            return {k: row[k] for k in AGENT_FIELDS + ("last_update",)} if row else {}
         context = self.load_context()
         return context["agents"].get(agent, {})
     
     def update_agent_status(self, agent: str, status: Dict):
-        """Update status of specific agent"""
-        context = self.load_context()
-        context["agents"][agent].update(status)
-        context["agents"][agent]["last_update"] = datetime.now().isoformat()
-        self.save_context(context)
+        """Update status of specific agent
+
+        Only AGENT_FIELDS may be set, in either storage mode; anything else
+        raises ValueError rather than being kept by one mode and dropped by
+        the other.
+        """
+        self.config.require_agent(agent)
+        unknown = sorted(set(status) - set(AGENT_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown agent fields: {', '.join(unknown)} "
+                             f"(expected {', '.join(AGENT_FIELDS)})")
+        if self.use_database:
+            # Single-row update; no need to round-trip the whole context
+            self.db.update_agent(self._active_project_id(), agent, dict(status))
+            return
+        with self._context_lock():
+            context = self.load_context()
+            context["agents"][agent].update(status)
+            context["agents"][agent]["last_update"] = datetime.now().isoformat()
+            self.save_context(context)
     
     def get_phase_info(self, phase: int) -> Optional[Dict]:
         """Get information about a phase"""
@@ -143,6 +216,10 @@ class ProjectOrchestrator:
     
     def transition_phase(self, new_phase: int):
         """Transition to new project phase"""
+        if new_phase not in self.phases:
+            print(f"❌ Phase {new_phase} not found")
+            return
+
         context = self.load_context()
         old_phase = context["current_phase"]
 
@@ -150,10 +227,14 @@ class ProjectOrchestrator:
         if old_phase > 0:
             print(f"\n🔍 Validating Phase {old_phase} completion...")
             try:
-                from phase_validators import validate_phase
-                success, errors = validate_phase(old_phase, str(self.project_root))
+                from phase_validators import run_phase
+                run = run_phase(old_phase, str(self.project_root))
+                success, errors = run.success, run.errors
+                if self.use_database:
+                    self.db.record_validation_run(self._active_project_id(), run.to_dict())
 
                 if not success:
+                    metrics.inc("orchestrator_phase_transitions_total", outcome="rejected")
                     print(f"\n❌ Phase {old_phase} validation FAILED")
                     print(f"\nFound {len(errors)} issues that must be fixed before advancing:\n")
                     for i, error in enumerate(errors, 1):
@@ -167,18 +248,112 @@ class ProjectOrchestrator:
             except Exception as e:
                 print(f"⚠️  Warning: Validation error: {str(e)}")
 
-        context["current_phase"] = new_phase
-        context["phase_timeline"][f"phase_{new_phase}_started"] = datetime.now().isoformat()
+        # Load the finished phase's reports before the new phase resets statuses
+        if self.use_database and old_phase > 0:
+            self.ingest_reports()
+
+        if not self.commit_transition(old_phase, new_phase):
+            metrics.inc("orchestrator_phase_transitions_total", outcome="conflict")
+            print(f"\n⚠️  Project is no longer in Phase {old_phase} (concurrent transition?); nothing changed")
+            return
 
-        # Reset agent statuses for new phase
-        phase_agents = self.phases[new_phase]["agents"]
-        for agent in phase_agents:
-            if agent != "orchestrator":
+        metrics.inc("orchestrator_phase_transitions_total", outcome="completed")
+        print(f"✅ Transitioned from Phase {old_phase} to Phase {new_phase}")
+
+        if self.use_database and old_phase > 0:
+            self._record_phase_artifacts(self._active_project_id(), old_phase)
+
+    def commit_transition(self, old_phase: int, new_phase: int) -> bool:
+        """Move the project from old_phase to new_phase, without validation
+
+        Commits only if nobody else advanced the project since old_phase was
+        read; returns whether it did.
+        """
+        now = datetime.now().isoformat()
+        phase_agents = list(self.config.phase_workers[new_phase])
+
+        if self.use_database:
+            return self.db.transition_phase(self._active_project_id(), old_phase, new_phase, phase_agents, now)
+
+        with self._context_lock():
+            context = self.load_context()
+            if context["current_phase"] != old_phase:
+                return False
+            timeline = context.setdefault("phase_timeline", {})
+            timeline[f"phase_{old_phase}_completed"] = now
+            timeline[f"phase_{new_phase}_started"] = now
+            context["current_phase"] = new_phase
+
+            # Reset agent statuses for new phase
+            for agent in phase_agents:
                 context["agents"][agent]["status"] = "IN_PROGRESS"
                 context["agents"][agent]["progress"] = "0%"
 
-        self.save_context(context)
-        print(f"✅ Transitioned from Phase {old_phase} to Phase {new_phase}")
+            self.save_context(context)
+        return True
+
+    def _record_phase_artifacts(self, project_id: int, phase: int):
+        """Store a validated phase's agent outputs by content hash and record them"""
+        store = ArtifactStore(str(self.project_root))
+        artifacts = {}
+        try:
+            for agent in self.config.phase_workers.get(phase, ()):
+                artifacts.update(store_tree(store, f"agents/{agent}/output"))
+        except ArtifactError as e:
+            print(f"⚠️  Warning: artifacts not recorded: {e}")
+            return
+        finally:
+            store.save()
+        if artifacts:
+            changed = self.db.record_artifacts(project_id, phase, artifacts)
+            print(f"📦 Recorded {len(artifacts)} Phase {phase} artifacts ({changed} changed)")
+
+    def ingest_reports(self) -> List[str]:
+        """Load changed agent report.json files into the database
+
+        Report digests are memoized by stat in the artifact store, so
+        unchanged reports cost a stat and are never re-read or re-parsed.
+        """
+        project_id = self._active_project_id()
+        known = {row['name']: row['report_digest'] for row in self.db.get_agents(project_id)}
+        store = ArtifactStore(str(self.project_root))
+        reports = {}
+        try:
+            for agent in self.agents:
+                rel = AGENT_REPORT.format(agent=agent)
+                if store.digest(rel) in (None, known.get(agent)):
+                    continue
+                try:
+                    raw = (self.project_root / rel).read_bytes()
+                    report = json.loads(raw)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️  Warning: skipping {rel}: {e}")
+                    continue
+                if not isinstance(report, dict):
+                    print(f"⚠️  Warning: skipping {rel}: not a JSON object")
+                    continue
+                # Digest of the bytes actually parsed, in case the file moved on
+                reports[agent] = (hashlib.sha256(raw).hexdigest(), report)
+        finally:
+            store.save()
+        updated = self.db.ingest_agent_reports(project_id, reports)
+        if updated:
+            print(f"📝 Ingested reports from {', '.join(updated)}")
+        return updated
+
+    def lock_spec(self):
+        """Phase 2: lock the architect's spec as the master contract"""
+        store = ArtifactStore(str(self.project_root))
+        try:
+            digest, size, method = lock_spec(store)
+        except ArtifactError as e:
+            print(f"❌ {e}")
+            return
+        if self.use_database:
+            project_id = self._active_project_id()
+            phase = self.db.get_project(project_id)["current_phase"]
+            self.db.record_artifacts(project_id, phase, {SPEC_LOCKED: (digest, size)})
+        print(f"🔒 Locked {SPEC_SOURCE} as {SPEC_LOCKED} ({digest[:12]}, {method})")
     
     def print_phase_instructions(self, phase: int):
         """Print instructions for a phase"""
@@ -196,8 +371,45 @@ class ProjectOrchestrator:
             6: self._phase_6_instructions
         }
         
-        if phase in instructions:
+        if phase in instructions and self.config.is_builtin_phase(phase):
             instructions[phase]()
+        else:
+            self._custom_phase_instructions(phase, phase_info)
+
+        if self.use_database:
+            estimate = DurationStats(self.db.get_duration_stats()).estimate(
+                phase, self.config.phase_workers[phase], self._baselines().get(phase))
+            if estimate is not None and estimate.source != "baseline":
+                print(f"📊 Phase {phase} forecast: {estimate.describe()}")
+                if estimate.bottleneck:
+                    print(f"   Slowest agent: {estimate.bottleneck}")
+
+    def _baselines(self) -> Dict[int, float]:
+        """Hard-coded instruction estimates, for unchanged built-in phases only"""
+        return {phase: minutes for phase, minutes in BASELINE_MINUTES.items()
+                if self.config.is_builtin_phase(phase)}
+
+    def forecast(self) -> Optional[Forecast]:
+        """Remaining-time forecast for the active project (database mode)"""
+        if not self.use_database:
+            return None
+        project = self.db.get_project(self._active_project_id())
+        current = project['current_phase']
+        elapsed = 0.0
+        for row in self.db.get_phase_timeline(project['id']):
+            if row['phase_number'] == current and row['started_at'] and not row['completed_at']:
+                started = datetime.fromisoformat(row['started_at'])
+                elapsed = max((datetime.now() - started).total_seconds() / 60, 0.0)
+        stats = DurationStats(self.db.get_duration_stats())
+        return forecast(self.config.phase_workers, current, elapsed, stats, self._baselines())
+
+    def _custom_phase_instructions(self, phase: int, phase_info: Dict):
+        print(f"\nPHASE {phase}: {phase_info['name'].upper()}\n")
+        for agent in self.config.phase_workers[phase]:
+            print(f"  - {agent}: agents/{agent}/system_prompt.md")
+        next_phase = self.config.next_phase(phase)
+        if next_phase:
+            print(f"\nWhen complete:\n$ python3 orchestrator.py --advance-phase {next_phase}")
     
     def _phase_1_instructions(self):
         print("""
@@ -260,8 +472,9 @@ $ python3 orchestrator.py --advance-phase 2
 
 âœ… This phase is AUTOMATIC:
 
-1. Copy Architect's output: agents/architect/output/api.openapi.yaml
-2. Paste to: specs/api.openapi.yaml
+1. Lock Architect's output: agents/architect/output/api.openapi.yaml
+   $ python3 orchestrator.py --lock-spec
+2. It is placed at specs/api.openapi.yaml and its hash is recorded
 3. This becomes the MASTER CONTRACT for all downstream agents
 
 Master Specification Contents:
@@ -497,6 +710,13 @@ Agent Status:
             print(f"    Progress: {status['progress']}")
             print(f"    Todos: {status['todos_completed']}/{status['todos_total']}")
             print()
+
+        outlook = self.forecast()
+        if outlook is not None:
+            print("Forecast:")
+            for line in outlook.format_lines():
+                print(f"  {line}")
+            print()
     
     def print_help(self):
         """Print help information"""
@@ -516,10 +736,15 @@ Commands:
   --phase 6         Show Phase 6 instructions
   
   --advance-phase N Transition to phase N
+  --lock-spec       Lock the architect's spec as specs/api.openapi.yaml
+  --ingest-reports  Load changed agent report.json files into the database
   --status          Print current project status
   --init            Initialize new project
   --help            Show this help message
 
+  --metrics         Collect timings and print a summary on exit
+  --metrics-file F  Write Prometheus text-format metrics to F on exit
+
 Examples:
   python3 orchestrator.py --phase 1
   python3 orchestrator.py --status
@@ -529,16 +754,55 @@ Ready to build! ðŸš€
 """)
 
 
+def _pop_metrics_flags(args: List[str]):
+    """Strip --metrics / --metrics-file PATH from args and enable collection"""
+    dump = "--metrics" in args
+    if dump:
+        args.remove("--metrics")
+
+    metrics_file = os.environ.get("ORCHESTRATOR_METRICS_FILE")
+    if "--metrics-file" in args:
+        i = args.index("--metrics-file")
+        if i + 1 < len(args):
+            metrics_file = args[i + 1]
+        del args[i:i + 2]
+
+    if dump or metrics_file:
+        metrics.enable()
+    return dump, metrics_file
+
+
 def main():
     import sys
-    
+
+    args = sys.argv[1:]
+    metrics_dump, metrics_file = _pop_metrics_flags(args)
+
+    try:
+        with metrics.timer("orchestrator_command_seconds", command=args[0] if args else "--help"):
+            run_command(args)
+    finally:
+        if metrics_file:
+            metrics.write_prometheus(metrics_file)
+        if metrics_dump:
+            print("\n📈 Metrics")
+            print(metrics.format_summary())
+
+
+def run_command(args: List[str]):
     orchestrator = ProjectOrchestrator()
-    
-    if len(sys.argv) == 1:
+    try:
+        dispatch_command(orchestrator, args)
+    finally:
+        orchestrator.close()
+
+
+def dispatch_command(orchestrator: ProjectOrchestrator, args: List[str]):
+    if not args:
         orchestrator.print_help()
         return
     
-    command = sys.argv[1]
+    command = args[0]
     
     if command == "--help":
         orchestrator.print_help()
@@ -547,12 +811,19 @@ def main():
     elif command == "--init":
         orchestrator.initialize_context()
         print("âœ… Project initialized")
-    elif command == "--phase" and len(sys.argv) > 2:
-        phase = int(sys.argv[2])
+    elif command == "--phase" and len(args) > 1:
+        phase = int(args[1])
         orchestrator.print_phase_instructions(phase)
-    elif command == "--advance-phase" and len(sys.argv) > 2:
-        phase = int(sys.argv[2])
+    elif command == "--advance-phase" and len(args) > 1:
+        phase = int(args[1])
         orchestrator.transition_phase(phase)
+    elif command == "--lock-spec":
+        orchestrator.lock_spec()
+    elif command == "--ingest-reports":
+        if orchestrator.use_database:
+            orchestrator.ingest_reports()
+        else:
+            print("❌ Report ingestion needs the database (database.py)")
     else:
         print(f"Unknown command: {command}")
         orchestrator.print_help()
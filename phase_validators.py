@@ -2,12 +2,50 @@
 """
 Phase Gate Validators
 Ensures phase completion criteria are met before advancing
+
+Each validator is a list of independent checks. Checks run concurrently on a
+thread pool (they are dominated by stat/open/read latency) and their errors
+are concatenated in declaration order, so output is deterministic.
+
+Gates are mostly declared as data (`rules`, see validation_rules.py); rules
+that need real logic name a `check_<name>` method. Phases defined only in the
+orchestration config get their gate from the rules listed there.
+
+Checks touch the filesystem only through PhaseValidator helpers, which record
+every input; results are cached in .validation_cache.json and reused while
+those inputs are unchanged. Within a run, each stat, read and parse happens
+once (IOMemo) and pattern lookups are answered from one shared ProjectIndex
+walk (node_modules, .next, .git, ... pruned).
 """
 
-import json
+import hashlib
 import os
+import posixpath
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
+
+import artifact_store
+import coverage_gate
+import openapi_contract
+import route_index
+import schema_drift
+import validation_rules
+from artifact_store import SPEC_LOCKED, SPEC_REF, SPEC_SOURCE, ArtifactStore
+from coverage_gate import CoverageError, NEXTJS_AREAS, REPORT_DIRS, REPORT_FILES, SPLIT_AREAS
+from metrics import registry as metrics
+from orchestration_config import load_config
+from openapi_contract import diff_specs, parse_spec, validate_contract
+from project_index import ProjectIndex
+from route_index import ROUTE_EXTENSIONS, Route, RouteIndex, coverage, parse_route_exports, route_template
+from schema_drift import SCHEMA_PATHS, SchemaError, diff_models, parse_migration, parse_prisma, replay_migrations
+from validation_cache import (
+    RACY_WINDOW_NS, ValidationCache, start_recording, stop_recording, record_input, record_read, mark_volatile
+)
+from validation_report import CheckResult, ValidationRun, write_reports
+from validation_rules import ExecutionPlan, IOMemo, RuleError, compile_rules, parse_json
 
 try:
     import yaml
@@ -15,311 +53,636 @@ try:
 except ImportError:
     YAML_AVAILABLE = False
 
+# Thread pool size for checks; override with PHASE_VALIDATOR_WORKERS or --workers
+DEFAULT_MAX_WORKERS = int(os.environ.get("PHASE_VALIDATOR_WORKERS", "0")) or min(32, (os.cpu_count() or 1) * 4)
+
+# Also hash file contents so touched-but-unchanged files stay cached
+HASH_CONTENTS = os.environ.get("PHASE_VALIDATOR_HASH", "") not in ("", "0")
+
+# (check_id, callable returning a list of error messages)
+Check = Tuple[str, Callable[[], List[str]]]
+
+
+def _cache_salt() -> str:
+    """Cached results are only valid for the same validator code and deps"""
+    parts = []
+    for module_file in (__file__, openapi_contract.__file__, route_index.__file__, validation_rules.__file__,
+                        coverage_gate.__file__, schema_drift.__file__, artifact_store.__file__):
+        st = os.stat(module_file)
+        parts.append(f"{st.st_mtime_ns}:{st.st_size}")
+    loader = getattr(openapi_contract.YAML_LOADER, "__name__", None)
+    return f"{':'.join(parts)}:yaml={loader}:hash={HASH_CONTENTS}"
+
 
 class ValidationError(Exception):
     """Raised when validation fails"""
     pass
 
 
+def run_checks(checks: List[Check], max_workers: Optional[int] = None,
+               cache: Optional[ValidationCache] = None, force: bool = False,
+               rule_digests: Optional[Dict[str, str]] = None) -> List[CheckResult]:
+    """Run checks concurrently; returns each check's result in input order
+
+    With a cache, checks whose rule (rule_digests, by check ID) and recorded
+    inputs are unchanged are not re-run (unless force=True); fresh results
+    are stored back either way.
+    """
+    rule_digests = rule_digests or {}
+    pending = []
+    results: List[Optional[CheckResult]] = [None] * len(checks)
+    for i, (check_id, _) in enumerate(checks):
+        start = time.perf_counter()
+        cached = None if cache is None or force else cache.lookup(check_id, rule_digests.get(check_id, ""))
+        if cached is None:
+            pending.append(i)
+        else:
+            metrics.inc("orchestrator_validation_cache_total", result="hit")
+            results[i] = CheckResult(check_id, cached, time.perf_counter() - start, cached=True)
+
+    def execute(i: int) -> CheckResult:
+        check_id, func = checks[i]
+        start = time.perf_counter()
+        # Always record: inputs feed the cache, bytes read feed the report
+        recorder = start_recording(HASH_CONTENTS)
+        crashed = False
+        try:
+            errors = func()
+        except Exception as e:
+            # A crash fails the gate without discarding the other checks' results
+            crashed = True
+            errors = [f"check {check_id} crashed: {type(e).__name__}: {e}"]
+        finally:
+            stop_recording()
+            elapsed = time.perf_counter() - start
+            metrics.observe("orchestrator_validator_check_seconds", elapsed, check=check_id)
+        if cache is not None:
+            metrics.inc("orchestrator_validation_cache_total", result="miss")
+            if not crashed:  # may be transient: never replayed from the cache
+                cache.store(check_id, recorder, errors, rule_digests.get(check_id, ""))
+        return CheckResult(check_id, errors, elapsed, recorder.bytes_read)
+
+    workers = min(max_workers or DEFAULT_MAX_WORKERS, len(pending))
+    if workers <= 1:
+        fresh = [execute(i) for i in pending]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="phase-check") as pool:
+            fresh = list(pool.map(execute, pending))
+    for i, result in zip(pending, fresh):
+        results[i] = result
+
+    if cache is not None:
+        cache.save()
+    return results
+
+
 class PhaseValidator:
     """Base class for phase validators"""
 
-    def __init__(self, project_root: str = "."):
+    # Gate declared as data; compiled once per validator into an ExecutionPlan
+    rules: List[Dict] = []
+
+    def __init__(self, project_root: str = ".", max_workers: Optional[int] = None,
+                 cache: Optional[ValidationCache] = None, force: bool = False,
+                 index: Optional[ProjectIndex] = None, io: Optional[IOMemo] = None):
         self.project_root = Path(project_root)
+        self.max_workers = max_workers
+        self.cache = cache
+        self.force = force
+        # Built lazily on the first pattern lookup, so fully cached runs never walk.
+        # Both are per run unless injected by a caller that keeps them current
+        # (validation_daemon), so a repeated validate() sees a changed tree.
+        self._own_index = index is None
+        self._own_io = io is None
+        self.index = index if index is not None else ProjectIndex(project_root)
+        self.io = io if io is not None else IOMemo()
+        self._plan: Optional[ExecutionPlan] = None
+        # Per-check results of the last validate()
+        self.results: List[CheckResult] = []
+
+    def plan(self) -> ExecutionPlan:
+        if self._plan is None:
+            self._plan = compile_rules(self.rules)
+            for rule in self._plan.rules:
+                if rule.kind == "check":
+                    self.named_check(rule.targets[0])  # fail fast on typos
+        return self._plan
+
+    def checks(self) -> List[Check]:
+        """Independent checks for this phase, in reporting order"""
+        return [self._check(rule.name, lambda rule=rule: rule.evaluate(self)) for rule in self.plan().rules]
+
+    def combined_plan(self) -> ExecutionPlan:
+        """Plan including any validators this one delegates to"""
+        return self.plan()
+
+    def rule_digests(self) -> Dict[str, str]:
+        """check ID -> digest of the rule definition behind it"""
+        return {self._check(rule.name, None)[0]: rule.digest for rule in self.plan().rules}
+
+    def named_check(self, name: str) -> Callable[[], List[str]]:
+        func = getattr(self, f"check_{name}", None)
+        if func is None:
+            raise RuleError(f"{type(self).__name__} has no check named '{name}'")
+        return func
+
+    def can_parse(self, fmt: str) -> bool:
+        return fmt == "json" or YAML_AVAILABLE
+
+    def _check(self, name: str, func: Callable[[], List[str]]) -> Check:
+        return (f"{type(self).__name__}.{name}", func)
+
+    def _start_run(self):
+        """Drop the tree listing and file reads of a previous validate()"""
+        if self._own_index:
+            self.index = ProjectIndex(str(self.project_root), self.index.prune)
+        if self._own_io:
+            self.io = IOMemo()
+
+    def _run(self, checks: List[Check]) -> List[CheckResult]:
+        self.results = run_checks(checks, self.max_workers, self.cache, self.force, self.rule_digests())
+        return self.results
 
     def validate(self) -> Tuple[bool, List[str]]:
         """
         Validate phase completion
         Returns: (success: bool, errors: List[str])
         """
-        raise NotImplementedError
+        self._start_run()
+        errors = [e for result in self._run(self.checks()) for e in result.errors]
+        return (len(errors) == 0, errors)
 
+    # Filesystem helpers: every input a check depends on goes through these
 
-class Phase1Validator(PhaseValidator):
-    """Validates Phase 1: Analysis & Planning"""
+    def _stat(self, path: Path, exists_only: bool = False, listing: bool = False) -> Optional[os.stat_result]:
+        """listing=True: the check depends on a directory's entries, not just its existence"""
+        st = self.io.stat(path)
+        record_input(path, st, exists_only=exists_only, listing=listing)
+        return st
 
-    def validate(self) -> Tuple[bool, List[str]]:
-        errors = []
+    def _exists(self, path: Path) -> bool:
+        return self._stat(path, exists_only=True) is not None
 
-        # Check Architect outputs
-        architect_base = self.project_root / "agents" / "architect" / "output"
+    def _read_bytes(self, path: Path) -> bytes:
+        st, data = self.io.read(path)
+        record_input(path, st, data)
+        return data
 
-        # 1. Architecture document
-        arch_doc = architect_base / "architecture.md"
-        if not arch_doc.exists():
-            errors.append("Missing: agents/architect/output/architecture.md")
-        elif arch_doc.stat().st_size < 1000:  # At least 1KB
-            errors.append("Architecture document too short (< 1KB)")
+    def _load_document(self, path: Path, fmt: str):
+        """Parsed JSON or YAML document, shared read-only across checks"""
+        data = self._read_bytes(path)
+        # libyaml loader when available, memoized by content across runs too
+        return self.io.parse(path, fmt, data, parse_json if fmt == "json" else parse_spec)
 
-        # 2. OpenAPI specification
-        openapi_spec = architect_base / "api.openapi.yaml"
-        if not openapi_spec.exists():
-            errors.append("Missing: agents/architect/output/api.openapi.yaml")
-        else:
-            if YAML_AVAILABLE:
-                # Validate it's valid YAML
-                try:
-                    with open(openapi_spec) as f:
-                        spec = yaml.safe_load(f)
-
-                    # Check required OpenAPI fields
-                    if "openapi" not in spec:
-                        errors.append("OpenAPI spec missing 'openapi' version field")
-                    if "info" not in spec:
-                        errors.append("OpenAPI spec missing 'info' section")
-                    if "paths" not in spec or not spec["paths"]:
-                        errors.append("OpenAPI spec has no paths defined")
-
-                except yaml.YAMLError as e:
-                    errors.append(f"Invalid YAML in OpenAPI spec: {str(e)}")
-                except Exception as e:
-                    errors.append(f"Error reading OpenAPI spec: {str(e)}")
-            elif openapi_spec.stat().st_size < 500:
-                errors.append("OpenAPI spec file too small (< 500 bytes)")
-
-        # 3. Database schema
-        db_schema = architect_base / "database_schema.prisma"
-        if not db_schema.exists():
-            errors.append("Missing: agents/architect/output/database_schema.prisma")
-        elif db_schema.stat().st_size < 100:  # At least 100 bytes
-            errors.append("Database schema too short")
-
-        # 4. Report with COMPLETED status
-        report = architect_base / "report.json"
-        if not report.exists():
-            errors.append("Missing: agents/architect/output/report.json")
-        else:
-            try:
-                with open(report) as f:
-                    report_data = json.load(f)
-                if report_data.get("status") != "COMPLETED":
-                    errors.append(f"Architect status is '{report_data.get('status')}', expected 'COMPLETED'")
-            except json.JSONDecodeError:
-                errors.append("Invalid JSON in architect report.json")
-
-        # Check Planner outputs
-        planner_base = self.project_root / "agents" / "planner" / "output"
-
-        # 5. Execution plan
-        exec_plan = planner_base / "execution_plan.json"
-        if not exec_plan.exists():
-            errors.append("Missing: agents/planner/output/execution_plan.json")
-        else:
-            try:
-                with open(exec_plan) as f:
-                    plan = json.load(f)
-                if "phases" not in plan:
-                    errors.append("Execution plan missing 'phases' field")
-            except json.JSONDecodeError:
-                errors.append("Invalid JSON in execution_plan.json")
-
-        # 6. Task list
-        task_list = planner_base / "task_list.json"
-        if not task_list.exists():
-            errors.append("Missing: agents/planner/output/task_list.json")
+    def _load_json(self, path: Path):
+        return self._load_document(path, "json")
+
+    def _load_yaml(self, path: Path):
+        return self._load_document(path, "yaml")
+
+    def _glob_first(self, base: Path, pattern: str) -> Optional[Path]:
+        """First path matching pattern under base, or None
+
+        A hit only depends on the matched file; a miss depends on the whole
+        tree and is never cached.
+        """
+        try:
+            rel = base.relative_to(self.project_root).as_posix()
+        except ValueError:
+            match = next(base.glob(pattern), None)
         else:
-            try:
-                with open(task_list) as f:
-                    tasks = json.load(f)
-                if "tasks" not in tasks or not tasks["tasks"]:
-                    errors.append("Task list has no tasks defined")
-            except json.JSONDecodeError:
-                errors.append("Invalid JSON in task_list.json")
-
-        # 7. Planner report
-        planner_report = planner_base / "report.json"
-        if not planner_report.exists():
-            errors.append("Missing: agents/planner/output/report.json")
+            found = self.index.first(pattern if rel == "." else f"{rel}/{pattern}")
+            match = None if found is None else self.project_root / found
+        if match is None:
+            mark_volatile()
         else:
-            try:
-                with open(planner_report) as f:
-                    report_data = json.load(f)
-                if report_data.get("status") != "COMPLETED":
-                    errors.append(f"Planner status is '{report_data.get('status')}', expected 'COMPLETED'")
-            except json.JSONDecodeError:
-                errors.append("Invalid JSON in planner report.json")
+            self._exists(match)
+        return match
 
-        return (len(errors) == 0, errors)
+
+class Phase1Validator(PhaseValidator):
+    """Validates Phase 1: Analysis & Planning"""
+
+    rules = [
+        {"name": "architecture_doc", "path": "agents/architect/output/architecture.md",
+         "min_size": 1000, "too_small": "Architecture document too short (< 1KB)"},
+        {"name": "openapi_spec", "check": "openapi_spec"},
+        {"name": "database_schema", "path": "agents/architect/output/database_schema.prisma",
+         "min_size": 100, "too_small": "Database schema too short"},
+        {"name": "architect_report", "path": "agents/architect/output/report.json",
+         "equals": {"status": "COMPLETED"},
+         "mismatch": "Architect status is '{value}', expected '{expected}'",
+         "invalid": "Invalid JSON in architect report.json"},
+        {"name": "execution_plan", "path": "agents/planner/output/execution_plan.json",
+         "require": "phases", "absent": "Execution plan missing 'phases' field",
+         "invalid": "Invalid JSON in execution_plan.json"},
+        {"name": "task_list", "path": "agents/planner/output/task_list.json",
+         "nonempty": "tasks", "empty": "Task list has no tasks defined",
+         "invalid": "Invalid JSON in task_list.json"},
+        {"name": "planner_report", "path": "agents/planner/output/report.json",
+         "equals": {"status": "COMPLETED"},
+         "mismatch": "Planner status is '{value}', expected '{expected}'",
+         "invalid": "Invalid JSON in planner report.json"},
+    ]
+
+    @property
+    def architect_base(self) -> Path:
+        return self.project_root / "agents" / "architect" / "output"
+
+    def check_openapi_spec(self) -> List[str]:
+        errors = []
+        openapi_spec = self.architect_base / "api.openapi.yaml"
+        st = self._stat(openapi_spec)
+        if st is None:
+            errors.append("Missing: agents/architect/output/api.openapi.yaml")
+        elif YAML_AVAILABLE:
+            # Validate it's valid YAML
+            try:
+                spec = self._load_yaml(openapi_spec)
+
+                # Check required OpenAPI fields
+                if "openapi" not in spec:
+                    errors.append("OpenAPI spec missing 'openapi' version field")
+                if "info" not in spec:
+                    errors.append("OpenAPI spec missing 'info' section")
+                if "paths" not in spec or not spec["paths"]:
+                    errors.append("OpenAPI spec has no paths defined")
+                if not errors:
+                    errors.extend(validate_contract(spec, "OpenAPI spec"))
+
+            except yaml.YAMLError as e:
+                errors.append(f"Invalid YAML in OpenAPI spec: {str(e)}")
+            except Exception as e:
+                errors.append(f"Error reading OpenAPI spec: {str(e)}")
+        elif st.st_size < 500:
+            errors.append("OpenAPI spec file too small (< 500 bytes)")
+        return errors
 
 
 class Phase2Validator(PhaseValidator):
     """Validates Phase 2: Specification Locking"""
 
-    def validate(self) -> Tuple[bool, List[str]]:
+    rules = [
+        {"name": "master_spec", "check": "master_spec"},
+        {"name": "spec_lock", "check": "spec_lock"},
+    ]
+
+    @property
+    def master_spec(self) -> Path:
+        return self.project_root / "specs" / "api.openapi.yaml"
+
+    @property
+    def architect_spec(self) -> Path:
+        return self.project_root / "agents" / "architect" / "output" / "api.openapi.yaml"
+
+    def check_master_spec(self) -> List[str]:
         errors = []
 
         # Check that API spec has been copied to specs/
-        master_spec = self.project_root / "specs" / "api.openapi.yaml"
+        master_spec = self.master_spec
 
-        if not master_spec.exists():
+        st = self._stat(master_spec)
+        if st is None:
             errors.append("Missing: specs/api.openapi.yaml (master specification not locked)")
-        else:
-            if YAML_AVAILABLE:
-                # Validate it's valid YAML
-                try:
-                    with open(master_spec) as f:
-                        spec = yaml.safe_load(f)
-
-                    if "openapi" not in spec:
-                        errors.append("Master spec missing 'openapi' version field")
-                    if "paths" not in spec or not spec["paths"]:
-                        errors.append("Master spec has no paths defined")
-
-                except yaml.YAMLError as e:
-                    errors.append(f"Invalid YAML in master spec: {str(e)}")
-            elif master_spec.stat().st_size < 500:
-                errors.append("Master spec file too small (< 500 bytes)")
+        elif YAML_AVAILABLE:
+            # Validate it's valid YAML
+            try:
+                spec = self._load_yaml(master_spec)
+
+                if "openapi" not in spec:
+                    errors.append("Master spec missing 'openapi' version field")
+                if "paths" not in spec or not spec["paths"]:
+                    errors.append("Master spec has no paths defined")
+                if not errors:
+                    errors.extend(validate_contract(spec, "Master spec"))
+
+            except yaml.YAMLError as e:
+                errors.append(f"Invalid YAML in master spec: {str(e)}")
+        elif st.st_size < 500:
+            errors.append("Master spec file too small (< 500 bytes)")
+
+        return errors
+
+    def check_spec_lock(self) -> List[str]:
+        """The locked spec must match the architect's copy, ignoring formatting
+        and documentation-only fields"""
+        master_st, architect_st = self._stat(self.master_spec), self._stat(self.architect_spec)
+        if master_st is None or architect_st is None:
+            return []  # Missing files are reported by the other checks
+
+        # Content digests are memoized by stat, so an unchanged lock costs no reads
+        store = ArtifactStore(str(self.project_root))
+        self._stat(store.root / "refs" / SPEC_REF)
+        locked_digest = store.digest(SPEC_LOCKED, master_st)
+        same = locked_digest == store.digest(SPEC_SOURCE, architect_st)
+        if store.root.is_dir():
+            store.save()
 
-        return (len(errors) == 0, errors)
+        errors = []
+        ref = store.ref(SPEC_REF)
+        if ref is not None and locked_digest != ref:
+            errors.append(f"{SPEC_LOCKED} changed since it was locked at {ref[:12]} "
+                          f"(re-lock with: python3 orchestrator.py --lock-spec)")
+        if same:
+            return errors
+        if not YAML_AVAILABLE:
+            return errors + [f"Locked spec differs from {SPEC_SOURCE}"]
+        try:
+            locked = self._load_yaml(self.master_spec)
+            source = self._load_yaml(self.architect_spec)
+        except yaml.YAMLError:
+            return errors  # Reported as invalid YAML by the spec checks
+        return errors + [f"Locked spec differs from {SPEC_SOURCE} at {d}"
+                         for d in diff_specs(source, locked)]
 
 
 class Phase3Validator(PhaseValidator):
     """Validates Phase 3: Implementation"""
 
-    def validate(self) -> Tuple[bool, List[str]]:
-        errors = []
-
-        # Support both traditional backend/frontend split and Next.js monorepo
-        backend_base = self.project_root / "backend" / "src"
-        frontend_base = self.project_root / "frontend" / "src"
-        nextjs_base = self.project_root / "src"  # Next.js fullstack structure
-
-        # Check for Next.js monorepo structure first
-        if nextjs_base.exists():
-            # Next.js: Check for API routes
-            api_routes = list(nextjs_base.glob("app/api/**/*.ts"))
-            if not api_routes:
-                errors.append("No API route files found in src/app/api/")
-
-            # Next.js: Check for components
-            component_files = list(nextjs_base.glob("components/**/*.tsx"))
-            if not component_files:
-                errors.append("No components found in src/components/")
-
-            # Check for tests in Next.js structure
-            tests_dir = self.project_root / "__tests__"
-            if not tests_dir.exists() or not list(tests_dir.glob("**/*.test.*")):
-                errors.append("No tests found in __tests__/")
-
-        else:
-            # Traditional split structure
-            if backend_base.exists():
-                route_files = list(backend_base.glob("routes/*.ts")) + list(backend_base.glob("routes/*.js"))
-                if not route_files:
-                    errors.append("No backend route files found in backend/src/routes/")
+    # Support both traditional backend/frontend split and Next.js monorepo
+    rules = [
+        # Next.js fullstack structure
+        {"name": "nextjs_api_routes", "when": {"exists": "src"}, "glob": "src/app/api/**/*.ts",
+         "missing": "No API route files found in src/app/api/"},
+        {"name": "nextjs_route_coverage", "when": {"exists": "src"}, "check": "nextjs_route_coverage"},
+        {"name": "nextjs_components", "when": {"exists": "src"}, "glob": "src/components/**/*.tsx",
+         "missing": "No components found in src/components/"},
+        {"name": "nextjs_tests", "when": {"exists": "src"}, "glob": "__tests__/**/*.test.*",
+         "missing": "No tests found in __tests__/"},
+        # Traditional split structure
+        {"name": "backend_src", "when": {"missing": "src"}, "path": "backend/src",
+         "missing": "Backend src directory not found"},
+        {"name": "backend_routes", "when": {"missing": "src", "exists": "backend/src"},
+         "glob": ["backend/src/routes/*.ts", "backend/src/routes/*.js"],
+         "missing": "No backend route files found in backend/src/routes/"},
+        {"name": "frontend_src", "when": {"missing": "src"}, "path": "frontend/src",
+         "missing": "Frontend src directory not found"},
+        {"name": "frontend_components", "when": {"missing": "src", "exists": "frontend/src"},
+         "glob": "frontend/src/components/*",
+         "missing": "No frontend components found in frontend/src/components/"},
+        {"name": "backend_tests", "when": {"missing": "src"}, "glob": "backend/tests/**/*.test.*",
+         "missing": "No backend tests found"},
+        {"name": "frontend_tests", "when": {"missing": "src"}, "glob": "frontend/tests/**/*.test.*",
+         "missing": "No frontend tests found"},
+        # Both layouts
+        {"name": "schema_drift", "check": "schema_drift"},
+    ]
+
+    def check_nextjs_route_coverage(self) -> List[str]:
+        """Every spec operation has a route handler and vice versa"""
+        master_spec = self.project_root / "specs" / "api.openapi.yaml"
+        if not YAML_AVAILABLE or not self._exists(master_spec):
+            return []  # Spec problems are reported by Phase 2
+        try:
+            spec = self._load_yaml(master_spec)
+        except yaml.YAMLError:
+            return []
+        if not isinstance(spec, dict):
+            return []
+
+        # Ignored routes may come from project-description.yaml
+        self._stat(self.project_root / "project-description.yaml")
+        ignore = load_config(str(self.project_root)).ignored_routes
+        missing, extra = coverage(spec, self.build_route_index(), ignore)
+        errors = [f"API operation not implemented: {op}" for op in missing]
+        errors.extend(f"Route handler not in spec: {method} {route.url} ({route.file})"
+                      for method, route in extra)
+        return errors
+
+    def build_route_index(self, app_dir: str = "src/app") -> RouteIndex:
+        """Index route handlers under app_dir, reusing parsed exports of
+        unchanged files from the validation cache"""
+        parsed = self.cache.section("route_exports") if self.cache is not None else {}
+        fresh = {}
+        settled_before = time.time_ns() - RACY_WINDOW_NS
+        routes = RouteIndex()
+
+        # Directory listings are inputs: a new route file invalidates the result
+        self._stat(self.project_root / app_dir, listing=True)
+        for rel in self.index.iter_matches(f"{app_dir}/**"):
+            path = self.project_root / rel
+            if self.index.is_dir(rel):
+                self._stat(path, listing=True)
+                continue
+            if path.stem != "route" or path.suffix not in ROUTE_EXTENSIONS:
+                continue
+            st = self._stat(path)
+            if st is None:
+                continue
+            entry = parsed.get(rel)
+            if entry is not None and entry[:2] == [st.st_mtime_ns, st.st_size]:
+                methods = entry[2]
             else:
-                errors.append("Backend src directory not found")
-
-            if frontend_base.exists():
-                component_dirs = list(frontend_base.glob("components/*"))
-                if not component_dirs:
-                    errors.append("No frontend components found in frontend/src/components/")
+                methods = parse_route_exports(self._read_bytes(path).decode("utf-8", "replace"))
+            if st.st_mtime_ns < settled_before:
+                fresh[rel] = [st.st_mtime_ns, st.st_size, methods]
+
+            segments = route_template(Path(rel).parent.relative_to(app_dir).parts)
+            if segments is not None:
+                routes.add(Route(rel, segments, methods))
+
+        if self.cache is not None:
+            self.cache.update_section("route_exports", fresh)
+        return routes
+
+    def check_schema_drift(self) -> List[str]:
+        """The Prisma schema and the SQL migrations describe the same database"""
+        schema_rel = next((rel for rel in SCHEMA_PATHS if self._exists(self.project_root / rel)), None)
+        if schema_rel is None:
+            return []
+        migrations_dir = f"{posixpath.dirname(schema_rel)}/migrations"
+
+        # NNN_name.sql files and Prisma's <timestamp>_name/migration.sql apply in name order
+        self._stat(self.project_root / migrations_dir, listing=True)
+        files = []
+        for rel in self.index.iter_matches(f"{migrations_dir}/**"):
+            if self.index.is_dir(rel):
+                self._stat(self.project_root / rel, listing=True)
+            elif rel.endswith(".sql"):
+                files.append(rel)
+        if not files:
+            return []
+
+        parsed = self.cache.section("schema_models") if self.cache is not None else {}
+        fresh = {}
+        try:
+            schema = self._parse_cached(schema_rel, parse_prisma, parsed, fresh)
+            migrations = replay_migrations([self._parse_cached(rel, parse_migration, parsed, fresh)
+                                            for rel in sorted(files)])
+        except SchemaError as e:
+            return [str(e)]
+        finally:
+            if self.cache is not None:
+                self.cache.update_section("schema_models", fresh)
+        return diff_models(schema, migrations, schema_rel)
+
+    def _parse_cached(self, rel: str, parser: Callable[[str], object], parsed: Dict, fresh: Dict):
+        """parser(text) of a file, reused while its stat or content hash is unchanged"""
+        path = self.project_root / rel
+        st = self._stat(path)
+        entry = parsed.get(rel)
+        if entry is not None and entry[:2] == [st.st_mtime_ns, st.st_size]:
+            result, digest = entry[3], entry[2]
+        else:
+            data = self._read_bytes(path)
+            digest = hashlib.sha256(data).hexdigest()
+            if entry is not None and entry[2] == digest:
+                result = entry[3]  # touched, not edited
             else:
-                errors.append("Frontend src directory not found")
-
-            # Check for tests
-            backend_tests = self.project_root / "backend" / "tests"
-            if not backend_tests.exists() or not list(backend_tests.glob("**/*.test.*")):
-                errors.append("No backend tests found")
-
-            frontend_tests = self.project_root / "frontend" / "tests"
-            if not frontend_tests.exists() or not list(frontend_tests.glob("**/*.test.*")):
-                errors.append("No frontend tests found")
-
-        return (len(errors) == 0, errors)
+                try:
+                    result = parser(data.decode("utf-8", "replace"))
+                except SchemaError as e:
+                    raise SchemaError(f"Cannot parse {rel}: {e}")
+        # A file modified within the racy window is only trusted by its hash
+        settled = st.st_mtime_ns < time.time_ns() - RACY_WINDOW_NS
+        fresh[rel] = [st.st_mtime_ns if settled else None, st.st_size, digest, result]
+        return result
 
 
 class Phase4Validator(PhaseValidator):
     """Validates Phase 4: Infrastructure"""
 
-    def validate(self) -> Tuple[bool, List[str]]:
-        errors = []
+    rules = [
+        # Next.js: Single Dockerfile at root; traditional: separate dockerfiles
+        {"name": "dockerfile", "when": {"exists": "src"}, "path": "Dockerfile"},
+        {"name": "backend_dockerfile", "when": {"missing": "src"}, "path": "backend/Dockerfile"},
+        {"name": "frontend_dockerfile", "when": {"missing": "src"}, "path": "frontend/Dockerfile"},
+        {"name": "docker_compose", "any_of": ["docker-compose.yml", "config/docker/docker-compose.yml"],
+         "missing": "Missing: docker-compose.yml"},
+        {"name": "ci_workflow", "path": ".github/workflows/ci.yml"},
+    ]
 
-        # Support both traditional split and Next.js monorepo structures
-        nextjs_base = self.project_root / "src"
 
-        if nextjs_base.exists():
-            # Next.js: Single Dockerfile at root
-            dockerfile = self.project_root / "Dockerfile"
-            if not dockerfile.exists():
-                errors.append("Missing: Dockerfile")
-        else:
-            # Traditional: Separate dockerfiles
-            backend_dockerfile = self.project_root / "backend" / "Dockerfile"
-            if not backend_dockerfile.exists():
-                errors.append("Missing: backend/Dockerfile")
-
-            frontend_dockerfile = self.project_root / "frontend" / "Dockerfile"
-            if not frontend_dockerfile.exists():
-                errors.append("Missing: frontend/Dockerfile")
-
-        # Check docker-compose
-        docker_compose = self.project_root / "docker-compose.yml"
-        if not docker_compose.exists():
-            docker_compose_alt = self.project_root / "config" / "docker" / "docker-compose.yml"
-            if not docker_compose_alt.exists():
-                errors.append("Missing: docker-compose.yml")
-
-        # Check CI/CD
-        ci_file = self.project_root / ".github" / "workflows" / "ci.yml"
-        if not ci_file.exists():
-            errors.append("Missing: .github/workflows/ci.yml")
+class Phase5Validator(PhaseValidator):
+    """Validates Phase 5: Documentation"""
 
-        return (len(errors) == 0, errors)
+    required_docs = [
+        "API.md",
+        "ARCHITECTURE.md",
+        "SETUP.md",
+        "DEPLOYMENT.md"
+    ]
 
+    rules = [{"name": f"doc:{doc}", "path": f"docs/{doc}", "min_size": 500} for doc in required_docs]
 
-class Phase5Validator(PhaseValidator):
-    """Validates Phase 5: Documentation"""
 
-    def validate(self) -> Tuple[bool, List[str]]:
-        errors = []
+class Phase6Validator(PhaseValidator):
+    """Validates Phase 6: Final Validation"""
 
-        docs_dir = self.project_root / "docs"
+    rules = [{"name": "coverage", "check": "coverage"}]
 
-        required_docs = [
-            "API.md",
-            "ARCHITECTURE.md",
-            "SETUP.md",
-            "DEPLOYMENT.md"
+    def sub_validators(self) -> List[PhaseValidator]:
+        args = (self.project_root, self.max_workers, self.cache, self.force, self.index, self.io)
+        return [
+            Phase1Validator(*args),
+            Phase2Validator(*args),
+            Phase3Validator(*args),
+            Phase4Validator(*args),
+            Phase5Validator(*args)
         ]
 
-        for doc in required_docs:
-            doc_path = docs_dir / doc
-            if not doc_path.exists():
-                errors.append(f"Missing: docs/{doc}")
-            elif doc_path.stat().st_size < 500:  # At least 500 bytes
-                errors.append(f"docs/{doc} is too short (< 500 bytes)")
+    def checks(self) -> List[Check]:
+        return [check for validator in self.sub_validators() for check in validator.checks()] + super().checks()
 
-        return (len(errors) == 0, errors)
+    def combined_plan(self) -> ExecutionPlan:
+        rules = [rule for v in self.sub_validators() for rule in v.plan().rules]
+        return ExecutionPlan(rules + self.plan().rules)
 
-
-class Phase6Validator(PhaseValidator):
-    """Validates Phase 6: Final Validation"""
+    def rule_digests(self) -> Dict[str, str]:
+        digests = {}
+        for validator in self.sub_validators():
+            digests.update(validator.rule_digests())
+        digests.update(super().rule_digests())
+        return digests
 
     def validate(self) -> Tuple[bool, List[str]]:
         errors = []
 
         # This phase is mostly manual checklist
-        # We can validate that previous phases are complete
-
-        validators = [
-            Phase1Validator(self.project_root),
-            Phase2Validator(self.project_root),
-            Phase3Validator(self.project_root),
-            Phase4Validator(self.project_root),
-            Phase5Validator(self.project_root)
-        ]
-
-        for i, validator in enumerate(validators, 1):
-            success, phase_errors = validator.validate()
-            if not success:
+        # We can validate that previous phases are complete.
+        # All sub-checks go into one pool so the phase takes as long as its
+        # slowest check rather than the sum of five validators.
+        self._start_run()
+        validators = self.sub_validators()
+        grouped = [validator.checks() for validator in validators]
+        own = super().checks()  # rules configured for phase 6 itself
+        results = self._run([check for checks in grouped for check in checks] + own)
+
+        offset = 0
+        for i, checks in enumerate(grouped, 1):
+            phase_errors = [e for result in results[offset:offset + len(checks)] for e in result.errors]
+            offset += len(checks)
+            if phase_errors:
                 errors.append(f"Phase {i} validation failed: {len(phase_errors)} issues")
+        errors.extend(e for result in results[offset:] for e in result.errors)
 
         return (len(errors) == 0, errors)
 
+    def check_coverage(self) -> List[str]:
+        """Backend >= 80% / frontend >= 75% line coverage unless configured otherwise"""
+        # Thresholds and report paths may come from project-description.yaml
+        self._stat(self.project_root / "project-description.yaml")
+        config = load_config(str(self.project_root))
+        areas = config.coverage_areas
+        if areas is None:
+            areas = NEXTJS_AREAS if self._exists(self.project_root / "src") else SPLIT_AREAS
+
+        reports = config.coverage_reports
+        if reports is None:
+            reports = []
+            for report_dir in REPORT_DIRS:
+                for name in REPORT_FILES:  # lcov.info is smaller to stream
+                    if self._exists(self.project_root / report_dir / name):
+                        reports.append(f"{report_dir}/{name}")
+                        break
+        if not reports:
+            return ["No coverage report found (run tests with --coverage to produce coverage/lcov.info)"]
+
+        # Reports reach hundreds of MB: reuse per-directory totals of unchanged ones
+        parsed = self.cache.section("coverage") if self.cache is not None else {}
+        fresh = {}
+        settled_before = time.time_ns() - RACY_WINDOW_NS
+        totals: Dict[str, List[int]] = {}
+        for rel in reports:
+            path = self.project_root / rel
+            st = self._stat(path)
+            if st is None:
+                return [f"Missing coverage report: {rel}"]
+            entry = parsed.get(rel)
+            if entry is not None and entry[:2] == [st.st_mtime_ns, st.st_size]:
+                report_totals = entry[2]
+            else:
+                try:
+                    report_totals = coverage_gate.load_report(path, str(self.project_root.resolve()))
+                except CoverageError as e:
+                    return [str(e)]
+                record_read(st.st_size)
+            if st.st_mtime_ns < settled_before:
+                fresh[rel] = [st.st_mtime_ns, st.st_size, report_totals]
+            coverage_gate.merge(totals, report_totals)
+
+        if self.cache is not None:
+            self.cache.update_section("coverage", fresh)
+        return coverage_gate.check_thresholds(totals, areas)
+
 
-def get_validator(phase: int, project_root: str = ".") -> PhaseValidator:
-    """Factory function to get validator for a phase"""
+class RuleValidator(PhaseValidator):
+    """Validates a phase whose gate is declared entirely in configuration"""
+
+    phase = 0
+
+    def _check(self, name: str, func: Callable[[], List[str]]) -> Check:
+        return (f"Phase{self.phase}Rules.{name}", func)
+
+
+def get_validator(phase: int, project_root: str = ".", max_workers: Optional[int] = None,
+                  cache: Optional[ValidationCache] = None, force: bool = False,
+                  index: Optional[ProjectIndex] = None,
+                  rules: Optional[List[Dict]] = None, io: Optional[IOMemo] = None) -> PhaseValidator:
+    """Factory function to get validator for a phase
+
+    Configured rules replace a built-in gate, or define one for custom phases.
+    """
     validators = {
         1: Phase1Validator,
         2: Phase2Validator,
@@ -331,31 +694,101 @@ def get_validator(phase: int, project_root: str = ".") -> PhaseValidator:
 
     validator_class = validators.get(phase)
     if not validator_class:
-        raise ValueError(f"No validator for phase {phase}")
-
-    return validator_class(project_root)
-
-
-def validate_phase(phase: int, project_root: str = ".") -> Tuple[bool, List[str]]:
+        if rules is None:
+            raise ValueError(f"No validator for phase {phase}")
+        validator_class = RuleValidator
+
+    validator = validator_class(project_root, max_workers, cache, force, index, io)
+    if rules is not None:
+        validator.rules = rules
+    if isinstance(validator, RuleValidator):
+        validator.phase = phase
+    return validator
+
+
+def run_phase(phase: int, project_root: str = ".", max_workers: Optional[int] = None,
+              use_cache: bool = True, force: bool = False,
+              cache: Optional[ValidationCache] = None, index: Optional[ProjectIndex] = None,
+              io: Optional[IOMemo] = None) -> ValidationRun:
+    """
+    Validate a phase, keeping every check's result
+    force=True re-runs every check (and refreshes the cache)
+    cache/index/io let a long-lived caller (validation_daemon) keep state warm
+    """
+    if cache is None and use_cache:
+        cache = ValidationCache(project_root, _cache_salt())
+    rules = load_config(project_root).phase_rules.get(phase)
+    validator = get_validator(phase, project_root, max_workers, cache, force, index, rules, io)
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+    success, errors = validator.validate()
+    elapsed = time.perf_counter() - start
+    metrics.observe("orchestrator_validation_seconds", elapsed, phase=str(phase))
+    metrics.inc("orchestrator_validation_errors_total", len(errors), phase=str(phase))
+    return ValidationRun(phase, success, errors, validator.results, started_at, elapsed)
+
+
+def validate_phase(phase: int, project_root: str = ".", max_workers: Optional[int] = None,
+                   use_cache: bool = True, force: bool = False,
+                   cache: Optional[ValidationCache] = None, index: Optional[ProjectIndex] = None,
+                   io: Optional[IOMemo] = None) -> Tuple[bool, List[str]]:
     """
     Validate a phase
     Returns: (success: bool, errors: List[str])
     """
-    validator = get_validator(phase, project_root)
-    return validator.validate()
+    run = run_phase(phase, project_root, max_workers, use_cache, force, cache, index, io)
+    return (run.success, run.errors)
 
 
 if __name__ == "__main__":
     import sys
 
-    if len(sys.argv) < 2:
-        print("Usage: python3 phase_validators.py <phase_number>")
+    args = sys.argv[1:]
+    max_workers = None
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+    show_plan = "--plan" in args
+    if show_plan:
+        args.remove("--plan")
+    show_timings = "--timings" in args
+    if show_timings:
+        args.remove("--timings")
+    if "--workers" in args:
+        i = args.index("--workers")
+        max_workers = int(args[i + 1])
+        del args[i:i + 2]
+    report_paths = {}
+    for flag in ("--json", "--junit"):
+        if flag in args:
+            i = args.index(flag)
+            report_paths[flag] = args[i + 1]
+            del args[i:i + 2]
+
+    if not args:
+        print("Usage: python3 phase_validators.py <phase_number> [--workers N] [--force] [--plan]\n"
+              "                                   [--timings] [--json FILE] [--junit FILE]")
         sys.exit(1)
 
-    phase = int(sys.argv[1])
+    phase = int(args[0])
+
+    if show_plan:
+        validator = get_validator(phase, rules=load_config().phase_rules.get(phase))
+        print(f"Execution plan for Phase {phase}:")
+        print("\n".join(validator.combined_plan().describe()))
+        sys.exit(0)
 
     print(f"Validating Phase {phase}...")
-    success, errors = validate_phase(phase)
+    run = run_phase(phase, max_workers=max_workers, force=force)
+    success, errors = run.success, run.errors
+    write_reports([run], report_paths.get("--json"), report_paths.get("--junit"))
+
+    if show_timings:
+        print(f"\n⏱️  {len(run.checks)} checks in {run.duration * 1000:.1f}ms, {run.bytes_read} bytes read")
+        for check in run.slowest(10):
+            source = "cached" if check.cached else f"{check.bytes_read} bytes"
+            print(f"  {check.duration * 1000:8.1f}ms  {check.status:<6}  {check.check_id} ({source})")
+        print()
 
     if success:
         print(f"✅ Phase {phase} validation PASSED")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Single-pass project file index for phase validators
+Walks the project once with os.scandir, pruning dependency and build
+directories, and answers glob-style existence queries from memory
+"""
+
+import os
+import re
+import threading
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Pattern, Set, Tuple
+
+# Directories never descended into; extend with PHASE_VALIDATOR_PRUNE=a,/b.
+# A bare name is pruned at any depth, "/name" only directly under the project
+# root: generic build-output names are legitimate elsewhere (src/app/api/build)
+DEFAULT_PRUNE = (
+    "node_modules", ".next", ".git", ".hg", ".svn", "__pycache__", ".venv", "venv", ".turbo",
+    "/.cache", "/dist", "/build", "/coverage", "/.artifacts",
+)
+
+
+def prune_from_env() -> Tuple[str, ...]:
+    extra = os.environ.get("PHASE_VALIDATOR_PRUNE", "")
+    return DEFAULT_PRUNE + tuple(name.strip() for name in extra.split(",") if name.strip())
+
+
+def is_pruned(rel: str, prune: Set[str]) -> bool:
+    """Whether the directory at rel (relative POSIX path) is pruned"""
+    return rel.rpartition("/")[2] in prune or "/" + rel in prune
+
+
+def under_pruned(rel: str, prune: Set[str]) -> bool:
+    """Whether a relative POSIX file path lies inside a pruned directory"""
+    parts = rel.split("/")[:-1]
+    return any(is_pruned("/".join(parts[:i]), prune) for i in range(1, len(parts) + 1))
+
+
+@lru_cache(maxsize=256)
+def compile_glob(pattern: str) -> Tuple[str, Pattern]:
+    """Translate a pathlib-style glob into (literal directory prefix, regex)
+
+    Supports `**` (any number of directories), `*` and `?` within a
+    path segment. The prefix lets lookups skip straight to the subtree.
+    """
+    parts = pattern.strip("/").split("/")
+    literal = []
+    for part in parts[:-1]:
+        if any(c in part for c in "*?["):
+            break
+        literal.append(part)
+    prefix = "/".join(literal) + "/" if literal else ""
+
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:[^/]+/)*"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return prefix, re.compile(regex + r"\Z")
+
+
+class ProjectIndex:
+    """Sorted index of every file and directory under a project root"""
+
+    def __init__(self, project_root: str = ".", prune: Optional[Iterable[str]] = None):
+        self.project_root = Path(project_root)
+        self.prune: Set[str] = set(prune_from_env() if prune is None else prune)
+        self._entries: Optional[List[str]] = None
+        self._dirs: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _build(self):
+        entries: List[str] = []
+        dirs: Set[str] = set()
+        stack = [("", str(self.project_root))]
+        while stack:
+            rel_dir, abs_dir = stack.pop()
+            try:
+                it = os.scandir(abs_dir)
+            except OSError:
+                continue
+            with it:
+                for entry in it:
+                    rel = rel_dir + entry.name
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    if is_dir:
+                        if is_pruned(rel, self.prune):
+                            continue
+                        dirs.add(rel)
+                        stack.append((rel + "/", entry.path))
+                    entries.append(rel)
+        entries.sort()
+        self._dirs = dirs
+        self._entries = entries
+
+    @property
+    def entries(self) -> List[str]:
+        """Relative POSIX paths, sorted; built on first use (thread-safe)"""
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._build()
+        return self._entries
+
+    def is_dir(self, rel: str) -> bool:
+        self.entries
+        return rel in self._dirs
+
+    def iter_matches(self, pattern: str, files_only: bool = False) -> Iterator[str]:
+        """Yield relative paths matching a glob, in sorted order"""
+        prefix, regex = compile_glob(pattern)
+        entries = self.entries
+        i = bisect_left(entries, prefix) if prefix else 0
+        while i < len(entries):
+            rel = entries[i]
+            if prefix and not rel.startswith(prefix):
+                return
+            if regex.match(rel) and not (files_only and rel in self._dirs):
+                yield rel
+            i += 1
+
+    def first(self, pattern: str, files_only: bool = False) -> Optional[str]:
+        """First match or None; stops scanning at the first hit"""
+        return next(self.iter_matches(pattern, files_only), None)
+
+    def exists(self, pattern: str, files_only: bool = False) -> bool:
+        return self.first(pattern, files_only) is not None
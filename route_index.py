@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Next.js route handler index
+Maps app-router route files (src/app/**/route.ts) and their exported HTTP
+method handlers to URL templates, and joins them against OpenAPI operations
+"""
+
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+ROUTE_EXTENSIONS = (".ts", ".js", ".tsx", ".jsx", ".mjs")
+HTTP_METHODS = ("GET", "HEAD", "POST", "PUT", "DELETE", "PATCH", "OPTIONS")
+
+# Next.js answers these itself when a route does not export them
+IMPLICIT_METHODS = ("HEAD", "OPTIONS")
+
+# Where app-router API routes live when the spec's server path is not mounted
+DEFAULT_API_BASE = "/api"
+
+# Handlers an OpenAPI spec cannot describe (framework catch-alls), as URL
+# templates; `*` matches one segment, `**` any number
+DEFAULT_IGNORED_ROUTES = ("**/[...nextauth]", "**/[[...nextauth]]")
+
+_BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_LINE_COMMENT_RE = re.compile(r"^\s*//.*$", re.MULTILINE)
+_METHOD_ALT = "|".join(HTTP_METHODS)
+# export async function GET(...)  /  export const POST = ...
+_DECL_RE = re.compile(rf"\bexport\s+(?:async\s+)?(?:function\s*\*?\s*|(?:const|let|var)\s+)({_METHOD_ALT})\b")
+# export const {{ GET, POST }} = handlers
+_DESTRUCTURE_RE = re.compile(r"\bexport\s+(?:const|let|var)\s*\{([^}]*)\}\s*=")
+# export {{ handler as GET }}  /  export {{ GET }} from './shared'
+_EXPORT_LIST_RE = re.compile(r"\bexport\s*\{([^}]*)\}")
+
+# Segment kinds, in Next.js match precedence order
+STATIC, DYNAMIC, CATCH_ALL, OPTIONAL_CATCH_ALL = range(4)
+
+
+class RouteConfigError(ValueError):
+    """Raised when the routes configuration is invalid"""
+    pass
+
+
+def parse_route_exports(source: str) -> List[str]:
+    """HTTP methods exported by a route handler module, in HTTP_METHODS order"""
+    source = _LINE_COMMENT_RE.sub("", _BLOCK_COMMENT_RE.sub("", source))
+    found = set(_DECL_RE.findall(source))
+    for match in _DESTRUCTURE_RE.finditer(source):
+        for item in match.group(1).split(","):
+            # `{ GET }` or `{ handler: GET }` (rename) or `{ GET = fallback }`
+            name = item.split(":")[-1].split("=")[0].strip()
+            found.add(name)
+    for match in _EXPORT_LIST_RE.finditer(source):
+        for item in match.group(1).split(","):
+            name = item.split(" as ")[-1].strip()
+            found.add(name)
+    return [m for m in HTTP_METHODS if m in found]
+
+
+def parse_segment(name: str) -> Optional[Tuple[int, str]]:
+    """(kind, value) for an app directory name; None if it adds no URL segment
+
+    `(group)` and `@slot` directories are transparent. `_private` folders
+    (and anything below them) are not routable, which is signalled by
+    route_template().
+    """
+    if name.startswith("(") and name.endswith(")"):
+        return None
+    if name.startswith("@"):
+        return None
+    if name.startswith("[[...") and name.endswith("]]"):
+        return (OPTIONAL_CATCH_ALL, name[5:-2])
+    if name.startswith("[...") and name.endswith("]"):
+        return (CATCH_ALL, name[4:-1])
+    if name.startswith("[") and name.endswith("]"):
+        return (DYNAMIC, name[1:-1])
+    return (STATIC, name)
+
+
+def route_template(dir_parts: Iterable[str]) -> Optional[List[Tuple[int, str]]]:
+    """URL segments for a route directory relative to the app dir, or None
+    if the directory is private"""
+    segments = []
+    for part in dir_parts:
+        if part.startswith("_"):
+            return None
+        segment = parse_segment(part)
+        if segment is not None:
+            segments.append(segment)
+    return segments
+
+
+def format_template(segments: List[Tuple[int, str]]) -> str:
+    labels = {STATIC: "{}", DYNAMIC: "[{}]", CATCH_ALL: "[...{}]", OPTIONAL_CATCH_ALL: "[[...{}]]"}
+    return "/" + "/".join(labels[kind].format(value) for kind, value in segments)
+
+
+class Route:
+    """One route handler file"""
+
+    __slots__ = ("file", "segments", "methods", "url")
+
+    def __init__(self, file: str, segments: List[Tuple[int, str]], methods: List[str]):
+        self.file = file
+        self.segments = segments
+        self.methods = methods
+        self.url = format_template(segments)
+
+    def __repr__(self):
+        return f"Route({self.url!r}, {self.methods!r})"
+
+
+class _Node:
+    __slots__ = ("children", "route")
+
+    def __init__(self):
+        # (kind, static value or "") -> _Node
+        self.children: Dict[Tuple[int, str], "_Node"] = {}
+        self.route: Optional[Route] = None
+
+
+class RouteIndex:
+    """Segment trie of routes that resolves URLs with Next.js precedence:
+    static > [param] > [...catchAll] > [[...optional]]"""
+
+    def __init__(self, routes: Iterable[Route] = ()):
+        self.routes: List[Route] = []
+        self._root = _Node()
+        for route in routes:
+            self.add(route)
+
+    def add(self, route: Route):
+        node = self._root
+        for kind, value in route.segments:
+            key = (kind, value if kind == STATIC else "")
+            node = node.children.setdefault(key, _Node())
+        node.route = route
+        self.routes.append(route)
+
+    def match(self, segments: List[str]) -> Optional[Route]:
+        """Route serving a concrete or templated URL (`{param}` segments only
+        match dynamic route segments)"""
+        return self._match(self._root, segments, 0)
+
+    def _match(self, node: _Node, segments: List[str], i: int) -> Optional[Route]:
+        if i == len(segments):
+            if node.route is not None:
+                return node.route
+            optional = node.children.get((OPTIONAL_CATCH_ALL, ""))
+            return optional.route if optional is not None else None
+
+        segment = segments[i]
+        is_param = segment.startswith("{") and segment.endswith("}")
+        if not is_param:
+            child = node.children.get((STATIC, segment))
+            if child is not None:
+                found = self._match(child, segments, i + 1)
+                if found is not None:
+                    return found
+        child = node.children.get((DYNAMIC, ""))
+        if child is not None:
+            found = self._match(child, segments, i + 1)
+            if found is not None:
+                return found
+        for kind in (CATCH_ALL, OPTIONAL_CATCH_ALL):
+            child = node.children.get((kind, ""))
+            if child is not None and child.route is not None:
+                return child.route
+        return None
+
+    def under(self, base: str) -> List[Route]:
+        """Routes whose URL starts with the base path"""
+        prefix = [s for s in base.split("/") if s]
+        return [r for r in self.routes
+                if [v for _, v in r.segments[:len(prefix)]] == prefix
+                and all(k == STATIC for k, _ in r.segments[:len(prefix)])]
+
+
+def parse_route_config(raw: Any) -> Tuple[str, ...]:
+    """Validate an `orchestration.routes` mapping into the ignored route templates
+
+    Configured patterns extend DEFAULT_IGNORED_ROUTES.
+    """
+    if not isinstance(raw, dict):
+        raise RouteConfigError("routes must be a mapping")
+    ignore = raw.get("ignore") or []
+    if not isinstance(ignore, list) or not all(isinstance(p, str) and p.startswith(("/", "**"))
+                                               for p in ignore):
+        raise RouteConfigError("routes.ignore must be a list of URL templates starting with '/' or '**'")
+    return DEFAULT_IGNORED_ROUTES + tuple(ignore)
+
+
+def ignore_matcher(patterns: Iterable[str]) -> Callable[[str], bool]:
+    """Predicate: does a route URL template match any of the patterns"""
+    alternatives = []
+    for pattern in patterns:
+        parts = re.split(r"(\*\*/|\*\*|\*)", pattern.strip("/"))
+        wildcards = {"**/": "(?:[^/]+/)*", "**": ".*", "*": "[^/]+"}
+        alternatives.append("".join(wildcards.get(part) or re.escape(part) for part in parts))
+    if not alternatives:
+        return lambda url: False
+    regex = re.compile(rf"/(?:{'|'.join(alternatives)})")
+    return lambda url: regex.fullmatch(url) is not None
+
+
+def spec_base_path(spec: Dict) -> str:
+    """Path component of the spec's first server URL ('' if none)"""
+    servers = spec.get("servers")
+    if isinstance(servers, list) and servers and isinstance(servers[0], dict) and servers[0].get("url"):
+        return urlparse(str(servers[0]["url"])).path.rstrip("/")
+    return ""
+
+
+def api_base(spec: Dict, index: RouteIndex) -> str:
+    """Mount point of the spec's paths in the app
+
+    The server URL's path (e.g. /api/v1) when the app has routes below it,
+    otherwise the conventional /api directory.
+    """
+    base = spec_base_path(spec)
+    if base and index.under(base):
+        return base
+    return DEFAULT_API_BASE
+
+
+def coverage(spec: Dict, index: RouteIndex,
+             ignore: Iterable[str] = DEFAULT_IGNORED_ROUTES) -> Tuple[List[str], List[Tuple[str, Route]]]:
+    """Join spec operations against route handlers
+
+    Returns (missing, extra): 'METHOD /spec/path' strings for operations with
+    no handler, and (method, route) pairs for handlers with no operation.
+    Routes whose URL template matches an ignore pattern are never extra.
+    """
+    ignored = ignore_matcher(ignore)
+    base = api_base(spec, index)
+    base_segments = [s for s in base.split("/") if s]
+    missing: List[str] = []
+    served = set()
+
+    paths = spec.get("paths")
+    if not isinstance(paths, dict):
+        paths = {}  # Phase 2 reports a malformed paths section
+    for path, item in paths.items():
+        if not isinstance(item, dict):
+            continue
+        route = index.match(base_segments + [s for s in str(path).split("/") if s])
+        for method in HTTP_METHODS:
+            if method.lower() not in item:
+                continue
+            handled = route is not None and (
+                method in route.methods
+                or method in IMPLICIT_METHODS
+                or (method == "HEAD" and "GET" in route.methods))
+            if handled:
+                served.add((id(route), method))
+            else:
+                missing.append(f"{method} {path}")
+
+    extra = [(method, route)
+             for route in index.under(base) if not ignored(route.url)
+             for method in route.methods
+             if method not in IMPLICIT_METHODS and (id(route), method) not in served]
+    return missing, extra
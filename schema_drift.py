@@ -0,0 +1,775 @@
+#!/usr/bin/env python3
+"""
+Prisma schema / SQL migration drift detection
+Reduces a Prisma schema and an ordered set of SQL migrations to the same
+normalized model of tables, columns, enums and indexes, and diffs the two
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+MAX_DRIFT = 50
+
+# Where the schema lives, in lookup order; migrations sit next to it
+SCHEMA_PATHS = ("prisma/schema.prisma", "backend/prisma/schema.prisma")
+
+# Normalized model, JSON-serializable so parses can live in the validation cache:
+# {"tables": {table: {"columns": {column: [type, nullable]}, "indexes": [[kind, [columns]]]}},
+#  "enums": {enum: [values]}}
+Model = Dict
+
+INDEX_LABELS = {"primary": "Primary key", "unique": "Unique index", "index": "Index"}
+
+# Column types Prisma's migration engine emits for each scalar on PostgreSQL
+PRISMA_SCALARS = {
+    "String": "TEXT",
+    "Boolean": "BOOLEAN",
+    "Int": "INTEGER",
+    "BigInt": "BIGINT",
+    "Float": "DOUBLE PRECISION",
+    "Decimal": "DECIMAL(65,30)",
+    "DateTime": "TIMESTAMP(3)",
+    "Json": "JSONB",
+    "Bytes": "BYTEA",
+}
+
+# Spellings that name the same PostgreSQL type
+TYPE_ALIASES = {
+    "INT": "INTEGER", "INT4": "INTEGER", "SERIAL": "INTEGER", "SERIAL4": "INTEGER",
+    "INT2": "SMALLINT", "SMALLSERIAL": "SMALLINT", "SERIAL2": "SMALLINT",
+    "INT8": "BIGINT", "BIGSERIAL": "BIGINT", "SERIAL8": "BIGINT",
+    "BOOL": "BOOLEAN",
+    "FLOAT8": "DOUBLE PRECISION", "FLOAT4": "REAL",
+    "NUMERIC": "DECIMAL",
+    "CHARACTER VARYING": "VARCHAR", "CHARACTER": "CHAR",
+    "TIMESTAMP WITHOUT TIME ZONE": "TIMESTAMP", "TIMESTAMP WITH TIME ZONE": "TIMESTAMPTZ",
+    "TIME WITHOUT TIME ZONE": "TIME", "TIME WITH TIME ZONE": "TIMETZ",
+    "DOUBLEPRECISION": "DOUBLE PRECISION",  # Prisma's @db.DoublePrecision
+}
+
+# PostgreSQL's default precision for time types
+_DEFAULT_PRECISION = {"TIMESTAMP": "(6)", "TIMESTAMPTZ": "(6)", "TIME": "(6)", "TIMETZ": "(6)"}
+
+
+class SchemaError(ValueError):
+    """Raised when a schema or migration cannot be understood"""
+    pass
+
+
+def normalize_type(base: str, args: str = "", array: bool = False) -> str:
+    """Canonical spelling of a column type: 'TIMESTAMP(3)', 'VARCHAR(255)', 'UserTier[]'"""
+    base = TYPE_ALIASES.get(base.upper(), base)
+    args = args.replace(" ", "") or _DEFAULT_PRECISION.get(base, "")
+    return f"{base}{args}{'[]' if array else ''}"
+
+
+# ---------------------------------------------------------------------------
+# Prisma schema
+# ---------------------------------------------------------------------------
+
+_PRISMA_COMMENT_RE = re.compile(r'("(?:[^"\\]|\\.)*")|//[^\n]*')
+_PRISMA_BLOCK_RE = re.compile(r"^\s*(model|enum|view|type)\s+(\w+)\s*\{(.*?)^\s*\}", re.MULTILINE | re.DOTALL)
+_PRISMA_FIELD_RE = re.compile(r'^(\w+)\s+(\w+(?:\("[^"]*"\))?)(\[\])?(\?)?(.*)$')
+_MAP_RE = re.compile(r'(?<!@)@map\(\s*(?:name:\s*)?"([^"]*)"')
+_BLOCK_MAP_RE = re.compile(r'@@map\(\s*(?:name:\s*)?"([^"]*)"')
+_NATIVE_RE = re.compile(r"@db\.(\w+)(?:\(([^)]*)\))?")
+_FIELD_ID_RE = re.compile(r"(?<!@)@id\b")
+_FIELD_UNIQUE_RE = re.compile(r"(?<!@)@unique\b")
+_BLOCK_INDEX_RE = re.compile(r"@@(id|unique|index)\(\s*(?:fields:\s*)?\[([^\]]*)\]")
+_IGNORE_RE = re.compile(r"(?<!@)@ignore\b")
+_RELATION_NAME_RE = re.compile(r'@relation\(\s*(?:name:\s*)?"([^"]*)"')
+_RELATION_FIELDS_RE = re.compile(r"@relation\([^)]*\bfields:")
+
+
+def _strip_prisma_comments(text: str) -> str:
+    return _PRISMA_COMMENT_RE.sub(lambda m: m.group(1) or "", text)
+
+
+def _native_type(match: re.Match) -> Tuple[str, str]:
+    name = match.group(1)
+    base = TYPE_ALIASES.get(name.upper(), name.upper())
+    return base, f"({match.group(2)})" if match.group(2) is not None else ""
+
+
+def parse_prisma(text: str) -> Model:
+    """Tables, columns, enums and indexes a Prisma schema migrates to"""
+    blocks = _PRISMA_BLOCK_RE.findall(_strip_prisma_comments(text))
+    models = {name for kind, name, _ in blocks if kind in ("model", "view", "type")}
+    enum_names = {}
+    for kind, name, body in blocks:
+        if kind == "enum":
+            mapped = _BLOCK_MAP_RE.search(body)
+            enum_names[name] = mapped.group(1) if mapped else name
+
+    tables: Dict[str, Dict] = {}
+    enums: Dict[str, List[str]] = {}
+    id_types: Dict[str, str] = {}  # model -> type of its single @id column
+    # (relation name, sorted model pair) -> list fields; two means an implicit many-to-many
+    list_relations: Dict[Tuple[Optional[str], Tuple[str, str]], int] = {}
+    for kind, name, body in blocks:
+        lines = [line.strip() for line in body.splitlines() if line.strip()]
+        if kind == "enum":
+            values = []
+            for line in lines:
+                if line.startswith("@@"):
+                    continue
+                value = line.split()[0]
+                mapped = _MAP_RE.search(line)
+                values.append(mapped.group(1) if mapped else value)
+            enums[enum_names[name]] = values
+            continue
+        if kind != "model" or any(line.startswith("@@ignore") for line in lines):
+            continue
+
+        columns: Dict[str, List] = {}
+        column_of: Dict[str, str] = {}
+        indexes = set()
+        table = name
+        for line in lines:
+            if line.startswith("@@"):
+                mapped = _BLOCK_MAP_RE.match(line)
+                if mapped:
+                    table = mapped.group(1)
+                continue
+            field = _PRISMA_FIELD_RE.match(line)
+            if field is None:
+                continue
+            field_name, field_type, is_list, optional, attrs = field.groups()
+            if _IGNORE_RE.search(attrs):
+                continue
+            if field_type in models:
+                # Relation fields have no column of their own
+                if is_list and not _RELATION_FIELDS_RE.search(attrs):
+                    relation = _RELATION_NAME_RE.search(attrs)
+                    key = (relation.group(1) if relation else None, tuple(sorted((name, field_type))))
+                    list_relations[key] = list_relations.get(key, 0) + 1
+                continue
+            mapped = _MAP_RE.search(attrs)
+            column = mapped.group(1) if mapped else field_name
+            column_of[field_name] = column
+
+            native = _NATIVE_RE.search(attrs)
+            if field_type in enum_names:
+                sql_type = normalize_type(enum_names[field_type], array=bool(is_list))
+            elif native is not None:
+                sql_type = normalize_type(*_native_type(native), array=bool(is_list))
+            elif field_type.startswith("Unsupported("):
+                sql_type = normalize_type(field_type[13:-2].upper(), array=bool(is_list))
+            else:
+                scalar = PRISMA_SCALARS.get(field_type)
+                if scalar is None:
+                    raise SchemaError(f"{name}.{field_name}: unknown type {field_type}")
+                sql_type = scalar + ("[]" if is_list else "")
+            # Prisma creates scalar lists as nullable array columns
+            columns[column] = [sql_type, bool(optional or is_list)]
+
+            if _FIELD_ID_RE.search(attrs):
+                indexes.add(("primary", (column,)))
+                id_types[name] = sql_type
+            if _FIELD_UNIQUE_RE.search(attrs):
+                indexes.add(("unique", (column,)))
+
+        for line in lines:
+            for block_kind, fields in _BLOCK_INDEX_RE.findall(line):
+                names = [re.match(r"\s*(\w+)", f).group(1) for f in fields.split(",") if f.strip()]
+                kind = "primary" if block_kind == "id" else block_kind
+                indexes.add((kind, tuple(column_of.get(n, n) for n in names)))
+        for kind, cols in indexes:
+            if kind == "primary":
+                for column in cols:
+                    if column in columns:
+                        columns[column][1] = False
+        tables[table] = {"columns": columns, "indexes": sorted([k, list(c)] for k, c in indexes)}
+
+    # Implicit many-to-many: list fields on both sides and no @relation(fields:)
+    # make Prisma create "_<relation>" (default "_<A>To<B>", models in name
+    # order) with A and B referencing the two models' IDs
+    for (relation, (first, second)), count in sorted(list_relations.items(), key=str):
+        if count != 2 or first not in id_types or second not in id_types:
+            continue
+        table = "_" + (relation or f"{first}To{second}")
+        tables[table] = {
+            "columns": {"A": [id_types[first], False], "B": [id_types[second], False]},
+            "indexes": [["index", ["B"]], ["unique", ["A", "B"]]],
+            "implicit": True,
+        }
+
+    return {"tables": tables, "enums": enums}
+
+
+# ---------------------------------------------------------------------------
+# SQL migrations
+# ---------------------------------------------------------------------------
+
+_SQL_TOKEN_RE = re.compile(r"""
+    (?P<skip>\s+|--[^\n]*|/\*.*?\*/)
+  | (?P<dollar>\$(?P<tag>[A-Za-z_]\w*|)\$.*?\$(?P=tag)\$)
+  | (?P<str>[EeNn]?'(?:[^']|'')*')
+  | (?P<id>"(?:[^"]|"")*")
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<num>\d+(?:\.\d*)?)
+  | (?P<punct>::|\S)
+""", re.VERBOSE | re.DOTALL)
+
+# (kind, text): words are lower-cased (PostgreSQL folds unquoted names),
+# quoted identifiers and strings are unescaped
+Token = Tuple[str, str]
+_EOF: Token = ("eof", "")
+
+# Words that end a column's type in a column definition
+_TYPE_END = {"not", "null", "default", "constraint", "primary", "unique", "references",
+             "check", "collate", "generated", "using"}
+
+
+def tokenize_sql(sql: str) -> Iterator[List[Token]]:
+    """Token lists of each statement; dollar-quoted bodies stay opaque"""
+    statement: List[Token] = []
+    for match in _SQL_TOKEN_RE.finditer(sql):
+        kind = match.lastgroup
+        if kind == "skip" or kind == "dollar":
+            continue
+        text = match.group(kind)
+        if kind == "word":
+            text = text.lower()
+        elif kind == "id":
+            text = text[1:-1].replace('""', '"')
+        elif kind == "str":
+            text = text[text.index("'") + 1:-1].replace("''", "'")
+        elif text == ";":
+            if statement:
+                yield statement
+            statement = []
+            continue
+        statement.append((kind, text))
+    if statement:
+        yield statement
+
+
+class _Cursor:
+    """Recursive-descent helper over one statement's tokens"""
+
+    __slots__ = ("tokens", "i")
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        self.i = 0
+
+    def peek(self, offset: int = 0) -> Token:
+        i = self.i + offset
+        return self.tokens[i] if i < len(self.tokens) else _EOF
+
+    def next(self) -> Token:
+        token = self.peek()
+        self.i += 1
+        return token
+
+    def at_end(self) -> bool:
+        return self.i >= len(self.tokens)
+
+    def accept(self, *words: str) -> bool:
+        """Consume a sequence of keywords if all of them come next"""
+        for offset, word in enumerate(words):
+            if self.peek(offset) != ("word", word):
+                return False
+        self.i += len(words)
+        return True
+
+    def name(self) -> str:
+        """Identifier, dropping any schema qualifier"""
+        kind, text = self.next()
+        if kind not in ("word", "id"):
+            raise SchemaError(f"expected a name, got {text or 'end of statement'!r}")
+        while self.peek() == ("punct", "."):
+            self.i += 1
+            kind, text = self.next()
+        return text
+
+    def group(self) -> List[List[Token]]:
+        """Comma-separated items of the parenthesized list that comes next"""
+        if self.next() != ("punct", "("):
+            raise SchemaError("expected '('")
+        items: List[List[Token]] = [[]]
+        depth = 0
+        while not self.at_end():
+            token = self.next()
+            if token[0] == "punct":
+                if token[1] == "(":
+                    depth += 1
+                elif token[1] == ")":
+                    if depth == 0:
+                        return [item for item in items if item]
+                    depth -= 1
+                elif token[1] == "," and depth == 0:
+                    items.append([])
+                    continue
+            items[-1].append(token)
+        raise SchemaError("unbalanced parentheses")
+
+    def split(self) -> List["_Cursor"]:
+        """Remaining tokens split at top-level commas"""
+        parts: List[List[Token]] = [[]]
+        depth = 0
+        while not self.at_end():
+            token = self.next()
+            if token[0] == "punct":
+                depth += token[1] == "("
+                depth -= token[1] == ")"
+                if token[1] == "," and depth == 0:
+                    parts.append([])
+                    continue
+            parts[-1].append(token)
+        return [_Cursor(part) for part in parts if part]
+
+    def skip_group(self):
+        depth = 0
+        while not self.at_end():
+            kind, text = self.next()
+            if kind == "punct" and text == "(":
+                depth += 1
+            elif kind == "punct" and text == ")":
+                depth -= 1
+                if depth <= 0:
+                    return
+
+
+def _column_type(c: _Cursor) -> str:
+    words: List[str] = []
+    args = ""
+    array = False
+    while not c.at_end():
+        kind, text = c.peek()
+        if kind == "word" and text in _TYPE_END and words:
+            break
+        if kind == "punct":
+            if text == "(" and not args:
+                start = c.i
+                c.skip_group()
+                args = "".join(t for _, t in c.tokens[start:c.i])  # (3) or (10,2)
+                continue
+            if text == "[":
+                c.i += 1
+                if c.peek() == ("punct", "]"):
+                    c.i += 1
+                elif c.peek()[0] == "num":  # INTEGER[3]
+                    c.i += 2
+                array = True
+                continue
+            if text == ".":  # schema-qualified type: keep the type name
+                c.i += 1
+                words = []
+                continue
+            break
+        c.i += 1
+        words.append(text.upper() if kind == "word" else text)
+    if not words:
+        raise SchemaError("missing column type")
+    return normalize_type(" ".join(words), args, array)
+
+
+def _column_def(c: _Cursor) -> Tuple[str, bool, List[str]]:
+    """(type, nullable, inline index kinds) of a column definition"""
+    sql_type = _column_type(c)
+    nullable = True
+    inline = []
+    while not c.at_end():
+        if c.peek() == ("punct", "("):
+            c.skip_group()  # CHECK (...), DEFAULT (...), GENERATED ... AS (...)
+        elif c.accept("not", "null"):
+            nullable = False
+        elif c.accept("primary", "key"):
+            nullable = False
+            inline.append("primary")
+        elif c.accept("unique"):
+            inline.append("unique")
+        else:
+            c.i += 1
+    return sql_type, nullable, inline
+
+
+def _index_column(item: List[Token]) -> str:
+    if item[0][0] in ("word", "id") and (len(item) == 1 or item[1] != ("punct", "(")):
+        return item[0][1]
+    return "(" + " ".join(text for _, text in item) + ")"  # expression index
+
+
+def _constraint(c: _Cursor) -> Optional[Tuple[str, List[str]]]:
+    """(kind, columns) of a PRIMARY KEY / UNIQUE table constraint, else None"""
+    if c.accept("primary", "key"):
+        kind = "primary"
+    elif c.accept("unique"):
+        kind = "unique"
+        c.accept("nulls", "not", "distinct")
+        c.accept("nulls", "distinct")
+    else:
+        return None  # FOREIGN KEY, CHECK, EXCLUDE
+    return kind, [_index_column(item) for item in c.group()]
+
+
+def _parse_create(c: _Cursor) -> List[List]:
+    c.accept("or", "replace")
+    unique = c.accept("unique")
+    if c.accept("index"):
+        c.accept("concurrently")
+        c.accept("if", "not", "exists")
+        name = None if c.peek() == ("word", "on") else c.name()
+        c.accept("on")
+        c.accept("only")
+        table = c.name()
+        if c.accept("using"):
+            c.next()
+        columns = [_index_column(item) for item in c.group()]
+        return [["add_index", table, name, "unique" if unique else "index", columns]]
+
+    for modifier in ("global", "local", "temporary", "temp", "unlogged"):
+        c.accept(modifier)
+    if c.accept("table"):
+        c.accept("if", "not", "exists")
+        table = c.name()
+        if c.peek() != ("punct", "("):
+            return []  # CREATE TABLE ... AS / PARTITION OF
+        columns: Dict[str, List] = {}
+        constraints: List[List] = []
+        for item in c.group():
+            e = _Cursor(item)
+            name = e.name() if e.accept("constraint") else None
+            if e.peek()[0] == "word" and e.peek()[1] in ("primary", "unique", "foreign", "check", "exclude", "like"):
+                found = _constraint(e)
+                if found is not None:
+                    constraints.append([found[0], found[1], name])
+                continue
+            column = e.name()
+            sql_type, nullable, inline = _column_def(e)
+            columns[column] = [sql_type, nullable]
+            constraints.extend([kind, [column], None] for kind in inline)
+        return [["create_table", table, columns, constraints]]
+
+    if c.accept("type"):
+        name = c.name()
+        if not c.accept("as", "enum"):
+            return []  # composite and range types
+        return [["create_enum", name, [text for item in c.group() for kind, text in item if kind == "str"]]]
+    return []
+
+
+def _parse_alter_table(c: _Cursor) -> List[List]:
+    c.accept("if", "exists")
+    c.accept("only")
+    table = c.name()
+    ops: List[List] = []
+    for a in c.split():
+        if a.accept("add"):
+            name = a.name() if a.accept("constraint") else None
+            if a.peek()[0] == "word" and a.peek()[1] in ("primary", "unique", "foreign", "check", "exclude"):
+                found = _constraint(a)
+                if found is not None:
+                    ops.append(["add_index", table, name, found[0], found[1]])
+                continue
+            a.accept("column")
+            a.accept("if", "not", "exists")
+            column = a.name()
+            sql_type, nullable, inline = _column_def(a)
+            ops.append(["add_column", table, column, sql_type, nullable])
+            ops.extend(["add_index", table, None, kind, [column]] for kind in inline)
+        elif a.accept("drop"):
+            if a.accept("constraint"):
+                a.accept("if", "exists")
+                ops.append(["drop_index", a.name()])
+                continue
+            a.accept("column")
+            a.accept("if", "exists")
+            ops.append(["drop_column", table, a.name()])
+        elif a.accept("alter"):
+            a.accept("column")
+            column = a.name()
+            if a.accept("set", "not", "null"):
+                ops.append(["set_nullable", table, column, False])
+            elif a.accept("drop", "not", "null"):
+                ops.append(["set_nullable", table, column, True])
+            elif a.accept("set", "data", "type") or a.accept("type"):
+                ops.append(["set_type", table, column, _column_type(a)])
+        elif a.accept("rename"):
+            if a.accept("to"):
+                ops.append(["rename_table", table, a.name()])
+            elif a.accept("constraint"):
+                old = a.name()
+                a.accept("to")
+                ops.append(["rename_index", old, a.name()])
+            else:
+                a.accept("column")
+                old = a.name()
+                a.accept("to")
+                ops.append(["rename_column", table, old, a.name()])
+    return ops
+
+
+def _parse_alter_type(c: _Cursor) -> List[List]:
+    name = c.name()
+    if c.accept("add", "value"):
+        c.accept("if", "not", "exists")
+        value = c.next()[1]
+        anchor = None
+        if c.peek()[0] == "word" and c.peek()[1] in ("before", "after"):
+            anchor = [c.next()[1], c.next()[1]]
+        return [["add_enum_value", name, value, anchor]]
+    if c.accept("rename", "value"):
+        old = c.next()[1]
+        c.accept("to")
+        return [["rename_enum_value", name, old, c.next()[1]]]
+    if c.accept("rename", "to"):
+        return [["rename_enum", name, c.name()]]
+    return []
+
+
+def _parse_drop(c: _Cursor) -> List[List]:
+    for kind, op in (("table", "drop_table"), ("type", "drop_enum"), ("index", "drop_index")):
+        if c.accept(kind):
+            c.accept("concurrently")
+            c.accept("if", "exists")
+            return [[op, item.name()] for item in c.split()]
+    return []
+
+
+def parse_migration(sql: str) -> List[List]:
+    """Schema operations of a migration, in order; other statements are ignored"""
+    ops: List[List] = []
+    for tokens in tokenize_sql(sql):
+        c = _Cursor(tokens)
+        try:
+            if c.accept("create"):
+                ops.extend(_parse_create(c))
+            elif c.accept("alter", "table"):
+                ops.extend(_parse_alter_table(c))
+            elif c.accept("alter", "type"):
+                ops.extend(_parse_alter_type(c))
+            elif c.accept("alter", "index"):
+                c.accept("if", "exists")
+                old = c.name()
+                if c.accept("rename", "to"):
+                    ops.append(["rename_index", old, c.name()])
+            elif c.accept("drop"):
+                ops.extend(_parse_drop(c))
+        except SchemaError as e:
+            head = " ".join(text for _, text in tokens[:4])
+            raise SchemaError(f"{e} in statement '{head} ...'")
+    return ops
+
+
+class MigrationReplay:
+    """Applies migration operations in order to build the resulting model
+
+    Re-creating an existing table or enum replaces it, so a squashed
+    baseline followed by the incremental migrations it summarizes replays
+    to the same result.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, Dict[str, List]] = {}
+        self.enums: Dict[str, List[str]] = {}
+        # index or constraint name -> [table, kind, columns]
+        self.indexes: Dict[str, List] = {}
+
+    def apply(self, op: List):
+        getattr(self, f"_{op[0]}")(*op[1:])
+
+    def _resolve_type(self, sql_type: str) -> str:
+        """Unquoted enum names were upper-cased with the built-in type
+        names; PostgreSQL folds them to lower case"""
+        base = sql_type[:-2] if sql_type.endswith("[]") else sql_type
+        if base not in self.enums and base.lower() in self.enums:
+            return base.lower() + sql_type[len(base):]
+        return sql_type
+
+    def _drop_indexes(self, table: str, column: Optional[str] = None):
+        for name, (owner, _, cols) in list(self.indexes.items()):
+            if owner == table and (column is None or column in cols):
+                del self.indexes[name]
+
+    def _create_table(self, table: str, columns: Dict[str, List], constraints: List[List]):
+        self._drop_indexes(table)
+        self.tables[table] = {column: [self._resolve_type(sql_type), nullable]
+                              for column, (sql_type, nullable) in columns.items()}
+        for kind, cols, name in constraints:
+            self._add_index(table, name, kind, cols)
+
+    def _drop_table(self, table: str):
+        self.tables.pop(table, None)
+        self._drop_indexes(table)
+
+    def _rename_table(self, table: str, new: str):
+        if table in self.tables:
+            self.tables[new] = self.tables.pop(table)
+        for entry in self.indexes.values():
+            if entry[0] == table:
+                entry[0] = new
+
+    def _add_column(self, table: str, column: str, sql_type: str, nullable: bool):
+        if table in self.tables:
+            self.tables[table][column] = [self._resolve_type(sql_type), nullable]
+
+    def _drop_column(self, table: str, column: str):
+        self.tables.get(table, {}).pop(column, None)
+        self._drop_indexes(table, column)
+
+    def _rename_column(self, table: str, old: str, new: str):
+        columns = self.tables.get(table)
+        if columns is not None and old in columns:
+            # Keep column order stable for readable diffs
+            self.tables[table] = {new if name == old else name: spec for name, spec in columns.items()}
+        for entry in self.indexes.values():
+            if entry[0] == table:
+                entry[2] = [new if col == old else col for col in entry[2]]
+
+    def _set_nullable(self, table: str, column: str, nullable: bool):
+        spec = self.tables.get(table, {}).get(column)
+        if spec is not None:
+            spec[1] = nullable
+
+    def _set_type(self, table: str, column: str, sql_type: str):
+        spec = self.tables.get(table, {}).get(column)
+        if spec is not None:
+            spec[0] = self._resolve_type(sql_type)
+
+    def _add_index(self, table: str, name: Optional[str], kind: str, cols: List[str]):
+        if name is None:  # PostgreSQL's generated names
+            suffix = {"primary": "pkey", "unique": "key", "index": "idx"}[kind]
+            name = f"{table}_pkey" if kind == "primary" else f"{table}_{'_'.join(cols)}_{suffix}"
+        self.indexes[name] = [table, kind, list(cols)]
+        if kind == "primary":
+            for column in cols:
+                self._set_nullable(table, column, False)
+
+    def _drop_index(self, name: str):
+        self.indexes.pop(name, None)
+
+    def _rename_index(self, old: str, new: str):
+        if old in self.indexes:
+            self.indexes[new] = self.indexes.pop(old)
+
+    def _create_enum(self, name: str, values: List[str]):
+        self.enums[name] = list(values)
+
+    def _drop_enum(self, name: str):
+        self.enums.pop(name, None)
+
+    def _add_enum_value(self, name: str, value: str, anchor: Optional[List[str]]):
+        values = self.enums.get(name)
+        if values is None or value in values:
+            return
+        if anchor is not None and anchor[1] in values:
+            position = values.index(anchor[1]) + (anchor[0] == "after")
+            values.insert(position, value)
+        else:
+            values.append(value)
+
+    def _rename_enum_value(self, name: str, old: str, new: str):
+        values = self.enums.get(name)
+        if values is not None and old in values:
+            values[values.index(old)] = new
+
+    def _rename_enum(self, name: str, new: str):
+        if name in self.enums:
+            self.enums[new] = self.enums.pop(name)
+        for columns in self.tables.values():
+            for spec in columns.values():
+                if spec[0] in (name, f"{name}[]"):
+                    spec[0] = spec[0].replace(name, new, 1)
+
+    def model(self) -> Model:
+        indexes: Dict[str, set] = {table: set() for table in self.tables}
+        for table, kind, cols in self.indexes.values():
+            if table in indexes:
+                indexes[table].add((kind, tuple(cols)))
+        tables = {table: {"columns": columns, "indexes": sorted([k, list(c)] for k, c in indexes[table])}
+                  for table, columns in self.tables.items()}
+        return {"tables": tables, "enums": dict(self.enums)}
+
+
+def replay_migrations(migrations: List[List[List]]) -> Model:
+    """Model produced by applying each migration's operations in order"""
+    replay = MigrationReplay()
+    for ops in migrations:
+        for op in ops:
+            replay.apply(op)
+    return replay.model()
+
+
+# ---------------------------------------------------------------------------
+# Drift
+# ---------------------------------------------------------------------------
+
+def diff_models(schema: Model, migrations: Model, schema_label: str = SCHEMA_PATHS[0],
+                limit: int = MAX_DRIFT) -> List[str]:
+    """Differences between what the schema declares and what the migrations build"""
+    sides = {True: f"only in {schema_label}", False: "only in the migrations"}
+    drift: List[str] = []
+
+    def one_sided(what: str, ours: Dict, theirs: Dict) -> List[str]:
+        for name in sorted(set(ours) ^ set(theirs)):
+            drift.append(f"{what.format(name)} is {sides[name in ours]}")
+        return sorted(set(ours) & set(theirs))
+
+    for name in one_sided("Enum {}", schema["enums"], migrations["enums"]):
+        ours, theirs = schema["enums"][name], migrations["enums"][name]
+        for value in [v for v in ours if v not in theirs] + [v for v in theirs if v not in ours]:
+            drift.append(f"Enum {name} value {value} is {sides[value in ours]}")
+
+    for table in one_sided("Table {}", schema["tables"], migrations["tables"]):
+        ours, theirs = schema["tables"][table], migrations["tables"][table]
+        for column in one_sided(f"Column {table}.{{}}", ours["columns"], theirs["columns"]):
+            (our_type, our_null), (their_type, their_null) = ours["columns"][column], theirs["columns"][column]
+            if our_type != their_type:
+                drift.append(f"Column {table}.{column} type differs: {our_type} in {schema_label}, "
+                             f"{their_type} in the migrations")
+            if our_null != their_null:
+                label = {True: "NULL", False: "NOT NULL"}
+                drift.append(f"Column {table}.{column} nullability differs: {label[our_null]} in "
+                             f"{schema_label}, {label[their_null]} in the migrations")
+        our_indexes = {(k, tuple(c)) for k, c in ours["indexes"]}
+        their_indexes = {(k, tuple(c)) for k, c in theirs["indexes"]}
+        if ours.get("implicit"):
+            # Prisma 6 makes (A, B) the primary key of join tables; before, a unique index
+            their_indexes = {("unique", cols) if (kind, cols) == ("primary", ("A", "B")) else (kind, cols)
+                             for kind, cols in their_indexes}
+        for kind, cols in sorted(our_indexes ^ their_indexes):
+            drift.append(f"{INDEX_LABELS[kind]} on {table}({', '.join(cols)}) is "
+                         f"{sides[(kind, cols) in our_indexes]}")
+
+    errors = [f"Schema drift: {message}" for message in drift[:limit]]
+    if len(drift) > limit:
+        errors.append(f"Schema drift: ... and {len(drift) - limit} more differences")
+    return errors
+
+
+def main():
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(description="Report drift between a Prisma schema and its SQL migrations")
+    parser.add_argument("--schema", default=SCHEMA_PATHS[0], help="Prisma schema file")
+    parser.add_argument("--migrations", help="Migrations directory (default: next to the schema)")
+    parser.add_argument("--limit", type=int, default=MAX_DRIFT, help="Maximum differences to list")
+    args = parser.parse_args()
+
+    schema_path = Path(args.schema)
+    migrations_dir = Path(args.migrations) if args.migrations else schema_path.parent / "migrations"
+    # NNN_name.sql files and Prisma's <timestamp>_name/migration.sql both apply in name order
+    files = sorted(str(p) for p in migrations_dir.rglob("*.sql"))
+    try:
+        schema = parse_prisma(schema_path.read_text(encoding="utf-8"))
+        migrations = replay_migrations([parse_migration(Path(f).read_text(encoding="utf-8")) for f in files])
+    except (OSError, SchemaError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(2)
+
+    drift = diff_models(schema, migrations, str(schema_path), args.limit)
+    print(f"📋 {len(schema['tables'])} models, {len(files)} migrations")
+    if not drift:
+        print("✅ No schema drift")
+        return
+    for message in drift:
+        print(f"❌ {message}")
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
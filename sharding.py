@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Per-project SQLite sharding
+Each project lives in its own database file under shards/, so projects
+never queue behind each other's write lock. A small catalog database maps
+project IDs to shard files; cross-project queries fan out across the
+shards in parallel.
+"""
+
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database import Database
+from forecast import Histograms
+
+CATALOG_FILE = "catalog.db"
+SHARD_DIR = "shards"
+
+# Job IDs are shard-local; callers see (project_id << JOB_ID_BITS) | local ID
+JOB_ID_BITS = 32
+
+# Database methods whose first argument is a project ID; these go to the
+# project's shard unchanged
+PROJECT_METHODS = frozenset({
+    "get_project", "update_project", "get_agents", "get_agent", "update_agent",
+    "ingest_agent_reports", "log_event", "get_events", "update_phase_timeline",
+    "transition_phase", "record_artifacts", "get_artifacts", "record_validation_run",
+    "get_validation_runs", "get_check_costs", "get_phase_timeline", "export_to_json",
+})
+
+SHARDS_TABLE = """
+    CREATE TABLE IF NOT EXISTS project_shards (
+        project_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        shard TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class ShardError(KeyError):
+    """Raised for a project ID the catalog does not know"""
+    pass
+
+
+class PartialWriteError(Exception):
+    """Raised when a cross-shard write failed on some shards only
+
+    The other shards committed; failed holds the updates to retry and
+    errors the (project_id, exception) of each failed shard.
+    """
+
+    def __init__(self, written: int, failed: List, errors: List[Tuple[int, Exception]]):
+        super().__init__(f"{len(errors)} of the shards failed, e.g. project {errors[0][0]}: {errors[0][1]}")
+        self.written = written
+        self.failed = failed
+        self.errors = errors
+
+
+def global_job_id(project_id: int, local_id: int) -> int:
+    return (project_id << JOB_ID_BITS) | local_id
+
+
+def split_job_id(job_id: int) -> Tuple[int, int]:
+    """(project_id, shard-local job ID)"""
+    return job_id >> JOB_ID_BITS, job_id & ((1 << JOB_ID_BITS) - 1)
+
+
+def merge_stats(parts: List[Dict]) -> Dict:
+    """Sum Database.get_stats() results"""
+    merged: Dict = {}
+    for stats in parts:
+        for key, value in stats.items():
+            if isinstance(value, dict):
+                merged.setdefault(key, Counter()).update(value)
+            else:
+                merged[key] = merged.get(key, 0) + value
+    return {key: dict(value) if isinstance(value, Counter) else value for key, value in merged.items()}
+
+
+def open_database(path: str):
+    """A ShardedDatabase for a shard directory, else a single-file Database"""
+    if Path(path).is_dir():
+        return ShardedDatabase(path)
+    return Database(path)
+
+
+class ShardedDatabase:
+    """Database API over one SQLite file per project
+
+    Project-scoped calls are routed to the project's shard. Cross-project
+    calls (list_projects, get_stats, get_active_project, job claiming, ...)
+    run on every shard in a thread pool. The catalog is itself an
+    orchestrator database without projects, so global tables such as the
+    webhook dead letters live there.
+    """
+
+    def __init__(self, root: str = "orchestrator-shards", timeout: float = 30.0, max_workers: int = 16):
+        self.root = Path(root)
+        (self.root / SHARD_DIR).mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        self.catalog = Database(str(self.root / CATALOG_FILE), timeout)
+        with self.catalog.transaction() as cursor:
+            cursor.execute(SHARDS_TABLE)
+        self._shards: Dict[int, Database] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard")
+        self._claim_cursor = 0  # round-robin start for claim_job across shards
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    # -- routing -------------------------------------------------------------
+
+    def shard_path(self, project_id: int) -> Path:
+        return self.root / SHARD_DIR / f"project-{project_id:06d}.db"
+
+    def shard(self, project_id: int) -> Database:
+        db = self._shards.get(project_id)
+        if db is not None:
+            return db
+        with self.catalog.get_connection() as conn:
+            row = conn.execute("SELECT shard FROM project_shards WHERE project_id = ?", (project_id,)).fetchone()
+        if row is None:
+            raise ShardError(f"Unknown project {project_id}")
+        with self._lock:
+            db = self._shards.get(project_id)
+            if db is None:
+                db = self._shards[project_id] = Database(str(self.root / row[0]), self.timeout)
+        return db
+
+    def project_ids(self) -> List[int]:
+        with self.catalog.get_connection() as conn:
+            return [row[0] for row in conn.execute("SELECT project_id FROM project_shards ORDER BY project_id")]
+
+    def fan_out(self, func: Callable[[int, Database], object]) -> List:
+        """func(project_id, shard) on every shard in parallel, in project order"""
+        ids = self.project_ids()
+        return list(self._pool.map(lambda project_id: func(project_id, self.shard(project_id)), ids))
+
+    def __getattr__(self, name: str):
+        if name not in PROJECT_METHODS:
+            raise AttributeError(f"{type(self).__name__} has no attribute '{name}'")
+
+        def route(project_id: int, *args, **kwargs):
+            return getattr(self.shard(project_id), name)(project_id, *args, **kwargs)
+        route.__name__ = name
+        return route
+
+    # -- projects ------------------------------------------------------------
+
+    def _allocate(self, name: str) -> int:
+        """Reserve a project ID and its shard file name in the catalog"""
+        with self.catalog.transaction() as cursor:
+            cursor.execute("INSERT INTO project_shards (name, shard) VALUES (?, '')", (name,))
+            project_id = cursor.lastrowid
+            cursor.execute("UPDATE project_shards SET shard = ? WHERE project_id = ?",
+                           (str(self.shard_path(project_id).relative_to(self.root)), project_id))
+        return project_id
+
+    def _release(self, project_id: int):
+        with self.catalog.transaction() as cursor:
+            cursor.execute("DELETE FROM project_shards WHERE project_id = ?", (project_id,))
+        self._shards.pop(project_id, None)
+        self.shard_path(project_id).unlink(missing_ok=True)
+
+    def create_project(self, name: str, version: str = "1.0.0", agents: Optional[List[str]] = None) -> int:
+        project_id = self._allocate(name)
+        try:
+            self.shard(project_id).create_project(name, version, agents, project_id=project_id)
+        except BaseException:
+            self._release(project_id)
+            raise
+        return project_id
+
+    def import_from_json(self, json_data: Dict) -> int:
+        project_id = self._allocate(json_data.get("project", "Imported Project"))
+        try:
+            self.shard(project_id).import_from_json(json_data, project_id=project_id)
+        except BaseException:
+            self._release(project_id)
+            raise
+        return project_id
+
+    def apply_agent_updates(self, updates: List[Tuple[int, str, Dict]]) -> int:
+        """One group commit per shard touched, run in parallel
+
+        Shards commit independently: if any fail, PartialWriteError carries
+        just their updates, so a retry does not rewrite the others.
+        """
+        by_project: Dict[int, List[Tuple[int, str, Dict]]] = {}
+        for update in updates:
+            by_project.setdefault(update[0], []).append(update)
+
+        def write(project_id: int) -> Tuple[int, Optional[Exception]]:
+            try:
+                return self.shard(project_id).apply_agent_updates(by_project[project_id]), None
+            except Exception as e:
+                return 0, e
+
+        results = dict(zip(by_project, self._pool.map(write, by_project)))
+        written = sum(rows for rows, _ in results.values())
+        errors = [(project_id, error) for project_id, (_, error) in results.items() if error is not None]
+        if errors:
+            raise PartialWriteError(written, [update for project_id, _ in errors
+                                              for update in by_project[project_id]], errors)
+        return written
+
+    def list_projects(self) -> List[Dict]:
+        return [row for rows in self.fan_out(lambda pid, db: db.list_projects()) for row in rows]
+
+    def get_active_project(self) -> Optional[Dict]:
+        """The most recently updated project across all shards"""
+        projects = [p for p in self.fan_out(lambda pid, db: db.get_active_project()) if p]
+        return max(projects, key=lambda p: p["updated_at"] or "", default=None)
+
+    def get_stats(self) -> Dict:
+        stats = merge_stats(self.fan_out(lambda pid, db: db.get_stats()))
+        stats["shards"] = len(self.project_ids())
+        return stats
+
+    def get_duration_stats(self) -> Histograms:
+        """Duration histograms summed over every shard"""
+        merged: Histograms = {}
+        for histograms in self.fan_out(lambda pid, db: db.get_duration_stats()):
+            for key, counts in histograms.items():
+                target = merged.setdefault(key, {})
+                for bucket, count in counts.items():
+                    target[bucket] = target.get(bucket, 0) + count
+        return merged
+
+    # -- webhook dead letters (catalog) --------------------------------------
+
+    def record_dead_letters(self, endpoint: str, events: List[Dict], error: str, attempts: int) -> int:
+        return self.catalog.record_dead_letters(endpoint, events, error, attempts)
+
+    def get_dead_letters(self, endpoint: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        return self.catalog.get_dead_letters(endpoint, limit)
+
+    # -- job queue -----------------------------------------------------------
+
+    @staticmethod
+    def _globalize(project_id: int, job: Optional[Dict]) -> Optional[Dict]:
+        if job is not None:
+            job["id"] = global_job_id(project_id, job["id"])
+        return job
+
+    def enqueue_job(self, project_id: int, agent_name: str, payload: Optional[Dict] = None,
+                    priority: int = 0, max_attempts: int = 3) -> int:
+        local_id = self.shard(project_id).enqueue_job(project_id, agent_name, payload, priority, max_attempts)
+        return global_job_id(project_id, local_id)
+
+    def claim_job(self, worker_id: str, lease_seconds: float = 60.0,
+                  project_id: Optional[int] = None) -> Optional[Dict]:
+        """Claim from one project, or from the shards in round-robin order
+
+        Priorities order jobs within a project; across projects, workers
+        rotate so that one busy project cannot starve the others.
+        """
+        if project_id is not None:
+            return self._globalize(project_id, self.shard(project_id).claim_job(worker_id, lease_seconds, project_id))
+        ids = self.project_ids()
+        if not ids:
+            return None
+        start = self._claim_cursor % len(ids)
+        self._claim_cursor += 1
+        for pid in ids[start:] + ids[:start]:
+            job = self.shard(pid).claim_job(worker_id, lease_seconds, pid)
+            if job is not None:
+                return self._globalize(pid, job)
+        return None
+
+    def heartbeat_job(self, job_id: int, worker_id: str, lease_seconds: float = 60.0) -> bool:
+        project_id, local_id = split_job_id(job_id)
+        return self.shard(project_id).heartbeat_job(local_id, worker_id, lease_seconds)
+
+    def complete_job(self, job_id: int, worker_id: str, result: Optional[Dict] = None) -> bool:
+        project_id, local_id = split_job_id(job_id)
+        return self.shard(project_id).complete_job(local_id, worker_id, result)
+
+    def fail_job(self, job_id: int, worker_id: str, error: str, retry: bool = True) -> bool:
+        project_id, local_id = split_job_id(job_id)
+        return self.shard(project_id).fail_job(local_id, worker_id, error, retry)
+
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        project_id, local_id = split_job_id(job_id)
+        return self._globalize(project_id, self.shard(project_id).get_job(local_id))
+
+    def get_jobs(self, project_id: int, status: Optional[str] = None) -> List[Dict]:
+        return [self._globalize(project_id, job) for job in self.shard(project_id).get_jobs(project_id, status)]
+
+    def reclaim_expired_jobs(self) -> int:
+        return sum(self.fan_out(lambda pid, db: db.reclaim_expired_jobs()))
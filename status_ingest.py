@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Agent status ingestion service
+Agents report progress, status and todo counts to a local service (Unix
+socket, optionally localhost HTTP) instead of running their own
+read-modify-write against the database. Updates are coalesced per agent
+for a short window and applied in group-committed batches; when too many
+distinct agents are waiting on a slow database, new ones are refused with
+a retry hint instead of queueing without bound.
+
+Socket protocol: one JSON object per line in each direction, e.g.
+  {"agent": "backend", "status": "IN_PROGRESS", "progress": "40%", "todos_completed": 3}
+  {"ok": true, "accepted": 1}
+A line may also carry {"updates": [...]}; an update with only "agent" is a
+heartbeat. "project" defaults to the active project; "sync": true answers
+only once the update is committed (or 500 if it was given up on). Other commands: {"cmd": "stats"},
+{"cmd": "shutdown"}.
+
+HTTP: POST /updates with the same JSON (202, or 429 with Retry-After),
+GET /stats.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from metrics import registry as metrics
+from sharding import PartialWriteError
+
+# Agent columns an update may set, with their accepted types
+FIELDS = {
+    "phase": str,
+    "status": str,
+    "progress": str,
+    "todos_completed": int,
+    "todos_total": int,
+}
+
+LISTEN_BACKLOG = 256  # agents connecting at once
+
+DEFAULT_WINDOW = 0.05       # seconds updates are coalesced before a group commit
+DEFAULT_MAX_PENDING = 10_000  # distinct agents waiting for a commit before refusing more
+DEFAULT_MAX_ATTEMPTS = 8      # failed commits before an update is dropped as poison
+RETRY_BACKOFF_MAX = 5.0
+PROJECT_REFRESH = 1.0         # at most one project-list reload per second on unknown IDs
+
+
+class IngestError(ValueError):
+    """Raised for a malformed update"""
+    pass
+
+
+class CommitFailed(Exception):
+    """Raised to a sync waiter whose update was dropped after max_attempts"""
+    pass
+
+
+class Overloaded(Exception):
+    """Raised when the pending set is full; the client should retry later"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"overloaded, retry in {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+
+def default_socket_path(project_root: str = ".") -> str:
+    """Per-user, per-project socket path (override with AGENT_STATUS_SOCKET)"""
+    env = os.environ.get("AGENT_STATUS_SOCKET")
+    if env:
+        return env
+    root = str(Path(project_root).resolve())
+    digest = hashlib.sha1(root.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"agent-status-{os.getuid()}-{digest}.sock")
+
+
+def parse_update(update: Dict, default_project: Optional[int]) -> Tuple[int, str, Dict]:
+    """Validate one update into (project_id, agent, fields)"""
+    if not isinstance(update, dict):
+        raise IngestError("update must be a JSON object")
+    agent = update.get("agent")
+    if not isinstance(agent, str) or not agent:
+        raise IngestError("update needs an 'agent' name")
+    project = update.get("project", default_project)
+    if not isinstance(project, int) or isinstance(project, bool):
+        raise IngestError("no project: pass 'project' or create one first")
+    fields = {}
+    for key, value in update.items():
+        if key in ("agent", "project", "sync"):
+            continue
+        kind = FIELDS.get(key)
+        if kind is None:
+            raise IngestError(f"unknown field '{key}'")
+        if not isinstance(value, kind) or isinstance(value, bool):
+            raise IngestError(f"'{key}' must be {kind.__name__}")
+        fields[key] = value
+    return project, agent, fields
+
+
+class StatusIngestor:
+    """Coalescing buffer in front of Database.apply_agent_updates
+
+    accept() merges an update into the pending entry for its agent (later
+    fields win) and returns the batch generation that will commit it. A
+    flusher thread swaps out the pending set every window and writes it in
+    one transaction; wait_committed() blocks until a generation is durable.
+
+    Updates whose commit fails go back into the pending set, except those
+    a sharded database reports as committed. After max_attempts failures
+    an update is dropped rather than retried forever.
+    """
+
+    def __init__(self, db, window: float = DEFAULT_WINDOW, max_pending: int = DEFAULT_MAX_PENDING,
+                 agents: Optional[Tuple[str, ...]] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.db = db
+        self.window = window
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.agents = frozenset(agents) if agents else None
+        self._pending: Dict[Tuple[int, str], Dict] = {}
+        self._retrying: Dict[Tuple[int, str], int] = {}  # failed commits per requeued key
+        self._dropped: Dict[Tuple[int, str], int] = {}   # generation a key was last dropped in
+        self._cond = threading.Condition()
+        self._generation = 1      # batch now collecting
+        self._committed = 0       # last batch written (whatever of it succeeded)
+        self._flush_seconds = 0.0  # duration of the last group commit
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self._projects: frozenset = frozenset()
+        self._projects_loaded = float("-inf")
+        self._projects_lock = threading.Lock()
+        self.stats = {"received": 0, "coalesced": 0, "batches": 0, "rows": 0,
+                      "refused": 0, "rejected": 0, "errors": 0, "dropped": 0}
+
+    def start(self) -> "StatusIngestor":
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="status-flusher", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self, timeout: float = 10.0):
+        """Stop after committing what is pending"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def accept(self, updates: List[Tuple[int, str, Dict]]) -> int:
+        """Queue validated updates; returns their batch generation
+
+        All or nothing: if the updates would add agents beyond max_pending,
+        none are taken and Overloaded says when to retry.
+        """
+        unknown = self._unknown_projects(updates)
+        with self._cond:
+            if unknown:
+                self.stats["rejected"] += 1
+                raise IngestError(f"unknown project {unknown[0]}")
+            if self.agents is not None:
+                for _, agent, _ in updates:
+                    if agent not in self.agents:
+                        self.stats["rejected"] += 1
+                        raise IngestError(f"unknown agent '{agent}'")
+            if not self._running:
+                raise Overloaded(1.0)
+            new = {(project, agent) for project, agent, _ in updates} - self._pending.keys()
+            if len(self._pending) + len(new) > self.max_pending:
+                self.stats["refused"] += len(updates)
+                metrics.inc("orchestrator_status_updates_total", len(updates), outcome="refused")
+                # Roughly one commit frees the whole pending set
+                raise Overloaded(max(self.window, self._flush_seconds))
+            for project, agent, fields in updates:
+                pending = self._pending.get((project, agent))
+                if pending is None:
+                    self._pending[(project, agent)] = dict(fields)
+                else:
+                    pending.update(fields)
+                    self.stats["coalesced"] += 1
+            self.stats["received"] += len(updates)
+            metrics.inc("orchestrator_status_updates_total", len(updates), outcome="accepted")
+            return self._generation
+
+    def _unknown_projects(self, updates: List[Tuple[int, str, Dict]]) -> List[int]:
+        """Project IDs the database does not have; reloads the list on a miss"""
+        with self._projects_lock:
+            unknown = {project for project, _, _ in updates} - self._projects
+            if unknown and time.monotonic() - self._projects_loaded >= PROJECT_REFRESH:
+                self._projects = frozenset(project["id"] for project in self.db.list_projects())
+                self._projects_loaded = time.monotonic()
+                unknown -= self._projects
+        return sorted(unknown)
+
+    def wait_committed(self, generation: int, keys: List[Tuple[int, str]],
+                       timeout: Optional[float] = None) -> bool:
+        """Wait until the updates for keys accepted at generation are durable
+
+        False on timeout; CommitFailed if one of them was dropped.
+        """
+        def failed() -> bool:
+            return any(self._dropped.get(key, 0) >= generation for key in keys)
+
+        def committed() -> bool:
+            return self._committed >= generation and not any(key in self._retrying for key in keys)
+
+        with self._cond:
+            self._cond.wait_for(lambda: committed() or failed() or not self._thread.is_alive(), timeout)
+            if failed():
+                raise CommitFailed(f"update dropped after {self.max_attempts} failed commits")
+            return committed()
+
+    def snapshot(self) -> Dict:
+        with self._cond:
+            return dict(self.stats, pending=len(self._pending), committed_generation=self._committed,
+                        last_flush_ms=round(self._flush_seconds * 1000, 3))
+
+    def _flush_loop(self):
+        backoff = self.window
+        while True:
+            with self._cond:
+                # Coalescing window: give agents time to overwrite themselves
+                self._cond.wait(self.window)
+                if not self._pending:
+                    if not self._running:
+                        return
+                    continue
+                batch, self._pending = self._pending, {}
+                generation = self._generation
+                self._generation += 1
+
+            updates = [(project, agent, fields) for (project, agent), fields in batch.items()]
+            start = time.perf_counter()
+            try:
+                rows, failed = self.db.apply_agent_updates(updates), []
+            except PartialWriteError as e:
+                rows, failed, error = e.written, e.failed, e
+            except Exception as e:
+                rows, failed, error = 0, updates, e
+            elapsed = time.perf_counter() - start
+            metrics.observe("orchestrator_status_batch_seconds", elapsed)
+            metrics.observe("orchestrator_status_batch_size", len(batch))
+            with self._cond:
+                failed_keys = {(project, agent) for project, agent, _ in failed}
+                for key in batch.keys() - failed_keys:
+                    self._retrying.pop(key, None)
+                dropped = self._requeue(failed, generation)
+                self._flush_seconds = elapsed
+                self._committed = generation
+                self.stats["batches"] += 1
+                self.stats["rows"] += rows
+                self.stats["errors"] += bool(failed)
+                self._cond.notify_all()
+            if not failed:
+                backoff = self.window
+                continue
+            print(f"⚠️  {len(failed)} of {len(batch)} status updates failed "
+                  f"({len(dropped)} dropped), retrying: {error}", file=sys.stderr)
+            time.sleep(backoff)
+            backoff = min(backoff * 2, RETRY_BACKOFF_MAX)
+
+    def _requeue(self, failed: List[Tuple[int, str, Dict]], generation: int) -> List[Tuple[int, str]]:
+        """Put failed updates back under anything newer; returns those dropped"""
+        dropped = []
+        for project, agent, fields in failed:
+            key = (project, agent)
+            attempts = self._retrying.pop(key, 0) + 1
+            if attempts >= self.max_attempts:
+                # Poison: newer fields already pending for the agent still get their own tries
+                self._dropped[key] = generation
+                self.stats["dropped"] += 1
+                metrics.inc("orchestrator_status_updates_total", outcome="dropped")
+                dropped.append(key)
+            else:
+                self._retrying[key] = attempts
+                self._pending[key] = dict(fields, **self._pending.get(key, {}))
+        return dropped
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+
+class StatusService:
+    """Socket (and optional HTTP) front end of a StatusIngestor"""
+
+    def __init__(self, ingestor: StatusIngestor, default_project: Optional[int],
+                 sync_timeout: float = 30.0):
+        self.ingestor = ingestor
+        self.default_project = default_project
+        self.sync_timeout = sync_timeout
+        self.servers: List[socketserver.BaseServer] = []
+        self.stopped = threading.Event()
+
+    def handle(self, message: Dict) -> Tuple[int, Dict]:
+        """(HTTP status, response) for one request"""
+        if not isinstance(message, dict):
+            return 400, {"ok": False, "error": "request must be a JSON object"}
+        cmd = message.get("cmd")
+        if cmd == "stats":
+            return 200, dict(self.ingestor.snapshot(), ok=True)
+        if cmd == "shutdown":
+            self.stopped.set()
+            return 200, {"ok": True}
+        if cmd is not None:
+            return 400, {"ok": False, "error": f"Unknown command '{cmd}'"}
+        raw = message["updates"] if "updates" in message else [message]
+        try:
+            if not isinstance(raw, list):
+                raise IngestError("'updates' must be a list")
+            updates = [parse_update(update, self.default_project) for update in raw]
+            generation = self.ingestor.accept(updates)
+        except IngestError as e:
+            return 400, {"ok": False, "error": str(e)}
+        except Overloaded as e:
+            return 429, {"ok": False, "error": "overloaded", "retry_after": round(e.retry_after, 3)}
+        if message.get("sync"):
+            keys = [(project, agent) for project, agent, _ in updates]
+            try:
+                if not self.ingestor.wait_committed(generation, keys, self.sync_timeout):
+                    return 503, {"ok": False, "error": "not committed in time"}
+            except CommitFailed as e:
+                return 500, {"ok": False, "error": str(e)}
+        return 202, {"ok": True, "accepted": len(updates)}
+
+    def serve_socket(self, socket_path: str):
+        service = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        _, response = service.handle(json.loads(line))
+                    except ValueError as e:
+                        response = {"ok": False, "error": f"invalid JSON: {e}"}
+                    self.wfile.write(json.dumps(response).encode() + b"\n")
+                    self.wfile.flush()
+
+        if os.path.exists(socket_path):
+            if request({"cmd": "stats"}, socket_path, timeout=1.0) is not None:
+                raise RuntimeError(f"A status service is already listening on {socket_path}")
+            os.unlink(socket_path)  # stale socket
+        old_umask = os.umask(0o177)  # owner-only socket
+        try:
+            server = _UnixServer(socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        self._start(server)
+
+    def serve_http(self, port: int, host: str = "127.0.0.1"):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: Dict, retry_after: Optional[float] = None):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if retry_after is not None:
+                    self.send_header("Retry-After", str(max(1, round(retry_after))))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path != "/stats":
+                    return self._reply(404, {"ok": False, "error": "not found"})
+                self._reply(*service.handle({"cmd": "stats"}))
+
+            def do_POST(self):
+                if self.path != "/updates":
+                    return self._reply(404, {"ok": False, "error": "not found"})
+                try:
+                    message = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                except ValueError as e:
+                    return self._reply(400, {"ok": False, "error": f"invalid JSON: {e}"})
+                if isinstance(message, dict) and message.get("cmd") == "shutdown":
+                    return self._reply(403, {"ok": False, "error": "shutdown is socket-only"})
+                status, body = service.handle(message)
+                self._reply(status, body, body.get("retry_after") if status == 429 else None)
+
+            def log_message(self, *args):
+                pass
+
+        server = _HTTPServer((host, port), Handler)
+        self._start(server)
+        return server.server_address[1]
+
+    def _start(self, server: socketserver.BaseServer):
+        self.servers.append(server)
+        threading.Thread(target=server.serve_forever, name=type(server).__name__, daemon=True).start()
+
+    def shutdown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+            if isinstance(server, socketserver.UnixStreamServer):
+                try:
+                    os.unlink(server.server_address)
+                except OSError:
+                    pass
+        self.ingestor.close()
+
+
+class StatusClient:
+    """Persistent connection to the status service
+
+    Overloaded replies are retried after the hinted delay, up to retries
+    times; the final reply is returned either way.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, project_root: str = ".",
+                 timeout: float = 30.0, retries: int = 5):
+        self.socket_path = socket_path or default_socket_path(project_root)
+        self.retries = retries
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            # Connected before the timeout is set: a non-blocking AF_UNIX
+            # connect fails outright when the listen backlog is full
+            self.sock.connect(self.socket_path)
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.settimeout(timeout)
+        self.stream = self.sock.makefile("rwb")
+
+    def send(self, message: Dict) -> Dict:
+        for attempt in range(self.retries + 1):
+            self.stream.write(json.dumps(message).encode() + b"\n")
+            self.stream.flush()
+            line = self.stream.readline()
+            if not line:
+                raise ConnectionError("status service closed the connection")
+            response = json.loads(line)
+            if response.get("error") != "overloaded" or attempt == self.retries:
+                return response
+            time.sleep(response.get("retry_after", 0.1))
+        return response
+
+    def update(self, agent: str, sync: bool = False, **fields) -> Dict:
+        return self.send(dict(fields, agent=agent, sync=sync) if sync else dict(fields, agent=agent))
+
+    def close(self):
+        self.stream.close()
+        self.sock.close()
+
+    def __enter__(self) -> "StatusClient":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def request(message: Dict, socket_path: str, timeout: Optional[float] = 10.0) -> Optional[Dict]:
+    """One request over a fresh connection; None if no service is listening"""
+    try:
+        client = StatusClient(socket_path, timeout=timeout, retries=0)
+    except OSError:
+        return None
+    with client:
+        return client.send(message)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Agent status ingestion service and client")
+    parser.add_argument("--root", default=".", help="Project root")
+    parser.add_argument("--socket", help="Socket path (default: per-project path in the temp dir)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run the service in the foreground")
+    serve.add_argument("--http", type=int, metavar="PORT", help="Also accept updates on localhost HTTP")
+    serve.add_argument("--window", type=float, default=DEFAULT_WINDOW,
+                       help=f"Coalescing window in seconds (default: {DEFAULT_WINDOW})")
+    serve.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                       help=f"Distinct agents awaiting commit before refusing (default: {DEFAULT_MAX_PENDING})")
+    serve.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS,
+                       help=f"Failed commits before an update is dropped (default: {DEFAULT_MAX_ATTEMPTS})")
+    send = sub.add_parser("send", help="Send one update")
+    send.add_argument("agent")
+    send.add_argument("--status")
+    send.add_argument("--progress")
+    send.add_argument("--phase")
+    send.add_argument("--todos-completed", type=int)
+    send.add_argument("--todos-total", type=int)
+    send.add_argument("--project", type=int)
+    send.add_argument("--sync", action="store_true", help="Wait until the update is committed")
+    sub.add_parser("stats", help="Show service counters")
+    sub.add_parser("stop", help="Stop a running service")
+
+    args = parser.parse_args()
+    socket_path = args.socket or default_socket_path(args.root)
+
+    if args.command == "serve":
+        from orchestration_config import load_config
+        from orchestrator import ProjectOrchestrator
+
+        orchestrator = ProjectOrchestrator(args.root)
+        if not orchestrator.use_database:
+            print("❌ The status service needs the database (database.py)")
+            sys.exit(1)
+        project = orchestrator.db.get_active_project()
+        ingestor = StatusIngestor(orchestrator.db, args.window, args.max_pending,
+                                  load_config(args.root).agents, args.max_attempts).start()
+        service = StatusService(ingestor, project["id"] if project else None)
+        service.serve_socket(socket_path)
+        print(f"🔌 Status service listening on {socket_path}")
+        if args.http:
+            port = service.serve_http(args.http)
+            print(f"🌐 HTTP on http://127.0.0.1:{port}/updates")
+        try:
+            service.stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.shutdown()
+            orchestrator.close()
+            print(f"✅ Stopped ({ingestor.stats['received']} updates in {ingestor.stats['batches']} batches)")
+    elif args.command == "send":
+        update = {"agent": args.agent}
+        for key in ("status", "progress", "phase", "todos_completed", "todos_total", "project"):
+            if getattr(args, key) is not None:
+                update[key] = getattr(args, key)
+        if args.sync:
+            update["sync"] = True
+        response = request(update, socket_path, timeout=60.0)
+        if response is None:
+            print(f"❌ No status service on {socket_path}")
+            sys.exit(1)
+        print("✅ Accepted" if response.get("ok") else f"❌ {response.get('error')}")
+        sys.exit(0 if response.get("ok") else 1)
+    elif args.command == "stats":
+        stats = request({"cmd": "stats"}, socket_path)
+        if stats is None:
+            print("⚪ No status service running")
+            sys.exit(1)
+        print(f"🟢 {stats['received']} updates received, {stats['coalesced']} coalesced, "
+              f"{stats['batches']} batches ({stats['rows']} rows), {stats['refused']} refused, "
+              f"{stats['dropped']} dropped, "
+              f"{stats['pending']} pending, last commit {stats['last_flush_ms']}ms")
+    else:
+        if request({"cmd": "shutdown"}, socket_path) is None:
+            print("⚠️  No status service running")
+        else:
+            print("✅ Status service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Database: SHARED_CONTEXT.json import and phase transitions
+"""
+
+import json
+
+from database import Database
+
+
+def test_import_keeps_the_phase_timeline(tmp_path):
+    db = Database(str(tmp_path / "orchestrator.db"))
+    project_id = db.import_from_json({
+        "project": "Imported",
+        "current_phase": 2,
+        "agents": {"backend": {"status": "DONE"}},
+        "phase_timeline": {"phase_1_started": "2024-01-01T00:00:00",
+                           "phase_1_completed": "2024-01-02T00:00:00"},
+    })
+    [phase] = db.get_phase_timeline(project_id)
+    assert phase["started_at"] == "2024-01-01T00:00:00"
+    assert phase["duration_minutes"] == 1440
+
+
+def test_transition_closes_the_old_phase_and_opens_the_next(tmp_path):
+    db = Database(str(tmp_path / "orchestrator.db"))
+    project_id = db.create_project("P")
+    db.update_phase_timeline(project_id, 1, started_at="2024-01-01T00:00:00")
+
+    assert db.transition_phase(project_id, 1, 2, ["architect"], timestamp="2024-01-01T02:30:00")
+    assert db.get_project(project_id)["current_phase"] == 2
+    first, second = db.get_phase_timeline(project_id)
+    assert (first["completed_at"], first["duration_minutes"]) == ("2024-01-01T02:30:00", 150)
+    assert (second["phase_number"], second["started_at"], second["completed_at"]) == (
+        2, "2024-01-01T02:30:00", None)
+    assert db.get_agent(project_id, "architect")["status"] == "IN_PROGRESS"
+    assert db.get_agent(project_id, "planner")["status"] != "IN_PROGRESS"
+    [event] = [e for e in db.get_events(project_id) if e["event_type"] == "PHASE_TRANSITION"]
+    assert json.loads(event["data"]) == {"from_phase": 1, "to_phase": 2, "agents": ["architect"], "duration_minutes": 150}
+
+
+def test_transition_from_a_stale_phase_changes_nothing(tmp_path):
+    db = Database(str(tmp_path / "orchestrator.db"))
+    project_id = db.create_project("P")
+    assert db.transition_phase(project_id, 1, 2, ["architect"])
+    timeline = db.get_phase_timeline(project_id)
+    events = db.get_events(project_id)
+
+    # A second orchestrator that also saw phase 1 loses the compare-and-set
+    assert not db.transition_phase(project_id, 1, 2, ["planner"])
+    assert db.get_project(project_id)["current_phase"] == 2
+    assert db.get_phase_timeline(project_id) == timeline
+    assert db.get_events(project_id) == events
+    assert db.get_agent(project_id, "planner")["status"] != "IN_PROGRESS"
+
+
+def test_transition_with_an_incomparable_start_stores_no_duration(tmp_path):
+    db = Database(str(tmp_path / "orchestrator.db"))
+    project_id = db.import_from_json({
+        "project": "Imported",
+        "current_phase": 2,
+        "agents": {},
+        "phase_timeline": {"phase_2_started": "2024-01-01T00:00:00Z"},
+    })
+    assert db.transition_phase(project_id, 2, 3, ["backend"], timestamp="2024-01-02T00:00:00")
+    assert db.get_project(project_id)["current_phase"] == 3
+    phase_2 = next(p for p in db.get_phase_timeline(project_id) if p["phase_number"] == 2)
+    assert phase_2["completed_at"] == "2024-01-02T00:00:00"
+    assert phase_2["duration_minutes"] is None
@@ -0,0 +1,157 @@
+"""
+Event payloads: compact encoding and the legacy events table migration
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from database import Database
+from event_codec import KEYED, PLAIN, ZLIB, EventCodecError, decode_fields, decode_payload, encode_payload
+
+
+class Symbols:
+    """In-memory stand-in for the event_symbols table"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = {}
+
+    def id(self, name):
+        if name not in self.ids:
+            self.ids[name] = len(self.ids) + 1
+            self.names[self.ids[name]] = name
+        return self.ids[name]
+
+    def name(self, symbol):
+        return self.names[symbol]
+
+
+def round_trip(data):
+    symbols = Symbols()
+    blob = encode_payload(data, symbols.id)
+    assert decode_payload(blob, symbols.name) == json.dumps(data)
+    assert decode_fields(blob, symbols.name) == json.loads(json.dumps(data))
+    return blob, symbols
+
+
+@pytest.mark.parametrize("data", [[1, 2], "text", 7, None, {1: "int key"}])
+def test_non_object_payloads_are_stored_plain(data):
+    blob, _ = round_trip(data)
+    assert blob[:1] == PLAIN
+
+
+def test_enums_and_timestamps_are_interned():
+    data = {
+        "status": "IN_PROGRESS",
+        "phase": "EXECUTING",
+        "progress": "40%",
+        "note": "Free text, not an enum",
+        "lowercase": "in_progress",
+        "updated_at": "2024-01-01T10:00:00.123456",
+        "last_update": "2024-01-01T10:00:05",
+        "count": 3,
+        "nested": {"status": "DONE", "list": [1, "A"]},
+        "unicode": "café",
+        "flag": None,
+    }
+    blob, symbols = round_trip(data)
+    assert blob[:1] == KEYED
+    assert {"IN_PROGRESS", "EXECUTING", "status", "updated_at"} <= set(symbols.ids)
+    assert "in_progress" not in symbols.ids and "Free text, not an enum" not in symbols.ids
+    assert b"2024" not in blob  # both timestamps became integers
+    assert len(blob) < len(json.dumps(data))
+
+
+@pytest.mark.parametrize("value", [
+    "2024-01-01T10:00:00Z",           # not datetime.isoformat() output
+    "2024-01-01T10:00:00+00:00",
+    "2024-13-01T10:00:00",            # looks like one, is not a date
+    "2024-01-01T10:00:00.000000",     # isoformat() would drop the zeros
+    "1969-12-31T23:59:59.999999",     # before the epoch
+])
+def test_timestamps_round_trip_exactly(value):
+    round_trip({"at": value, "then": "2024-01-01T00:00:00"})
+
+
+def test_large_payloads_are_compressed():
+    data = {f"key_{i}": "the same sentence repeated " * 4 for i in range(20)}
+    blob, _ = round_trip(data)
+    assert blob[:1] == ZLIB
+
+
+def test_unknown_tag_is_an_error():
+    with pytest.raises(EventCodecError):
+        decode_fields(b"?[]", str)
+
+
+LEGACY_SCHEMA = """
+CREATE TABLE projects (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    version TEXT NOT NULL,
+    current_phase INTEGER DEFAULT 1,
+    current_feature TEXT,
+    status TEXT DEFAULT 'INITIALIZED',
+    started_at TEXT,
+    completed_at TEXT,
+    overall_progress TEXT DEFAULT '0%',
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id INTEGER NOT NULL,
+    agent_name TEXT,
+    event_type TEXT NOT NULL,
+    data TEXT,
+    timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (project_id) REFERENCES projects (id) ON DELETE CASCADE
+);
+CREATE INDEX idx_events_project ON events(project_id);
+CREATE INDEX idx_events_timestamp ON events(timestamp);
+"""
+
+LEGACY_PAYLOADS = [
+    json.dumps({"status": "COMPLETED", "progress": "100%", "updated_at": "2024-01-01T10:00:00"}),
+    json.dumps({"from_phase": 1, "to_phase": 2, "agents": ["architect", "planner"]}),
+    '{"status":"DONE"}',      # not json.dumps() output: kept verbatim
+    "not json at all",
+    json.dumps(["a", "list"]),
+    None,
+    json.dumps({"text": "x" * 400, "more": "y" * 400}),
+]
+
+
+def test_legacy_events_table_is_migrated_without_changing_get_events(tmp_path):
+    path = tmp_path / "orchestrator.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.execute("INSERT INTO projects (name, version) VALUES ('Legacy', '1.0.0')")
+    conn.executemany(
+        "INSERT INTO events (project_id, agent_name, event_type, data, timestamp) VALUES (1, ?, ?, ?, ?)",
+        [(None if i % 3 == 0 else "backend", "AGENT_UPDATED" if i % 2 else "PHASE_TRANSITION",
+          data, f"2024-01-0{i + 1} 12:00:00") for i, data in enumerate(LEGACY_PAYLOADS)])
+    conn.commit()
+    conn.row_factory = sqlite3.Row
+    expected = [dict(row) for row in conn.execute(
+        "SELECT id, project_id, agent_name, event_type, data, timestamp FROM events "
+        "ORDER BY timestamp DESC, id DESC")]
+    conn.close()
+
+    db = Database(str(path))
+    assert db.get_events(1) == expected
+    conn = sqlite3.connect(path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+    assert "agent_name" not in columns and "type_id" in columns
+    tags = [row[0][:1] if row[0] else None for row in conn.execute("SELECT data FROM events ORDER BY id")]
+    conn.close()
+    assert tags == [KEYED, KEYED, PLAIN, PLAIN, PLAIN, None, ZLIB]
+
+    # Migrated rows and new ones share the symbol table
+    db.log_event(1, "backend", "AGENT_UPDATED", {"status": "COMPLETED"})
+    newest = db.get_events(1, limit=1)[0]
+    assert (newest["agent_name"], newest["event_type"], newest["data"]) == (
+        "backend", "AGENT_UPDATED", '{"status": "COMPLETED"}')
+    assert Database(str(path)).get_events(1)[1:] == expected
@@ -0,0 +1,176 @@
+"""
+Job queue: claims, leases and agent rows, across worker processes
+"""
+
+import multiprocessing
+import os
+import time
+
+from database import Database
+from job_worker import JobWorker
+
+JOBS = 40
+CLAIMERS = 4
+
+
+def make_db(tmp_path):
+    db = Database(str(tmp_path / "orchestrator.db"))
+    return db, db.create_project("P")
+
+
+def claim_all(db_path: str, worker_id: str, claimed):
+    db = Database(db_path)
+    while True:
+        job = db.claim_job(worker_id)
+        if job is None:
+            return
+        claimed.put(job["id"])
+
+
+def claim_and_crash(db_path: str):
+    Database(db_path).claim_job("crasher", lease_seconds=0.2)
+    os._exit(1)  # no fail_job, no heartbeat: the lease just runs out
+
+
+def events_of(db, project_id, event_type):
+    return [e for e in db.get_events(project_id) if e["event_type"] == event_type]
+
+
+def test_each_job_is_claimed_by_exactly_one_process(tmp_path):
+    db, project_id = make_db(tmp_path)
+    ids = [db.enqueue_job(project_id, "backend", {"n": i}) for i in range(JOBS)]
+
+    context = multiprocessing.get_context("fork")
+    claimed = context.Queue()
+    procs = [context.Process(target=claim_all, args=(str(db.db_path), f"w{i}", claimed))
+             for i in range(CLAIMERS)]
+    for proc in procs:
+        proc.start()
+    got = [claimed.get(timeout=30) for _ in range(JOBS)]
+    for proc in procs:
+        proc.join()
+
+    assert sorted(got) == ids
+    assert all(job["attempts"] == 1 for job in db.get_jobs(project_id, "RUNNING"))
+
+
+def test_claim_order_and_agent_row(tmp_path):
+    db, project_id = make_db(tmp_path)
+    low = db.enqueue_job(project_id, "backend", priority=0)
+    high = db.enqueue_job(project_id, "frontend", priority=5)
+
+    job = db.claim_job("w1")
+    assert (job["id"], job["status"], job["worker_id"], job["payload"]) == (high, "RUNNING", "w1", {})
+    assert db.get_agent(project_id, "frontend")["status"] == "IN_PROGRESS"
+    assert db.claim_job("w2")["id"] == low
+    assert db.claim_job("w3") is None
+
+
+def test_heartbeat_extends_only_the_owners_lease(tmp_path):
+    db, project_id = make_db(tmp_path)
+    job_id = db.enqueue_job(project_id, "backend")
+    job = db.claim_job("w1", lease_seconds=0.5)
+
+    time.sleep(0.3)
+    assert db.heartbeat_job(job_id, "w1", lease_seconds=0.5)
+    assert db.get_job(job_id)["lease_expires_at"] > job["lease_expires_at"]
+    assert not db.heartbeat_job(job_id, "someone-else")
+    time.sleep(0.3)  # past the original lease, within the renewed one
+    assert db.reclaim_expired_jobs() == 0
+    assert db.get_job(job_id)["status"] == "RUNNING"
+
+
+def test_a_crashed_workers_job_is_reclaimed(tmp_path):
+    db, project_id = make_db(tmp_path)
+    job_id = db.enqueue_job(project_id, "backend")
+    crasher = multiprocessing.get_context("fork").Process(target=claim_and_crash, args=(str(db.db_path),))
+    crasher.start()
+    crasher.join()
+    assert db.get_job(job_id)["worker_id"] == "crasher"
+    assert db.get_agent(project_id, "backend")["status"] == "IN_PROGRESS"
+
+    time.sleep(0.3)
+    assert db.reclaim_expired_jobs() == 1
+    job = db.get_job(job_id)
+    assert (job["status"], job["worker_id"], job["error"]) == ("QUEUED", None, "lease expired")
+    assert db.get_agent(project_id, "backend")["status"] == "READY"
+    assert len(events_of(db, project_id, "JOB_REQUEUED")) == 1
+
+    retried = db.claim_job("w2")
+    assert (retried["id"], retried["attempts"]) == (job_id, 2)
+
+
+def test_expired_job_fails_after_its_last_attempt(tmp_path):
+    db, project_id = make_db(tmp_path)
+    job_id = db.enqueue_job(project_id, "backend", max_attempts=1)
+    db.claim_job("w1", lease_seconds=0.05)
+    time.sleep(0.1)
+
+    assert db.claim_job("w2") is None  # claiming reclaims first
+    assert db.get_job(job_id)["status"] == "FAILED"
+    assert db.get_agent(project_id, "backend")["status"] == "BLOCKED"
+    assert len(events_of(db, project_id, "JOB_FAILED")) == 1
+
+
+def test_a_lost_lease_cannot_complete_or_fail_the_job(tmp_path):
+    db, project_id = make_db(tmp_path)
+    job_id = db.enqueue_job(project_id, "backend")
+    db.claim_job("slow", lease_seconds=0.05)
+    time.sleep(0.1)
+    assert db.claim_job("fast")["id"] == job_id
+
+    assert not db.heartbeat_job(job_id, "slow")
+    assert not db.complete_job(job_id, "slow", {"status": "COMPLETED"})
+    assert not db.fail_job(job_id, "slow", "boom")
+    job = db.get_job(job_id)
+    assert (job["status"], job["worker_id"]) == ("RUNNING", "fast")
+    assert db.get_agent(project_id, "backend")["status"] == "IN_PROGRESS"
+
+    assert db.complete_job(job_id, "fast")
+    assert db.get_job(job_id)["status"] == "COMPLETED"
+
+
+def test_outcomes_are_applied_to_the_agent_row(tmp_path):
+    db, project_id = make_db(tmp_path)
+    done = db.enqueue_job(project_id, "backend")
+    db.claim_job("w1")
+    assert db.complete_job(done, "w1", {"progress": "80%", "todos_completed": 4, "todos_total": 5,
+                                        "unrelated": "ignored"})
+    agent = db.get_agent(project_id, "backend")
+    assert (agent["status"], agent["progress"], agent["todos_completed"], agent["todos_total"]) == (
+        "COMPLETED", "80%", 4, 5)
+    [event] = events_of(db, project_id, "JOB_COMPLETED")
+    assert event["agent_name"] == "backend"
+
+    retried = db.enqueue_job(project_id, "frontend")
+    db.claim_job("w1")
+    assert db.fail_job(retried, "w1", "flaky")
+    assert db.get_job(retried)["status"] == "QUEUED"
+    assert db.get_agent(project_id, "frontend")["status"] == "READY"
+
+    db.claim_job("w1")
+    assert db.fail_job(retried, "w1", "broken", retry=False)
+    assert db.get_job(retried)["status"] == "FAILED"
+    assert db.get_agent(project_id, "frontend")["status"] == "BLOCKED"
+
+
+def double(job):
+    if job["payload"].get("fail"):
+        raise RuntimeError("bad input")
+    return {"todos_completed": job["payload"]["n"] * 2}
+
+
+def test_worker_completes_and_fails_jobs(tmp_path):
+    db, project_id = make_db(tmp_path)
+    ok = db.enqueue_job(project_id, "backend", {"n": 3})
+    bad = db.enqueue_job(project_id, "frontend", {"fail": True}, max_attempts=1)
+
+    worker = JobWorker(str(db.db_path), double, worker_id="w", lease_seconds=1.0, poll_interval=0.01)
+    worker.run(drain=True)
+
+    assert (worker.completed, worker.failed) == (1, 1)
+    assert db.get_job(ok)["status"] == "COMPLETED"
+    assert db.get_agent(project_id, "backend")["todos_completed"] == 6
+    failed = db.get_job(bad)
+    assert (failed["status"], failed["error"]) == ("FAILED", "RuntimeError: bad input")
+    assert db.get_agent(project_id, "frontend")["status"] == "BLOCKED"
@@ -0,0 +1,88 @@
+"""
+OpenAPI contract: structural checks and $ref resolution
+"""
+
+import pytest
+
+from openapi_contract import RefResolver, SpecError, diff_specs, validate_contract
+
+
+def spec_with(paths, schemas=None):
+    spec = {"openapi": "3.0.3", "info": {"title": "T", "version": "1"}, "paths": paths}
+    if schemas is not None:
+        spec["components"] = {"schemas": schemas}
+    return spec
+
+
+def ok(description="ok", schema=None):
+    response = {"description": description}
+    if schema is not None:
+        response["content"] = {"application/json": {"schema": schema}}
+    return {"responses": {"200": response}}
+
+
+def test_valid_spec_has_no_errors():
+    spec = spec_with({
+        "/users/{id}": {
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "get": ok(schema={"$ref": "#/components/schemas/User"}),
+        },
+    }, {"User": {"type": "object", "required": ["id"], "properties": {
+        "id": {"type": "string"},
+        "manager": {"$ref": "#/components/schemas/User"},  # recursive is fine
+    }}})
+    assert validate_contract(spec) == []
+
+
+def test_structural_problems_are_reported():
+    spec = spec_with({
+        "users": {"get": {"responses": {}}},
+        "/items/{id}": {"get": ok(), "post": {"operationId": "x", "responses": {"999": {}}}},
+        "/other": {"put": {"operationId": "x", **ok()}},
+    })
+    errors = validate_contract(spec, "S")
+    assert "S: path 'users' must start with '/'" in errors
+    assert "S: GET users: no responses defined" in errors
+    assert "S: GET /items/{id}: path parameter 'id' is not declared" in errors
+    assert "S: POST /items/{id}: invalid response code '999'" in errors
+    assert "S: POST /items/{id} 999: response description is required" in errors
+    assert "S: PUT /other: duplicate operationId 'x' (also POST /items/{id})" in errors
+
+
+def test_non_string_ref_is_an_error_not_a_crash():
+    spec = spec_with({"/x": {"get": ok(schema={"$ref": 5})}})
+    assert validate_contract(spec) == ["OpenAPI spec: GET /x 200 application/json: $ref must be a string, got 5"]
+
+    spec = spec_with({"/x": {"get": ok(schema={"$ref": ["#/a"]})}})
+    assert len(validate_contract(spec)) == 1
+    with pytest.raises(SpecError):
+        RefResolver({"a": {"$ref": 5}}).resolve("#/a")
+
+
+def test_unresolved_and_cyclic_refs_are_reported():
+    spec = spec_with({"/x": {"get": ok(schema={"$ref": "#/components/schemas/Missing"})}},
+                     {"A": {"$ref": "#/components/schemas/B"}, "B": {"$ref": "#/components/schemas/A"}})
+    errors = validate_contract(spec)
+    assert any("unresolved $ref '#/components/schemas/Missing'" in e for e in errors)
+    assert any("$ref cycle" in e for e in errors)
+
+
+def test_non_mapping_sections_are_errors():
+    assert validate_contract(spec_with([1, 2])) == ["OpenAPI spec: paths must be a mapping"]
+    assert validate_contract(spec_with({"/x": None})) == ["OpenAPI spec: /x: path item must be a mapping"]
+    assert validate_contract(spec_with({"/x": {"get": {"responses": {"200": None}}}})) == [
+        "OpenAPI spec: GET /x 200: response must be a mapping"]
+    assert validate_contract(spec_with({}, [1])) == ["OpenAPI spec: components.schemas must be a mapping"]
+
+
+def test_broken_path_item_ref_is_reported_once():
+    errors = validate_contract(spec_with({"/x": {"$ref": "#/nowhere"}}))
+    assert errors == ["OpenAPI spec: /x: unresolved $ref '#/nowhere'"]
+
+
+def test_diff_ignores_documentation_but_not_properties():
+    old = {"paths": {"/x": {"get": {"summary": "a", "responses": {}}}},
+           "properties": {"description": {"type": "string"}}}
+    new = {"paths": {"/x": {"get": {"summary": "b", "responses": {}}}},
+           "properties": {}}
+    assert diff_specs(old, new) == ["#/properties/description: removed"]
@@ -0,0 +1,50 @@
+"""
+Orchestrator: concurrent writers in JSON mode
+"""
+
+import json
+import multiprocessing
+
+from orchestrator import ProjectOrchestrator
+
+AGENTS = ["architect", "planner", "backend", "frontend"]
+UPDATES = 100
+
+
+def update_agent(root: str, agent: str):
+    orchestrator = ProjectOrchestrator(root, use_database=False)
+    for i in range(UPDATES):
+        orchestrator.update_agent_status(agent, {"todos_completed": i})
+
+
+def read_context(root: str, stop, failures):
+    orchestrator = ProjectOrchestrator(root, use_database=False)
+    while not stop.is_set():
+        try:
+            orchestrator.load_context()
+        except json.JSONDecodeError:
+            failures.value += 1
+
+
+def test_concurrent_agent_updates_are_neither_lost_nor_seen_half_written(tmp_path):
+    root = str(tmp_path)
+    ProjectOrchestrator(root, use_database=False).initialize_context()
+
+    context = multiprocessing.get_context("fork")
+    stop, failures = context.Event(), context.Value("i", 0)
+    reader = context.Process(target=read_context, args=(root, stop, failures))
+    reader.start()
+    writers = [context.Process(target=update_agent, args=(root, agent)) for agent in AGENTS]
+    for process in writers:
+        process.start()
+    for process in writers:
+        process.join()
+    stop.set()
+    reader.join()
+
+    assert all(process.exitcode == 0 for process in writers)
+    assert failures.value == 0
+    agents = json.loads((tmp_path / "SHARED_CONTEXT.json").read_text())["agents"]
+    assert {agent: agents[agent]["todos_completed"] for agent in AGENTS} == {
+        agent: UPDATES - 1 for agent in AGENTS}
+    assert not list(tmp_path.glob("*.tmp"))
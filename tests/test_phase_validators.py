@@ -0,0 +1,80 @@
+"""
+Phase validators: validation cache
+"""
+
+import os
+import time
+
+from phase_validators import Phase5Validator, run_checks, run_phase
+from validation_cache import ValidationCache
+
+CONFIG = """orchestration:
+  agents: [qa]
+  phases:
+    - number: 7
+      name: "Docs"
+      agents: [qa]
+      rules:
+        - {path: docs/report.md, min_size: MIN_SIZE}
+"""
+
+
+def write_config(root, min_size):
+    config = root / "project-description.yaml"
+    config.write_text(CONFIG.replace("MIN_SIZE", str(min_size)))
+    return config
+
+
+def test_editing_a_configured_rule_invalidates_its_cached_result(tmp_path):
+    (tmp_path / "docs").mkdir()
+    report = tmp_path / "docs" / "report.md"
+    report.write_text("a short report\n")
+    config = write_config(tmp_path, 10)
+    hour_ago = time.time() - 3600  # outside the cache's racy window
+    for path in (report, config):
+        os.utime(path, (hour_ago, hour_ago))
+
+    assert run_phase(7, str(tmp_path)).success
+    assert run_phase(7, str(tmp_path)).checks[0].cached
+
+    write_config(tmp_path, 100000)
+    run = run_phase(7, str(tmp_path))
+    assert not run.success
+    assert not run.checks[0].cached
+
+
+def test_validate_again_sees_files_removed_since_the_last_run(tmp_path):
+    (tmp_path / "docs").mkdir()
+    for doc in Phase5Validator.required_docs:
+        (tmp_path / "docs" / doc).write_text("# Doc\n" + "y" * 600)
+    validator = Phase5Validator(str(tmp_path))
+    assert validator.validate() == (True, [])
+
+    (tmp_path / "docs" / "SETUP.md").unlink()
+    success, errors = validator.validate()
+    assert not success
+    assert any("SETUP.md" in e for e in errors)
+
+
+def test_a_crashing_check_fails_without_losing_the_other_results(tmp_path):
+    report = tmp_path / "report.md"
+    report.write_text("done\n")
+    hour_ago = time.time() - 3600
+    os.utime(report, (hour_ago, hour_ago))
+    validator = Phase5Validator(str(tmp_path))
+
+    def crash():
+        raise KeyError("phases")
+
+    checks = [("T.crash", crash), ("T.report", lambda: [] if validator._exists(report) else ["missing"])]
+    for workers in (1, 2):
+        cache = ValidationCache(str(tmp_path))
+        results = run_checks(checks, workers, cache, force=True)
+        assert [r.check_id for r in results] == ["T.crash", "T.report"]
+        assert results[0].errors == ["check T.crash crashed: KeyError: 'phases'"]
+        assert results[1].errors == []
+
+    # The passing result was saved; the crash is never served from the cache
+    results = run_checks(checks, 1, ValidationCache(str(tmp_path)))
+    assert not results[0].cached and results[0].errors
+    assert results[1].cached
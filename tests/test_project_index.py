@@ -0,0 +1,23 @@
+"""
+Project index: pruning
+"""
+
+from project_index import ProjectIndex
+
+
+def touch(root, rel):
+    path = root / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("")
+
+
+def test_build_output_names_are_pruned_only_at_the_root(tmp_path):
+    for rel in ("src/app/api/build/route.ts", "build/server.js", "coverage/lcov.info",
+                "frontend/coverage/lcov.info", "src/node_modules/x/index.js"):
+        touch(tmp_path, rel)
+    index = ProjectIndex(str(tmp_path))
+    assert index.first("src/app/api/**/*.ts") == "src/app/api/build/route.ts"
+    assert index.exists("frontend/coverage/lcov.info")
+    assert not index.exists("build/*")
+    assert not index.exists("coverage/*")
+    assert not index.exists("src/node_modules/**")
@@ -0,0 +1,99 @@
+"""
+Route index: Next.js route handlers joined against OpenAPI operations
+"""
+
+from route_index import (CATCH_ALL, DYNAMIC, OPTIONAL_CATCH_ALL, STATIC, Route, RouteIndex, coverage,
+                         parse_route_exports, route_template)
+
+SPEC = {
+    "servers": [{"url": "https://example.com/api"}],
+    "paths": {"/users": {"get": {}}},
+}
+
+
+def index_of(routes):
+    return RouteIndex(Route(f"src/app/{path}/route.ts", route_template(path.split("/")), methods)
+                      for path, methods in routes.items())
+
+
+def test_nextauth_catch_all_is_never_an_extra_route():
+    index = index_of({"api/users": ["GET"], "api/auth/[...nextauth]": ["GET", "POST"]})
+    assert coverage(SPEC, index) == ([], [])
+
+
+def test_configured_ignore_patterns_hide_extra_routes():
+    index = index_of({"api/users": ["GET"], "api/stripe/webhook": ["POST"], "api/internal/a/b": ["GET"]})
+    missing, extra = coverage(SPEC, index)
+    assert [route.url for _, route in extra] == ["/api/stripe/webhook", "/api/internal/a/b"]
+
+    assert coverage(SPEC, index, ["/api/stripe/webhook", "/api/internal/**"]) == ([], [])
+
+
+def test_export_forms_are_recognized():
+    source = """
+    export async function GET(request) {}
+    export const POST = handler
+    export const { PUT, handler: PATCH } = handlers
+    export { remove as DELETE } from './shared'
+    // export function OPTIONS() {}
+    /* export function HEAD() {} */
+    export function getStaticProps() {}
+    """
+    assert parse_route_exports(source) == ["GET", "POST", "PUT", "DELETE", "PATCH"]
+
+
+def test_directory_names_map_to_segments():
+    assert route_template(["api", "(admin)", "@modal", "users", "[id]"]) == [
+        (STATIC, "api"), (STATIC, "users"), (DYNAMIC, "id")]
+    assert route_template(["docs", "[...slug]"]) == [(STATIC, "docs"), (CATCH_ALL, "slug")]
+    assert route_template(["shop", "[[...filters]]"]) == [(STATIC, "shop"), (OPTIONAL_CATCH_ALL, "filters")]
+    assert route_template(["api", "_lib", "db"]) is None
+
+
+def test_urls_resolve_with_nextjs_precedence():
+    index = index_of({
+        "users/me": ["GET"],
+        "users/[id]": ["GET"],
+        "docs/[...slug]": ["GET"],
+        "shop/[[...filters]]": ["GET"],
+    })
+    assert index.match(["users", "me"]).url == "/users/me"
+    assert index.match(["users", "42"]).url == "/users/[id]"
+    assert index.match(["users", "{id}"]).url == "/users/[id]"
+    assert index.match(["docs", "a", "b", "c"]).url == "/docs/[...slug]"
+    assert index.match(["docs"]) is None
+    assert index.match(["shop"]).url == "/shop/[[...filters]]"
+    assert index.match(["shop", "red", "small"]).url == "/shop/[[...filters]]"
+    assert index.match(["other"]) is None
+
+
+def test_coverage_reports_missing_operations_and_extra_handlers():
+    spec = {
+        "servers": [{"url": "https://example.com/api/v1"}],
+        "paths": {
+            "/users": {"get": {}, "post": {}},
+            "/users/{id}": {"get": {}, "head": {}, "delete": {}},
+        },
+    }
+    index = index_of({
+        "api/v1/users": ["GET"],
+        "api/v1/users/[id]": ["GET", "PUT"],
+        "api/health": ["GET"],  # outside the spec's mount point
+    })
+    missing, extra = coverage(spec, index)
+    assert missing == ["POST /users", "DELETE /users/{id}"]
+    assert [(method, route.url) for method, route in extra] == [("PUT", "/api/v1/users/[id]")]
+
+
+def test_coverage_falls_back_to_the_api_directory():
+    index = index_of({"api/users": ["GET"]})
+    assert coverage(SPEC, index) == ([], [])
+    assert coverage({"paths": {"/users": {"get": {}}}}, index) == ([], [])
+
+
+def test_malformed_paths_and_servers_do_not_raise():
+    index = index_of({"api/users": ["GET"]})
+    missing, extra = coverage({"servers": {"url": "/x"}, "paths": [1, 2]}, index)
+    assert missing == []
+    assert [route.url for _, route in extra] == ["/api/users"]
+    assert coverage({"paths": {"/users": None}}, index)[0] == []
@@ -0,0 +1,56 @@
+"""
+Schema drift: Prisma implicit many-to-many join tables
+"""
+
+from schema_drift import diff_models, parse_migration, parse_prisma, replay_migrations
+
+SCHEMA = """
+model Post {
+  id   Int   @id @default(autoincrement())
+  tags Tag[]
+}
+
+model Tag {
+  id    String @id
+  posts Post[]
+}
+
+model User {
+  id        Int    @id
+  followers User[] @relation("follows")
+  following User[] @relation("follows")
+  notes     Note[]
+}
+
+model Note {
+  id     Int  @id
+  userId Int
+  user   User @relation(fields: [userId], references: [id])
+}
+"""
+
+MIGRATION = """
+CREATE TABLE "Post" ("id" SERIAL NOT NULL, CONSTRAINT "Post_pkey" PRIMARY KEY ("id"));
+CREATE TABLE "Tag" ("id" TEXT NOT NULL, CONSTRAINT "Tag_pkey" PRIMARY KEY ("id"));
+CREATE TABLE "User" ("id" INTEGER NOT NULL, CONSTRAINT "User_pkey" PRIMARY KEY ("id"));
+CREATE TABLE "Note" ("id" INTEGER NOT NULL, "userId" INTEGER NOT NULL, CONSTRAINT "Note_pkey" PRIMARY KEY ("id"));
+-- Prisma 5 style: unique index on (A, B)
+CREATE TABLE "_PostToTag" ("A" INTEGER NOT NULL, "B" TEXT NOT NULL);
+CREATE UNIQUE INDEX "_PostToTag_AB_unique" ON "_PostToTag"("A", "B");
+CREATE INDEX "_PostToTag_B_index" ON "_PostToTag"("B");
+-- Prisma 6 style: (A, B) primary key
+CREATE TABLE "_follows" ("A" INTEGER NOT NULL, "B" INTEGER NOT NULL,
+    CONSTRAINT "_follows_AB_pkey" PRIMARY KEY ("A","B"));
+CREATE INDEX "_follows_B_index" ON "_follows"("B");
+ALTER TABLE "_PostToTag" ADD CONSTRAINT "_PostToTag_A_fkey" FOREIGN KEY ("A") REFERENCES "Post"("id");
+"""
+
+
+def test_implicit_many_to_many_tables_are_expected():
+    migrations = replay_migrations([parse_migration(MIGRATION)])
+    assert diff_models(parse_prisma(SCHEMA), migrations) == []
+
+
+def test_join_table_column_types_follow_the_ids():
+    table = parse_prisma(SCHEMA)["tables"]["_PostToTag"]
+    assert table["columns"] == {"A": ["INTEGER", False], "B": ["TEXT", False]}
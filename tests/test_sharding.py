@@ -0,0 +1,127 @@
+"""
+Sharding: routing, fan-out merges, global job IDs and partial writes
+"""
+
+import sqlite3
+
+import pytest
+
+from database import Database
+from sharding import JOB_ID_BITS, PartialWriteError, ShardError, ShardedDatabase, split_job_id
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    db = ShardedDatabase(str(tmp_path / "shards"))
+    yield db
+    db.close()
+
+
+def agent_status(path, name):
+    with sqlite3.connect(path) as conn:
+        row = conn.execute("SELECT status FROM agents WHERE name = ?", (name,)).fetchone()
+    return row and row[0]
+
+
+def test_project_calls_go_to_the_projects_own_shard(sharded):
+    first = sharded.create_project("First")
+    second = sharded.create_project("Second")
+    assert (first, second) == (1, 2)
+    assert sharded.shard_path(first).is_file() and sharded.shard_path(second).is_file()
+
+    sharded.update_agent(second, "backend", {"status": "BLOCKED"})
+    assert agent_status(sharded.shard_path(second), "backend") == "BLOCKED"
+    assert agent_status(sharded.shard_path(first), "backend") == "READY"
+    assert sharded.get_agent(second, "backend")["status"] == "BLOCKED"
+    assert sharded.get_project(first)["name"] == "First"
+
+    with pytest.raises(ShardError):
+        sharded.get_project(99)
+    with pytest.raises(AttributeError):
+        sharded.no_such_method
+
+
+def test_cross_project_reads_merge_every_shard(sharded):
+    first = sharded.create_project("First", agents=["backend"])
+    second = sharded.create_project("Second", agents=["backend", "qa"])
+    sharded.transition_phase(first, 1, 2, ["backend"], "2030-01-01T00:00:00")
+
+    assert [p["name"] for p in sharded.list_projects()] == ["First", "Second"]
+    assert sharded.get_active_project()["id"] == first  # most recently updated
+    stats = sharded.get_stats()
+    assert (stats["shards"], stats["projects"]) == (2, 2)
+    assert stats["projects_by_phase"] == {1: 1, 2: 1}
+    assert stats["agents_by_status"] == {"IN_PROGRESS": 1, "READY": 2}
+    assert stats["events"] == sum(len(sharded.get_events(pid)) for pid in (first, second))
+
+    sharded.transition_phase(second, 1, 2, ["backend"])
+    [counts] = [v for k, v in sharded.get_duration_stats().items() if k[1] == "1"]
+    assert sum(counts.values()) == 2
+
+
+def test_job_ids_are_global_and_round_trip(sharded):
+    first = sharded.create_project("First", agents=["backend"])
+    second = sharded.create_project("Second", agents=["backend"])
+    a = sharded.enqueue_job(first, "backend")
+    b = sharded.enqueue_job(second, "backend")
+    assert split_job_id(a) == (first, 1) and split_job_id(b) == (second, 1)
+    assert b == (second << JOB_ID_BITS) | 1
+
+    # Round-robin across shards, whatever the order of local IDs
+    claimed = [sharded.claim_job("w")["id"] for _ in range(2)]
+    assert sorted(claimed) == [a, b]
+    assert sharded.claim_job("w") is None
+
+    assert sharded.heartbeat_job(b, "w")
+    assert sharded.complete_job(b, "w", {"progress": "50%"})
+    assert sharded.get_job(b)["id"] == b
+    assert sharded.get_job(b)["status"] == "COMPLETED"
+    assert sharded.get_agent(second, "backend")["progress"] == "50%"
+    assert sharded.fail_job(a, "w", "boom", retry=False)
+    assert [job["id"] for job in sharded.get_jobs(first, "FAILED")] == [a]
+
+
+def test_failed_shards_return_only_their_updates(sharded, monkeypatch):
+    first = sharded.create_project("First", agents=["backend"])
+    second = sharded.create_project("Second", agents=["backend"])
+    broken = sharded.shard(second)
+
+    def fail(updates):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(broken, "apply_agent_updates", fail)
+    updates = [(first, "backend", {"status": "COMPLETED"}), (second, "backend", {"status": "COMPLETED"})]
+    with pytest.raises(PartialWriteError) as caught:
+        sharded.apply_agent_updates(updates)
+
+    error = caught.value
+    assert error.written == 1
+    assert error.failed == [updates[1]]
+    assert [(pid, type(e)) for pid, e in error.errors] == [(second, sqlite3.OperationalError)]
+    assert sharded.get_agent(first, "backend")["status"] == "COMPLETED"
+
+    monkeypatch.undo()
+    assert sharded.apply_agent_updates(error.failed) == 1
+    assert sharded.get_agent(second, "backend")["status"] == "COMPLETED"
+
+
+@pytest.mark.parametrize("method, args", [
+    ("create_project", ("Doomed",)),
+    ("import_from_json", ({"project": "Doomed", "current_phase": 1, "agents": {}},)),
+])
+def test_a_failed_shard_creation_releases_the_catalog_row(sharded, monkeypatch, method, args):
+    kept = sharded.create_project("Kept")
+
+    def fail(self, *args, **kwargs):
+        raise sqlite3.OperationalError("disk full")
+
+    monkeypatch.setattr(Database, method, fail)
+    with pytest.raises(sqlite3.OperationalError):
+        getattr(sharded, method)(*args)
+    monkeypatch.undo()
+
+    assert sharded.project_ids() == [kept]
+    assert not sharded.shard_path(kept + 1).exists()
+    with pytest.raises(ShardError):
+        sharded.get_project(kept + 1)
+    assert [p["name"] for p in sharded.list_projects()] == ["Kept"]
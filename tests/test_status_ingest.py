@@ -0,0 +1,206 @@
+"""
+Status ingestion: coalescing, backpressure, sync waits and failed commits
+"""
+
+import threading
+import time
+
+import pytest
+
+from database import Database
+from sharding import ShardedDatabase
+from status_ingest import CommitFailed, IngestError, Overloaded, StatusIngestor, StatusService
+
+AGENTS = ["backend", "frontend"]
+
+
+def agent_events(db, project_id, agent):
+    return [e for e in db.get_events(project_id, limit=1000)
+            if e["event_type"] == "AGENT_UPDATED" and e["agent_name"] == agent]
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "orchestrator.db"))
+    db.create_project("Test", "1.0.0", AGENTS)
+    return db
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    db = ShardedDatabase(str(tmp_path / "shards"))
+    first = db.create_project("First", "1.0.0", AGENTS)
+    second = db.create_project("Second", "1.0.0", AGENTS)
+    yield db, first, second
+    db.close()
+
+
+class SlowDatabase:
+    """Holds every group commit until released"""
+
+    def __init__(self, db):
+        self.db = db
+        self.release = threading.Event()
+
+    def list_projects(self):
+        return self.db.list_projects()
+
+    def apply_agent_updates(self, updates):
+        self.release.wait(10)
+        return self.db.apply_agent_updates(updates)
+
+
+class FlakyDatabase:
+    """Fails the first `failures` group commits"""
+
+    def __init__(self, db, failures):
+        self.db = db
+        self.failures = failures
+        self.calls = 0
+
+    def list_projects(self):
+        return self.db.list_projects()
+
+    def apply_agent_updates(self, updates):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("database is locked")
+        return self.db.apply_agent_updates(updates)
+
+
+def test_updates_for_one_agent_are_coalesced(db):
+    ingestor = StatusIngestor(db, window=0.2)
+    ingestor.start()
+    try:
+        generation = ingestor.accept([(1, "backend", {"status": "IN_PROGRESS", "todos_completed": 1})])
+        ingestor.accept([(1, "backend", {"todos_completed": 2})])
+        ingestor.accept([(1, "backend", {"progress": "50%"})])
+        assert ingestor.wait_committed(generation, [(1, "backend")], timeout=5)
+    finally:
+        ingestor.close()
+
+    agent = db.get_agent(1, "backend")
+    assert (agent["status"], agent["todos_completed"], agent["progress"]) == ("IN_PROGRESS", 2, "50%")
+    assert len(agent_events(db, 1, "backend")) == 1
+    assert ingestor.stats["coalesced"] == 2
+    assert ingestor.stats["rows"] == 1
+
+
+def test_unknown_project_is_rejected(db):
+    service = StatusService(StatusIngestor(db).start(), default_project=1)
+    try:
+        status, body = service.handle({"agent": "backend", "project": 999, "status": "DONE"})
+    finally:
+        service.shutdown()
+    assert status == 400
+    assert body["error"] == "unknown project 999"
+    assert service.ingestor.snapshot()["pending"] == 0
+
+
+def test_project_created_after_start_is_accepted(db):
+    ingestor = StatusIngestor(db).start()
+    try:
+        ingestor.accept([(1, "backend", {})])
+        project_id = db.create_project("Later", "1.0.0", AGENTS)
+        time.sleep(1.0)  # PROJECT_REFRESH
+        ingestor.accept([(project_id, "backend", {"status": "DONE"})])
+    finally:
+        ingestor.close()
+    assert db.get_agent(project_id, "backend")["status"] == "DONE"
+
+
+def test_full_pending_set_refuses_new_agents(db):
+    slow = SlowDatabase(db)
+    ingestor = StatusIngestor(slow, window=0.01, max_pending=1).start()
+    service = StatusService(ingestor, default_project=1)
+    try:
+        ingestor.accept([(1, "backend", {"status": "IN_PROGRESS"})])
+        time.sleep(0.1)  # the flusher now holds backend's batch
+        ingestor.accept([(1, "frontend", {"status": "IN_PROGRESS"})])
+        ingestor.accept([(1, "frontend", {"todos_completed": 1})])  # same agent: coalesced
+        with pytest.raises(Overloaded):
+            ingestor.accept([(1, "backend", {"status": "DONE"})])
+        status, body = service.handle({"agent": "backend", "status": "DONE"})
+        assert status == 429
+        assert body["retry_after"] > 0
+    finally:
+        slow.release.set()
+        service.shutdown()
+    assert ingestor.stats["refused"] == 2
+    assert db.get_agent(1, "frontend")["todos_completed"] == 1
+
+
+def test_sync_update_is_committed_before_the_reply(db):
+    service = StatusService(StatusIngestor(db, window=0.05).start(), default_project=1)
+    try:
+        status, _ = service.handle({"agent": "frontend", "status": "DONE", "sync": True})
+        assert status == 202
+        assert db.get_agent(1, "frontend")["status"] == "DONE"
+    finally:
+        service.shutdown()
+
+
+def test_failed_commit_is_retried(db):
+    flaky = FlakyDatabase(db, failures=2)
+    service = StatusService(StatusIngestor(flaky, window=0.01).start(), default_project=1)
+    try:
+        status, _ = service.handle({"agent": "backend", "status": "BLOCKED", "sync": True})
+    finally:
+        service.shutdown()
+    assert status == 202
+    assert flaky.calls == 3
+    assert db.get_agent(1, "backend")["status"] == "BLOCKED"
+    assert len(agent_events(db, 1, "backend")) == 1
+
+
+def test_failed_shard_is_retried_alone_then_dropped(sharded):
+    db, first, second = sharded
+    broken = db.shard(second)
+
+    def fail(updates):
+        raise RuntimeError("disk I/O error")
+    broken.apply_agent_updates = fail
+
+    ingestor = StatusIngestor(db, window=0.01, max_attempts=3).start()
+    try:
+        generation = ingestor.accept([(first, "frontend", {"status": "DONE"}),
+                                      (second, "backend", {"status": "DONE"})])
+        with pytest.raises(CommitFailed):
+            ingestor.wait_committed(generation, [(second, "backend")], timeout=10)
+        assert ingestor.wait_committed(generation, [(first, "frontend")], timeout=1)
+        snapshot = ingestor.snapshot()
+    finally:
+        ingestor.close()
+
+    assert db.get_agent(first, "frontend")["status"] == "DONE"
+    assert len(agent_events(db, first, "frontend")) == 1  # not rewritten by the retries
+    assert snapshot["pending"] == 0
+    assert snapshot["dropped"] == 1
+    assert snapshot["errors"] == 3
+
+
+def test_service_keeps_working_after_a_dropped_update(sharded):
+    db, first, second = sharded
+    flaky = FlakyDatabase(db, failures=2)
+    service = StatusService(StatusIngestor(flaky, window=0.01, max_attempts=2).start(), default_project=first)
+    try:
+        dropped = service.handle({"agent": "backend", "status": "FAILED", "sync": True})
+        after = service.handle({"agent": "backend", "status": "DONE", "sync": True})
+    finally:
+        service.shutdown()
+    assert dropped[0] == 500
+    assert after[0] == 202
+    assert db.get_agent(first, "backend")["status"] == "DONE"
+
+
+def test_malformed_updates_are_rejected(db):
+    service = StatusService(StatusIngestor(db, agents=tuple(AGENTS)).start(), default_project=1)
+    try:
+        assert service.handle({"agent": "qa"})[0] == 400
+        assert service.handle({"agent": "backend", "todos_completed": "3"})[0] == 400
+        assert service.handle({"agent": "backend", "colour": "red"})[0] == 400
+        assert service.handle({"updates": "backend"})[0] == 400
+    finally:
+        service.shutdown()
+    with pytest.raises(IngestError):
+        StatusIngestor(db, agents=tuple(AGENTS)).accept([(1, "qa", {})])
@@ -0,0 +1,46 @@
+"""
+Validation daemon: warm results and inputs under pruned directories
+"""
+
+import os
+import time
+
+from validation_daemon import ValidationDaemon
+
+CONFIG = """orchestration:
+  coverage:
+    reports: [coverage/lcov.info]
+    areas:
+      frontend: {paths: [src], lines: 75}
+"""
+
+
+def write_lcov(root, hit):
+    report = root / "coverage" / "lcov.info"
+    report.write_text(f"SF:src/a.ts\nLF:10\nLH:{hit}\nend_of_record\n")
+    return report
+
+
+def coverage_errors(response):
+    return [e for e in response["errors"] if "coverage" in e]
+
+
+def test_coverage_report_change_is_seen(tmp_path):
+    (tmp_path / "project-description.yaml").write_text(CONFIG)
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.ts").write_text("export {}\n")
+    (tmp_path / "coverage").mkdir()
+    report = write_lcov(tmp_path, 1)
+    hour_ago = time.time() - 3600
+    os.utime(report, (hour_ago, hour_ago))
+
+    daemon = ValidationDaemon(str(tmp_path), socket_path=str(tmp_path / "daemon.sock"))
+    assert coverage_errors(daemon.handle({"phase": 6}))
+    assert 6 in daemon.unwatched  # coverage/ is pruned from the watch
+
+    write_lcov(tmp_path, 9)
+    if daemon.watcher is not None and daemon.watcher.read_changes():
+        daemon._reset()
+    response = daemon.handle({"phase": 6})
+    assert not response["memo"]
+    assert not coverage_errors(response)
@@ -0,0 +1,158 @@
+"""
+Webhooks: batched delivery to a local HTTP stub
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import webhooks
+from database import Database
+from event_bus import Event, EventBus
+from webhooks import Endpoint, WebhookDispatcher
+
+
+class StubServer:
+    """Records POSTed batches and answers with scripted status codes (then 200)"""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []  # (monotonic time, event ids)
+        self.release = threading.Event()
+        self.release.set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.release.wait(10)
+                stub.requests.append((time.monotonic(), [e["id"] for e in body["events"]]))
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def batches(self):
+        return [ids for _, ids in self.requests]
+
+    def close(self):
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(statuses=()):
+        server = StubServer(statuses)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def events(first, count, event_type="AGENT_UPDATED"):
+    return [Event(i, 1, "backend", event_type, {"n": i}, "2024-01-01 00:00:00")
+            for i in range(first, first + count)]
+
+
+def dispatcher(tmp_path, server, bus, batch_size=100, **kwargs):
+    kwargs.setdefault("flush_interval", 0.1)
+    kwargs.setdefault("backoff", 0.05)
+    db = Database(str(tmp_path / "orchestrator.db"))
+    return WebhookDispatcher(db, [Endpoint(server.url, batch_size=batch_size)], bus, **kwargs), db
+
+
+def test_events_are_posted_in_batches_in_order(tmp_path, stub):
+    server, bus = stub(), EventBus()
+    hooks, _ = dispatcher(tmp_path, server, bus, batch_size=3)
+    with hooks:
+        bus.publish(events(1, 7))
+    assert server.batches() == [[1, 2, 3], [4, 5, 6], [7]]
+    assert hooks.stats == {"delivered": 7, "dead_lettered": 0, "dropped": 0}
+
+
+def test_event_type_filter(tmp_path, stub):
+    server, bus = stub(), EventBus()
+    db = Database(str(tmp_path / "orchestrator.db"))
+    endpoint = Endpoint(server.url, event_types=["PHASE_TRANSITION"])
+    with WebhookDispatcher(db, [endpoint], bus, flush_interval=0.1):
+        bus.publish(events(1, 2) + events(3, 1, "PHASE_TRANSITION"))
+    assert server.batches() == [[3]]
+
+
+def test_5xx_and_429_are_retried_with_backoff(tmp_path, stub, monkeypatch):
+    monkeypatch.setattr(webhooks.random, "uniform", lambda low, high: high)  # no jitter
+    server, bus = stub([503, 429]), EventBus()
+    hooks, db = dispatcher(tmp_path, server, bus, backoff=0.1)
+    with hooks:
+        bus.publish(events(1, 2))
+        deadline = time.monotonic() + 5
+        while hooks.stats["delivered"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert server.batches() == [[1, 2]] * 3
+    (first, _), (second, _), (third, _) = server.requests
+    assert second - first >= 0.1
+    assert third - second >= 0.2  # doubled
+    assert hooks.stats["delivered"] == 2
+    assert db.get_dead_letters() == []
+
+
+def test_exhausted_retries_are_dead_lettered(tmp_path, stub):
+    server, bus = stub([500] * 3), EventBus()
+    hooks, db = dispatcher(tmp_path, server, bus, max_attempts=3)
+    with hooks:
+        bus.publish(events(1, 2))
+
+    assert len(server.requests) == 3
+    [letter] = db.get_dead_letters()
+    assert (letter["endpoint"], letter["event_count"], letter["error"], letter["attempts"]) == (
+        server.url, 2, "HTTP 500", 3)
+    assert [e["id"] for e in json.loads(letter["payload"])] == [1, 2]
+    assert hooks.stats == {"delivered": 0, "dead_lettered": 2, "dropped": 0}
+
+
+def test_client_errors_are_not_retried(tmp_path, stub):
+    server, bus = stub([400]), EventBus()
+    hooks, db = dispatcher(tmp_path, server, bus)
+    with hooks:
+        bus.publish(events(1, 1))
+    assert len(server.requests) == 1
+    assert [letter["attempts"] for letter in db.get_dead_letters()] == [1]
+
+
+def test_a_full_queue_does_not_block_the_publisher(tmp_path, stub):
+    server, bus = stub(), EventBus()
+    server.release.clear()  # the endpoint hangs until released
+    hooks, db = dispatcher(tmp_path, server, bus, batch_size=1, queue_size=2, flush_interval=0.01)
+    hooks.start()
+    bus.publish(events(1, 1))
+    time.sleep(0.2)  # the sender is now stuck posting event 1
+
+    start = time.monotonic()
+    bus.publish(events(2, 20))
+    assert time.monotonic() - start < 0.5
+
+    server.release.set()
+    hooks.close()
+    stats = hooks.stats
+    assert stats["dropped"] > 0
+    assert sum(stats.values()) == 21
+    assert any(letter["error"] == "queue full" for letter in db.get_dead_letters())
+    assert stats["delivered"] == len([i for batch in server.batches() for i in batch])
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Persistent result cache for phase validation checks
+Each check records the files it depended on (path, mtime, size and
+optionally a content hash); a cached result is reused while none of
+those inputs changed
+"""
+
+import hashlib
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CACHE_FILE = ".validation_cache.json"
+CACHE_VERSION = 1
+
+# A file modified this close to when its result was recorded may change again
+# within the same mtime tick; such entries are re-verified by hash or re-run
+RACY_WINDOW_NS = 2_000_000_000
+
+_local = threading.local()
+
+
+class InputRecorder:
+    """Collects the inputs touched by the check running on this thread"""
+
+    __slots__ = ("inputs", "volatile", "hash_contents", "bytes_read")
+
+    def __init__(self, hash_contents: bool = False):
+        self.inputs: Dict[str, Optional[List]] = {}
+        self.volatile = False
+        self.hash_contents = hash_contents
+        self.bytes_read = 0
+
+
+def start_recording(hash_contents: bool = False) -> InputRecorder:
+    recorder = InputRecorder(hash_contents)
+    _local.recorder = recorder
+    return recorder
+
+
+def stop_recording():
+    _local.recorder = None
+
+
+def record_input(path: Path, st: Optional[os.stat_result], data: Optional[bytes] = None,
+                 exists_only: bool = False, listing: bool = False):
+    """Record a stat (and, for files that were read, optionally their hash)
+
+    Fingerprints: None = must be missing, True = must exist (directories and
+    existence checks), [mtime_ns, size(, sha256)] = must be unchanged. With
+    listing=True a directory is fingerprinted too, so adding or removing an
+    entry invalidates the result.
+    """
+    recorder = getattr(_local, "recorder", None)
+    if recorder is None:
+        return
+    key = str(path)
+    if st is None:
+        recorder.inputs[key] = None
+        return
+    if data is not None:
+        recorder.bytes_read += len(data)
+    if exists_only or (stat.S_ISDIR(st.st_mode) and not listing):
+        recorder.inputs.setdefault(key, True)
+        return
+    fingerprint = [st.st_mtime_ns, st.st_size]
+    if data is not None and recorder.hash_contents:
+        fingerprint.append(hashlib.sha256(data).hexdigest())
+    else:
+        previous = recorder.inputs.get(key)
+        if isinstance(previous, list) and len(previous) == 3:
+            return  # keep the richer fingerprint from an earlier read
+    recorder.inputs[key] = fingerprint
+
+
+def record_read(nbytes: int):
+    """Count bytes a check consumed without going through record_input
+    (e.g. a streamed coverage report)"""
+    recorder = getattr(_local, "recorder", None)
+    if recorder is not None:
+        recorder.bytes_read += nbytes
+
+
+def mark_volatile():
+    """Flag the current check as depending on more than its recorded inputs"""
+    recorder = getattr(_local, "recorder", None)
+    if recorder is not None:
+        recorder.volatile = True
+
+
+def _file_sha256(path: Path) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class ValidationCache:
+    """JSON-backed map of check ID -> (inputs, errors)
+
+    `salt` invalidates the whole cache when validator code or optional
+    dependencies change. Named sections hold auxiliary per-file data (such
+    as parsed route exports) that checks reuse when they do have to re-run.
+    """
+
+    def __init__(self, project_root: str = ".", salt: str = ""):
+        self.project_root = Path(project_root)
+        self.path = self.project_root / CACHE_FILE
+        self.salt = salt
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._entries: Dict[str, Dict] = {}
+        self._sections: Dict[str, Dict] = {}
+        try:
+            data = json.loads(self.path.read_text())
+            if data.get("version") == CACHE_VERSION and data.get("salt") == salt:
+                self._entries = data.get("checks", {})
+                self._sections = data.get("sections", {})
+        except (OSError, ValueError):
+            pass
+
+    def lookup(self, check_id: str, rule: str = "") -> Optional[List[str]]:
+        """Cached errors for check_id if its rule digest and all of its inputs are unchanged"""
+        entry = self._entries.get(check_id)
+        if entry is None or entry.get("rule", "") != rule:
+            return None
+        recorded_at = entry.get("recorded_at", 0)
+        for key, fingerprint in entry["inputs"].items():
+            path = self.project_root / key
+            try:
+                st = os.stat(path)
+            except OSError:
+                st = None
+            if fingerprint is None or st is None:
+                if fingerprint is not st:  # existence changed
+                    return None
+                continue
+            if fingerprint is True:
+                continue
+            same_stat = st.st_mtime_ns == fingerprint[0] and st.st_size == fingerprint[1]
+            racy = fingerprint[0] >= recorded_at - RACY_WINDOW_NS
+            if same_stat and not racy:
+                continue
+            # Stat changed (or cannot be trusted): fall back to content hash
+            if len(fingerprint) < 3 or st.st_size != fingerprint[1] or _file_sha256(path) != fingerprint[2]:
+                return None
+        return entry["errors"]
+
+    def store(self, check_id: str, recorder: InputRecorder, errors: List[str], rule: str = ""):
+        if recorder.volatile:
+            return
+        inputs = {}
+        for key, fingerprint in recorder.inputs.items():
+            try:
+                key = str(Path(key).relative_to(self.project_root))
+            except ValueError:
+                pass
+            inputs[key] = fingerprint
+        with self._lock:
+            self._entries[check_id] = {
+                "inputs": inputs,
+                "errors": errors,
+                "rule": rule,
+                "recorded_at": time.time_ns(),
+            }
+            self._dirty = True
+
+    def inputs(self, check_id: str) -> List[str]:
+        """Recorded input paths of a cached check (relative to the project where possible)"""
+        with self._lock:
+            entry = self._entries.get(check_id)
+            return list(entry["inputs"]) if entry else []
+
+    def section(self, name: str) -> Dict:
+        """Copy of a named auxiliary section"""
+        with self._lock:
+            return dict(self._sections.get(name, {}))
+
+    def update_section(self, name: str, entries: Dict):
+        with self._lock:
+            if self._sections.get(name) != entries:
+                self._sections[name] = entries
+                self._dirty = True
+
+    def save(self):
+        """Atomically persist the cache if anything changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps({"version": CACHE_VERSION, "salt": self.salt,
+                                  "checks": self._entries, "sections": self._sections})
+            self._dirty = False
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            tmp.write_text(payload)
+            os.replace(tmp, self.path)
+        except OSError:
+            # Read-only checkout: validation still works, just uncached
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Resident phase validation daemon
+Keeps the validation cache, file index and parsed artifacts warm between
+requests and answers them over a Unix socket; inotify invalidates warm state.
+The client falls back to in-process validation when no daemon is running.
+
+Protocol: one JSON object per line in each direction, e.g.
+  {"cmd": "validate", "phase": 3, "root": "/abs/project", "force": false}
+  {"ok": true, "success": false, "errors": [...], "checks": [...], "memo": true, "elapsed_ms": 0.4}
+"""
+
+import hashlib
+import json
+import os
+import selectors
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+# Heavy modules (phase_validators, yaml) are imported by the server and by
+# the in-process fallback only, so a client talking to a daemon starts fast
+
+# Our own writes inside the project must not invalidate warm state
+IGNORED_PREFIXES = (".validation_cache.json",)
+
+
+def default_socket_path(project_root: str = ".") -> str:
+    """Per-user, per-project socket path (override with PHASE_VALIDATOR_SOCKET)"""
+    env = os.environ.get("PHASE_VALIDATOR_SOCKET")
+    if env:
+        return env
+    root = str(Path(project_root).resolve())
+    digest = hashlib.sha1(root.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"phase-validator-{os.getuid()}-{digest}.sock")
+
+
+class Inotify:
+    """Recursive directory watcher over the raw inotify API (Linux, via ctypes)"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+            | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: str, prune: Tuple[str, ...] = ()):
+        import ctypes
+        import ctypes.util
+        from project_index import is_pruned
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self._get_errno = ctypes.get_errno
+        self.root = root
+        self.prune = set(prune)
+        self._is_pruned = is_pruned
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(self._get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+        try:
+            self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, top: str):
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                # ENOSPC: fs.inotify.max_user_watches exhausted
+                raise OSError(self._get_errno(), f"cannot watch {directory}")
+            self.dirs[wd] = directory
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and not self.pruned(entry.path):
+                        stack.append(entry.path)
+
+    def pruned(self, path: str) -> bool:
+        return self._is_pruned(Path(os.path.relpath(path, self.root)).as_posix(), self.prune)
+
+    def read_changes(self) -> bool:
+        """Drain queued events; True if anything relevant changed"""
+        changed = False
+        while True:
+            try:
+                buf = os.read(self.fd, 65536)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _cookie, length = self._EVENT.unpack_from(buf, offset)
+                name = os.fsdecode(buf[offset + 16:offset + 16 + length].rstrip(b"\0"))
+                offset += 16 + length
+                if mask & self.IN_Q_OVERFLOW:
+                    changed = True
+                elif mask & self.IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                elif name.startswith(IGNORED_PREFIXES) or (
+                        mask & self.IN_ISDIR and wd in self.dirs and self.pruned(os.path.join(self.dirs[wd], name))):
+                    continue
+                else:
+                    changed = True
+                    if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO) and wd in self.dirs:
+                        self.add_tree(os.path.join(self.dirs[wd], name))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class ValidationDaemon:
+    """Serves validate requests for one project root, one at a time
+
+    Warm state (file index, per-run IO memo, last result per phase) lives
+    until inotify reports a change under the project. Without inotify, the
+    index and memo are rebuilt per request and freshness comes from the
+    validation cache's stat fingerprints.
+
+    Pruned directories are not watched, so a phase whose checks read inputs
+    there (coverage reports, .artifacts/refs) is never memoized and runs
+    with a fresh IO memo; its cached checks still revalidate their inputs.
+    """
+
+    def __init__(self, project_root: str = ".", socket_path: Optional[str] = None,
+                 idle_timeout: Optional[float] = None):
+        from phase_validators import _cache_salt
+        from project_index import prune_from_env
+        from validation_cache import ValidationCache
+
+        self.project_root = str(Path(project_root).resolve())
+        self.socket_path = socket_path or default_socket_path(self.project_root)
+        self.idle_timeout = idle_timeout
+        self.salt = _cache_salt()
+        self.cache = ValidationCache(self.project_root, self.salt)
+        self.requests = 0
+        self.memo_hits = 0
+        self.prune = set(prune_from_env())
+        self.unwatched: Set[int] = set()  # phases with inputs inotify cannot see
+        self._running = False
+        try:
+            self.watcher: Optional[Inotify] = Inotify(self.project_root, tuple(self.prune))
+        except OSError as e:
+            print(f"⚠️  inotify unavailable ({e}); revalidating inputs on every request", file=sys.stderr)
+            self.watcher = None
+        self._reset()
+
+    def _reset(self):
+        from project_index import ProjectIndex
+        from validation_rules import IOMemo
+
+        self.index = ProjectIndex(self.project_root)
+        self.io = IOMemo()
+        self.results: Dict = {}  # phase -> ValidationRun
+
+    def _reads_unwatched(self, run) -> bool:
+        from project_index import under_pruned
+
+        return any(os.path.isabs(path) or under_pruned(Path(path).as_posix(), self.prune)
+                   for check in run.checks for path in self.cache.inputs(check.check_id))
+
+    def handle(self, request: Dict) -> Dict:
+        from phase_validators import _cache_salt, run_phase
+        from validation_rules import IOMemo
+
+        cmd = request.get("cmd", "validate")
+        if cmd == "ping":
+            return {"ok": True, "pid": os.getpid(), "root": self.project_root,
+                    "watching": self.watcher is not None, "requests": self.requests,
+                    "memo_hits": self.memo_hits}
+        if cmd == "shutdown":
+            self._running = False
+            return {"ok": True}
+        if cmd != "validate":
+            return {"ok": False, "error": f"Unknown command '{cmd}'"}
+        if request.get("root") and str(Path(request["root"]).resolve()) != self.project_root:
+            return {"ok": False, "error": f"Daemon serves {self.project_root}"}
+        if _cache_salt() != self.salt:
+            # Validator code changed under us: let the client run the new code
+            self._running = False
+            return {"ok": False, "error": "Validator code changed; daemon exiting"}
+
+        start = time.perf_counter()
+        self.requests += 1
+        if self.watcher is None or self.watcher.read_changes():
+            self._reset()
+
+        phase = int(request["phase"])
+        force = bool(request.get("force"))
+        memo = not force and phase in self.results
+        if memo:
+            self.memo_hits += 1
+            run = self.results[phase]
+        else:
+            unwatched = phase in self.unwatched
+            run = run_phase(phase, self.project_root, request.get("workers"), force=force,
+                            cache=self.cache, index=self.index, io=IOMemo() if unwatched else self.io)
+            if not unwatched and self._reads_unwatched(run):
+                # The shared IO memo now holds reads no event will invalidate
+                self.unwatched.add(phase)
+                self._reset()
+            if phase not in self.unwatched:
+                self.results[phase] = run
+        return {"ok": True, "success": run.success, "errors": run.errors,
+                "checks": [check.to_dict() for check in run.checks], "memo": memo,
+                "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+    def _serve_connection(self, conn: socket.socket):
+        conn.settimeout(30)
+        with conn, conn.makefile("rwb") as stream:
+            for line in stream:
+                try:
+                    response = self.handle(json.loads(line))
+                except Exception as e:
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                stream.write(json.dumps(response).encode() + b"\n")
+                stream.flush()
+                if not self._running:
+                    return
+
+    def serve_forever(self):
+        if request({"cmd": "ping"}, self.socket_path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # stale socket from a crashed daemon
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # owner-only socket
+        try:
+            listener.bind(self.socket_path)
+        finally:
+            os.umask(old_umask)
+        listener.listen(16)
+
+        selector = selectors.DefaultSelector()
+        selector.register(listener, selectors.EVENT_READ, "accept")
+        if self.watcher is not None:
+            selector.register(self.watcher.fd, selectors.EVENT_READ, "inotify")
+
+        self._running = True
+        last_request = time.monotonic()
+        try:
+            while self._running:
+                for key, _ in selector.select(timeout=1.0):
+                    if key.data == "inotify":
+                        if self.watcher.read_changes():
+                            self._reset()
+                    else:
+                        conn, _ = listener.accept()
+                        self._serve_connection(conn)
+                        last_request = time.monotonic()
+                if self.idle_timeout and time.monotonic() - last_request > self.idle_timeout:
+                    break
+        finally:
+            selector.close()
+            listener.close()
+            try:
+                os.unlink(self.socket_path)
+            except OSError:
+                pass
+            if self.watcher is not None:
+                self.watcher.close()
+
+
+def request(message: Dict, socket_path: str, timeout: Optional[float] = 120.0) -> Optional[Dict]:
+    """Send one request; None if no daemon is listening"""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    with sock:
+        sock.sendall(json.dumps(message).encode() + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                return None
+            data += chunk
+    return json.loads(data)
+
+
+def validate(phase: int, project_root: str = ".", max_workers: Optional[int] = None,
+             force: bool = False, socket_path: Optional[str] = None) -> Tuple[bool, List[str]]:
+    """Validate through the daemon when one is running, otherwise in-process"""
+    response = request({"cmd": "validate", "phase": phase, "root": str(Path(project_root).resolve()),
+                        "force": force, "workers": max_workers},
+                       socket_path or default_socket_path(project_root))
+    if response is not None and response.get("ok"):
+        return (response["success"], response["errors"])
+
+    from phase_validators import validate_phase
+    return validate_phase(phase, project_root, max_workers, force=force)
+
+
+def start_background(project_root: str, socket_path: str, idle_timeout: Optional[float],
+                     wait: float = 10.0) -> bool:
+    """Spawn a detached daemon and wait until it answers"""
+    cmd = [sys.executable, os.path.abspath(__file__), "--root", project_root, "--socket", socket_path, "serve"]
+    if idle_timeout:
+        cmd += ["--idle-timeout", str(idle_timeout)]
+    subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        if request({"cmd": "ping"}, socket_path, timeout=1.0) is not None:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Resident phase validation daemon and client")
+    parser.add_argument("--root", default=".", help="Project root")
+    parser.add_argument("--socket", help="Socket path (default: per-project path in the temp dir)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run the daemon in the foreground")
+    start = sub.add_parser("start", help="Start the daemon in the background")
+    for p in (serve, start):
+        p.add_argument("--idle-timeout", type=float, help="Exit after this many idle seconds")
+    sub.add_parser("stop", help="Stop a running daemon")
+    sub.add_parser("status", help="Show daemon status")
+    check = sub.add_parser("validate", help="Validate a phase (in-process if no daemon)")
+    check.add_argument("phase", type=int)
+    check.add_argument("--force", action="store_true")
+    check.add_argument("--workers", type=int)
+
+    args = parser.parse_args()
+    socket_path = args.socket or default_socket_path(args.root)
+
+    if args.command == "serve":
+        daemon = ValidationDaemon(args.root, socket_path, args.idle_timeout)
+        print(f"🔌 Validation daemon for {daemon.project_root} listening on {socket_path}")
+        daemon.serve_forever()
+    elif args.command == "start":
+        if request({"cmd": "ping"}, socket_path, timeout=1.0) is not None:
+            print(f"✅ Daemon already running on {socket_path}")
+        elif start_background(args.root, socket_path, args.idle_timeout):
+            print(f"✅ Daemon started on {socket_path}")
+        else:
+            print("❌ Daemon did not start")
+            sys.exit(1)
+    elif args.command == "stop":
+        if request({"cmd": "shutdown"}, socket_path, timeout=5.0) is None:
+            print("⚠️  No daemon running")
+        else:
+            print("✅ Daemon stopped")
+    elif args.command == "status":
+        status = request({"cmd": "ping"}, socket_path, timeout=1.0)
+        if status is None:
+            print("⚪ No daemon running")
+            sys.exit(1)
+        mode = "inotify" if status["watching"] else "polling"
+        print(f"🟢 pid {status['pid']} serving {status['root']} ({mode}), "
+              f"{status['requests']} requests, {status['memo_hits']} served warm")
+    else:
+        print(f"Validating Phase {args.phase}...")
+        success, errors = validate(args.phase, args.root, args.workers, args.force, socket_path)
+        if success:
+            print(f"✅ Phase {args.phase} validation PASSED")
+            sys.exit(0)
+        print(f"❌ Phase {args.phase} validation FAILED")
+        print(f"\nFound {len(errors)} issues:")
+        for i, error in enumerate(errors, 1):
+            print(f"  {i}. {error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Structured phase validation results
+Every check yields a CheckResult (stable check ID, status, duration, bytes
+read); a ValidationRun collects one phase's results and can be written as
+JSON or JUnit XML so CI can chart slow gates over time
+"""
+
+import json
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional
+
+PASSED = "PASSED"
+FAILED = "FAILED"
+
+REPORT_VERSION = 1
+
+
+class CheckResult:
+    """Outcome of one check
+
+    check_id is "<Validator>.<rule name>", the same key the validation
+    cache uses, so it stays stable across runs. A cached result reports the
+    lookup time as its duration and no bytes read.
+    """
+
+    __slots__ = ("check_id", "status", "errors", "duration", "bytes_read", "cached")
+
+    def __init__(self, check_id: str, errors: List[str], duration: float = 0.0,
+                 bytes_read: int = 0, cached: bool = False):
+        self.check_id = check_id
+        self.status = FAILED if errors else PASSED
+        self.errors = errors
+        self.duration = duration
+        self.bytes_read = bytes_read
+        self.cached = cached
+
+    @property
+    def validator(self) -> str:
+        return self.check_id.partition(".")[0]
+
+    @property
+    def name(self) -> str:
+        return self.check_id.partition(".")[2] or self.check_id
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.check_id,
+            "status": self.status,
+            "duration_seconds": round(self.duration, 6),
+            "bytes_read": self.bytes_read,
+            "cached": self.cached,
+            "errors": self.errors,
+        }
+
+
+class ValidationRun:
+    """One phase validation: overall verdict plus every check's result"""
+
+    def __init__(self, phase: int, success: bool, errors: List[str], checks: List[CheckResult],
+                 started_at: str, duration: float, project: Optional[str] = None):
+        self.phase = phase
+        self.success = success
+        self.errors = errors
+        self.checks = checks
+        self.started_at = started_at
+        self.duration = duration
+        self.project = project
+
+    @property
+    def bytes_read(self) -> int:
+        return sum(check.bytes_read for check in self.checks)
+
+    def to_dict(self) -> Dict:
+        data = {
+            "phase": self.phase,
+            "success": self.success,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration, 6),
+            "bytes_read": self.bytes_read,
+            "errors": self.errors,
+            "checks": [check.to_dict() for check in self.checks],
+        }
+        if self.project is not None:
+            data["project"] = self.project
+        return data
+
+    def slowest(self, limit: int = 5) -> List[CheckResult]:
+        return sorted(self.checks, key=lambda check: check.duration, reverse=True)[:limit]
+
+
+def to_json(runs: List[ValidationRun]) -> str:
+    return json.dumps({"version": REPORT_VERSION, "runs": [run.to_dict() for run in runs]}, indent=2)
+
+
+def to_junit(runs: List[ValidationRun]) -> str:
+    """JUnit XML: one <testsuite> per phase run, one <testcase> per check"""
+    suites = ET.Element("testsuites", {
+        "name": "phase-validation",
+        "tests": str(sum(len(run.checks) for run in runs)),
+        "failures": str(sum(1 for run in runs for check in run.checks if check.status == FAILED)),
+        "time": f"{sum(run.duration for run in runs):.6f}",
+    })
+    for run in runs:
+        name = f"phase-{run.phase}" if run.project is None else f"{run.project}.phase-{run.phase}"
+        suite = ET.SubElement(suites, "testsuite", {
+            "name": name,
+            "tests": str(len(run.checks)),
+            "failures": str(sum(1 for check in run.checks if check.status == FAILED)),
+            "errors": "0",
+            "time": f"{run.duration:.6f}",
+            "timestamp": run.started_at,
+        })
+        for check in run.checks:
+            case = ET.SubElement(suite, "testcase", {
+                "classname": check.validator if run.project is None else f"{run.project}.{check.validator}",
+                "name": check.name,
+                "time": f"{check.duration:.6f}",
+            })
+            properties = ET.SubElement(case, "properties")
+            ET.SubElement(properties, "property", {"name": "bytes_read", "value": str(check.bytes_read)})
+            ET.SubElement(properties, "property", {"name": "cached", "value": str(check.cached).lower()})
+            if check.errors:
+                failure = ET.SubElement(case, "failure", {
+                    "message": check.errors[0],
+                    "type": "PhaseGateFailure",
+                })
+                failure.text = "\n".join(check.errors)
+        # Gate-level messages that no single check owns (e.g. Phase 6 summaries)
+        owned = {e for check in run.checks for e in check.errors}
+        extra = [e for e in run.errors if e not in owned]
+        if extra:
+            ET.SubElement(suite, "system-err").text = "\n".join(extra)
+    ET.indent(suites)
+    return '<?xml version="1.0" encoding="UTF-8"?>\n' + ET.tostring(suites, encoding="unicode") + "\n"
+
+
+def write_reports(runs: List[ValidationRun], json_path: Optional[str] = None,
+                  junit_path: Optional[str] = None):
+    if json_path:
+        with open(json_path, "w") as f:
+            f.write(to_json(runs))
+    if junit_path:
+        with open(junit_path, "w") as f:
+            f.write(to_junit(runs))
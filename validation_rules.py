@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Declarative phase gate rules
+Gates are declared as data (required paths, minimum sizes, JSON/YAML key
+predicates, glob existence) and compiled into an execution plan; at run time
+every filesystem operation and document parse happens at most once
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RULE_KINDS = ("path", "any_of", "glob", "check")
+FORMATS = ("json", "yaml")
+
+DEFAULT_MESSAGES = {
+    "missing": "Missing: {path}",
+    "too_small": "{path} is too short (< {min_size} bytes)",
+    "invalid": "Invalid {format} in {path}",
+    "absent": "{path} missing '{key}' field",
+    "empty": "{path} has no '{key}' defined",
+    "mismatch": "{path}: '{key}' is '{value}', expected '{expected}'",
+}
+
+_RULE_KEYS = set(RULE_KINDS) | set(DEFAULT_MESSAGES) | {
+    "name", "when", "min_size", "format", "require", "nonempty", "equals"}
+
+_EXTENSION_FORMATS = {".json": "json", ".yaml": "yaml", ".yml": "yaml"}
+
+# (operation, target) pairs such as ("stat", "docs/API.md")
+Operation = Tuple[str, str]
+
+
+class RuleError(ValueError):
+    """Raised when a rule definition is invalid"""
+    pass
+
+
+def _as_list(value) -> List[str]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, list) and value and all(isinstance(v, str) for v in value):
+        return value
+    raise RuleError(f"expected a path or a list of paths, got {value!r}")
+
+
+def _lookup(document: Any, dotted: str) -> Tuple[bool, Any]:
+    node = document
+    for key in dotted.split("."):
+        if not isinstance(node, dict) or key not in node:
+            return (False, None)
+        node = node[key]
+    return (True, node)
+
+
+class Rule:
+    """One compiled rule; evaluate() returns its error messages"""
+
+    __slots__ = ("name", "kind", "targets", "when", "min_size", "format",
+                 "require", "nonempty", "equals", "messages", "digest")
+
+    def __init__(self, spec: Dict):
+        if not isinstance(spec, dict):
+            raise RuleError(f"rule must be a mapping, got {spec!r}")
+        unknown = set(spec) - _RULE_KEYS
+        if unknown:
+            raise RuleError(f"unknown rule keys: {', '.join(sorted(unknown))}")
+        kinds = [k for k in RULE_KINDS if k in spec]
+        if len(kinds) != 1:
+            raise RuleError(f"rule needs exactly one of {', '.join(RULE_KINDS)}: {spec!r}")
+
+        self.kind = kinds[0]
+        self.targets = _as_list(spec[self.kind])
+        if self.kind in ("path", "check") and len(self.targets) != 1:
+            raise RuleError(f"'{self.kind}' takes a single value")
+        self.name = str(spec.get("name") or f"{self.kind}:{self.targets[0]}")
+
+        # when: {exists: path(s), missing: path(s)}; all conditions must hold
+        when = spec.get("when") or {}
+        if not isinstance(when, dict) or set(when) - {"exists", "missing"}:
+            raise RuleError(f"{self.name}: 'when' takes 'exists' and/or 'missing'")
+        self.when = [(True, p) for p in _as_list(when["exists"])] if "exists" in when else []
+        self.when += [(False, p) for p in _as_list(when["missing"])] if "missing" in when else []
+
+        self.min_size = spec.get("min_size")
+        if self.min_size is not None and (not isinstance(self.min_size, int) or self.min_size < 0):
+            raise RuleError(f"{self.name}: min_size must be a non-negative integer")
+
+        self.require = _as_list(spec["require"]) if "require" in spec else []
+        self.nonempty = _as_list(spec["nonempty"]) if "nonempty" in spec else []
+        self.equals = spec.get("equals") or {}
+        if not isinstance(self.equals, dict):
+            raise RuleError(f"{self.name}: equals must map keys to expected values")
+
+        has_predicates = bool(self.require or self.nonempty or self.equals)
+        if (has_predicates or self.min_size is not None) and self.kind != "path":
+            raise RuleError(f"{self.name}: size and key predicates only apply to 'path' rules")
+        self.format = spec.get("format")
+        if has_predicates and self.format is None:
+            self.format = _EXTENSION_FORMATS.get(Path(self.targets[0]).suffix)
+        if self.format is not None and self.format not in FORMATS:
+            raise RuleError(f"{self.name}: format must be one of {', '.join(FORMATS)}")
+        if has_predicates and self.format is None:
+            raise RuleError(f"{self.name}: cannot infer document format, set 'format'")
+
+        self.messages = {key: str(spec.get(key, default)) for key, default in DEFAULT_MESSAGES.items()}
+        # Part of the cache key: editing a configured rule invalidates its result
+        self.digest = hashlib.sha1(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def operations(self) -> List[Operation]:
+        ops = [("stat", path) for _, path in self.when]
+        if self.kind == "check":
+            ops.append(("check", self.targets[0]))
+        elif self.kind == "glob":
+            ops.extend(("glob", pattern) for pattern in self.targets)
+        else:
+            ops.extend(("stat", path) for path in self.targets)
+            if self.format is not None:
+                ops.append((f"parse:{self.format}", self.targets[0]))
+        return ops
+
+    def message(self, template: str, **fields) -> str:
+        fields.setdefault("path", self.targets[0])
+        return self.messages[template].format(**fields)
+
+    def evaluate(self, validator) -> List[str]:
+        """Run against a PhaseValidator, whose helpers record every input"""
+        root = validator.project_root
+        for should_exist, path in self.when:
+            if validator._exists(root / path) != should_exist:
+                return []
+
+        if self.kind == "check":
+            return validator.named_check(self.targets[0])()
+        if self.kind == "glob":
+            if any(validator._glob_first(root, pattern) for pattern in self.targets):
+                return []
+            return [self.message("missing")]
+        if self.kind == "any_of":
+            if any(validator._exists(root / path) for path in self.targets):
+                return []
+            return [self.message("missing")]
+
+        path = self.targets[0]
+        st = validator._stat(root / path, exists_only=self.min_size is None and self.format is None)
+        if st is None:
+            return [self.message("missing")]
+        if self.min_size is not None and st.st_size < self.min_size:
+            return [self.message("too_small", min_size=self.min_size)]
+        if self.format is None or not validator.can_parse(self.format):
+            return []
+        try:
+            document = validator._load_document(root / path, self.format)
+        except Exception:
+            return [self.message("invalid", format=self.format.upper())]
+
+        errors = []
+        for key in self.require:
+            if not _lookup(document, key)[0]:
+                errors.append(self.message("absent", key=key))
+        for key in self.nonempty:
+            if not _lookup(document, key)[1]:
+                errors.append(self.message("empty", key=key))
+        for key, expected in self.equals.items():
+            value = _lookup(document, key)[1]
+            if value != expected:
+                errors.append(self.message("mismatch", key=key, value=value, expected=expected))
+        return errors
+
+
+class ExecutionPlan:
+    """Compiled rules plus the deduplicated filesystem operations they need"""
+
+    def __init__(self, rules: List[Rule]):
+        self.rules = rules
+        seen = {}
+        for rule in rules:
+            for op in rule.operations():
+                seen.setdefault(op, None)
+        self.operations: List[Operation] = list(seen)
+
+    def describe(self) -> List[str]:
+        requested = sum(len(rule.operations()) for rule in self.rules)
+        lines = [f"{len(self.rules)} rules, {len(self.operations)} operations "
+                 f"({requested - len(self.operations)} deduplicated)"]
+        lines.extend(f"  {kind:<12} {target}" for kind, target in self.operations)
+        return lines
+
+
+def compile_rules(rules: List[Dict]) -> ExecutionPlan:
+    """Validate rule definitions and compile them into an execution plan"""
+    if not isinstance(rules, list):
+        raise RuleError("rules must be a list")
+    compiled = [Rule(spec) for spec in rules]
+    names = set()
+    for rule in compiled:
+        if rule.name in names:
+            raise RuleError(f"duplicate rule name '{rule.name}'")
+        names.add(rule.name)
+    return ExecutionPlan(compiled)
+
+
+class _Once:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class IOMemo:
+    """Memo of filesystem operations shared by every check of a run
+
+    A validator starts a new one for each validate() unless its caller
+    supplies one it keeps current (validation_daemon).
+
+    Concurrent requests for the same operation wait for a single execution;
+    errors are memoized and re-raised too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, _Once] = {}
+        self.requested = 0
+        self.executed = 0
+
+    def _once(self, key: Tuple, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.requested += 1
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = self._entries[key] = _Once()
+                self.executed += 1
+        if owner:
+            try:
+                entry.value = func()
+            except Exception as e:
+                entry.error = e
+            finally:
+                entry.done.set()
+        else:
+            entry.done.wait()
+        if entry.error is not None:
+            raise entry.error
+        return entry.value
+
+    def stat(self, path: Path) -> Optional[os.stat_result]:
+        def do_stat():
+            try:
+                return os.stat(path)
+            except OSError:
+                return None
+        return self._once(("stat", str(path)), do_stat)
+
+    def read(self, path: Path) -> Tuple[os.stat_result, bytes]:
+        def do_read():
+            with open(path, "rb") as f:
+                return (os.fstat(f.fileno()), f.read())
+        return self._once(("read", str(path)), do_read)
+
+    def parse(self, path: Path, fmt: str, data: bytes, parser: Callable[[bytes], Any]) -> Any:
+        """Parsed document for data previously returned by read(path)"""
+        return self._once((f"parse:{fmt}", str(path)), lambda: parser(data))
+
+
+def parse_json(data: bytes) -> Any:
+    return json.loads(data)
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Parallel multi-project phase validation
+Validates many project roots (paths or glob patterns) across a pool of
+worker processes, with a hard per-project timeout. Results stream out as
+projects finish; the combined run is written as one JSON/JUnit report and
+each project's run is recorded in that project's own database.
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from datetime import datetime
+from multiprocessing.connection import wait
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from orchestrator import SHARDED_ROOT
+from validation_report import CheckResult, ValidationRun, write_reports
+
+DEFAULT_TIMEOUT = 300.0  # seconds per project
+
+# Check IDs for outcomes that have no real checks, so JUnit still shows a failure
+SETUP_CHECK = "Runner.setup"
+TIMEOUT_CHECK = "Runner.timeout"
+CRASH_CHECK = "Runner.crash"
+
+# The per-project state an orchestrator keeps (see orchestrator.py)
+DB_FILE = "orchestrator.db"
+CONTEXT_FILE = "SHARED_CONTEXT.json"
+
+
+class RunnerError(ValueError):
+    """Raised when the project list or a project's phase cannot be resolved"""
+    pass
+
+
+def expand_roots(patterns: List[str]) -> List[Path]:
+    """Project roots from paths and glob patterns, deduplicated, in order
+
+    A directory counts as a project when it has a project-description.yaml.
+    """
+    roots: List[Path] = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            raise RunnerError(f"no projects match '{pattern}'")
+        for match in matches:
+            path = Path(match)
+            if not (path / "project-description.yaml").is_file():
+                if glob.has_magic(pattern):
+                    continue
+                raise RunnerError(f"{match}: no project-description.yaml")
+            key = path.resolve()
+            if key not in seen:
+                seen.add(key)
+                roots.append(path)
+    if not roots:
+        raise RunnerError("no project roots to validate")
+    return roots
+
+
+def open_project_db(root: Path):
+    """The project's orchestrator database, or None for a JSON-mode project
+
+    Never creates one: a root without state is validated but not recorded.
+    """
+    from sharding import ShardedDatabase
+    from database import Database
+
+    if (root / SHARDED_ROOT).is_dir():
+        return ShardedDatabase(str(root / SHARDED_ROOT))
+    if (root / DB_FILE).is_file():
+        return Database(str(root / DB_FILE))
+    return None
+
+
+def close_db(db):
+    if hasattr(db, "close"):
+        db.close()
+
+
+def current_phase(root: Path) -> int:
+    """The phase the project is in, from its database or SHARED_CONTEXT.json"""
+    db = open_project_db(root)
+    if db is not None:
+        try:
+            project = db.get_active_project()
+        finally:
+            close_db(db)
+        if project:
+            return project["current_phase"]
+    context = root / CONTEXT_FILE
+    if context.is_file():
+        return json.loads(context.read_text())["current_phase"]
+    raise RunnerError(f"{root}: not initialized; pass --phase")
+
+
+def failed_run(phase: int, project: str, check_id: str, message: str, duration: float,
+               started_at: str) -> ValidationRun:
+    return ValidationRun(phase, False, [message], [CheckResult(check_id, [message], duration)],
+                         started_at, duration, project)
+
+
+# ----------------------------------------------------------------------------
+# Worker process
+# ----------------------------------------------------------------------------
+
+def _validate(conn, root: str, phase: int, max_workers: int, force: bool):
+    """Runs in the child: sends back ("ok", ValidationRun) or ("error", traceback)"""
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            from phase_validators import run_phase
+
+            run = run_phase(phase, root, max_workers=max_workers, force=force)
+        conn.send(("ok", run))
+    except Exception:
+        conn.send(("error", traceback.format_exc(limit=5)))
+    finally:
+        conn.close()
+
+
+# ----------------------------------------------------------------------------
+# Scheduler
+# ----------------------------------------------------------------------------
+
+class _Job:
+    __slots__ = ("root", "name", "phase", "process", "conn", "started_at", "start", "deadline")
+
+    def __init__(self, root: Path, name: str):
+        self.root = root
+        self.name = name
+        self.phase = 0
+        self.process = None
+        self.conn = None
+        self.started_at = ""
+        self.start = 0.0
+        self.deadline = 0.0
+
+
+class ValidationRunner:
+    """Validates project roots in parallel, one process per project
+
+    At most `jobs` validations run at once. A project that exceeds its
+    timeout is killed and reported as failed, as is one whose process dies;
+    neither holds up the others. on_result is called in completion order.
+    """
+
+    def __init__(self, roots: List[Path], phase: Optional[int] = None, jobs: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT, threads: Optional[int] = None,
+                 force: bool = False, record: bool = True):
+        self.roots = roots
+        self.phase = phase
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.timeout = timeout
+        # Checks are I/O bound, so each process still gets a few threads
+        self.threads = threads or max(2, 4 * (os.cpu_count() or 1) // self.jobs)
+        self.force = force
+        self.record = record
+        self.recorded: Dict[str, Optional[int]] = {}
+        self._context = multiprocessing.get_context()
+
+    def names(self) -> List[str]:
+        """Report names: the relative path, stable across runs"""
+        return [os.path.relpath(root) for root in self.roots]
+
+    def _start(self, job: _Job) -> Optional[ValidationRun]:
+        """Start the job's process; a failed run if its phase is unknown"""
+        job.started_at = datetime.now().isoformat()
+        job.start = time.monotonic()
+        try:
+            job.phase = self.phase if self.phase is not None else current_phase(job.root)
+        except (RunnerError, OSError, ValueError, KeyError) as e:
+            return failed_run(0, job.name, SETUP_CHECK, f"cannot determine the phase: {e}",
+                              0.0, job.started_at)
+        receiver, sender = self._context.Pipe(duplex=False)
+        job.process = self._context.Process(target=_validate, daemon=True, args=(
+            sender, str(job.root), job.phase, self.threads, self.force))
+        job.deadline = job.start + self.timeout
+        job.process.start()
+        sender.close()
+        job.conn = receiver
+        return None
+
+    def _finish(self, job: _Job, timed_out: bool = False) -> ValidationRun:
+        duration = time.monotonic() - job.start
+        if timed_out:
+            job.process.kill()
+            run = failed_run(job.phase, job.name, TIMEOUT_CHECK,
+                             f"validation timed out after {self.timeout:g}s", duration, job.started_at)
+        else:
+            try:
+                status, payload = job.conn.recv()
+            except EOFError:
+                job.process.join()
+                status, payload = "error", f"worker died with exit code {job.process.exitcode}"
+            if status == "ok":
+                run = payload
+                run.project = job.name
+            else:
+                run = failed_run(job.phase, job.name, CRASH_CHECK, payload, duration, job.started_at)
+        job.conn.close()
+        job.process.join()
+        return run
+
+    def record_run(self, root: Path, run: ValidationRun) -> Optional[int]:
+        """Store the run in the project's database; None when it has none"""
+        db = open_project_db(root)
+        if db is None:
+            return None
+        try:
+            project = db.get_active_project()
+            if not project:
+                return None
+            return db.record_validation_run(project["id"], run.to_dict())
+        finally:
+            close_db(db)
+
+    def run(self, on_result=None) -> List[ValidationRun]:
+        """Validate every root; returns the runs in root order"""
+        pending = [_Job(root, name) for root, name in zip(self.roots, self.names())]
+        pending.reverse()
+        running: List[_Job] = []
+        runs: Dict[str, ValidationRun] = {}
+
+        def done(job: _Job, run: ValidationRun):
+            if self.record:
+                try:
+                    self.recorded[job.name] = self.record_run(job.root, run)
+                except Exception as e:
+                    print(f"⚠️  Warning: could not record {job.name}: {e}")
+            runs[job.name] = run
+            if on_result:
+                on_result(run)
+
+        while pending or running:
+            while pending and len(running) < self.jobs:
+                job = pending.pop()
+                run = self._start(job)
+                if run is None:
+                    running.append(job)
+                else:
+                    done(job, run)
+            if not running:
+                continue
+            now = time.monotonic()
+            ready = wait([job.conn for job in running],
+                         timeout=max(0.0, min(job.deadline for job in running) - now))
+            now = time.monotonic()
+            for job in list(running):
+                if job.conn in ready:
+                    run = self._finish(job)
+                elif now >= job.deadline:
+                    run = self._finish(job, timed_out=True)
+                else:
+                    continue
+                running.remove(job)
+                done(job, run)
+        return [runs[name] for name in self.names()]
+
+
+def print_result(run: ValidationRun):
+    flag = "✅" if run.success else "❌"
+    detail = "" if run.success else f" ({len(run.errors)} issues)"
+    print(f"{flag} {run.project}: Phase {run.phase} in {run.duration:.2f}s{detail}", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate many projects' phase gates in parallel")
+    parser.add_argument("roots", nargs="+", help="Project roots or glob patterns (e.g. 'projects/*')")
+    parser.add_argument("--phase", type=int,
+                        help="Phase to validate (default: each project's current phase)")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count() or 1,
+                        help="Projects validated at once (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"Seconds per project before it is killed (default: {DEFAULT_TIMEOUT:g})")
+    parser.add_argument("--threads", type=int, help="Check threads per project process")
+    parser.add_argument("--force", action="store_true", help="Ignore the validation caches")
+    parser.add_argument("--no-record", action="store_true", help="Do not record runs in project databases")
+    parser.add_argument("--stream", help="Append each result as a JSON line to this file as it finishes")
+    parser.add_argument("--json", help="Write the combined JSON report")
+    parser.add_argument("--junit", help="Write the combined JUnit XML report")
+    args = parser.parse_args()
+
+    if args.jobs < 1 or args.timeout <= 0:
+        parser.error("--jobs and --timeout must be positive")
+    try:
+        roots = expand_roots(args.roots)
+    except RunnerError as e:
+        parser.error(str(e))
+
+    runner = ValidationRunner(roots, args.phase, args.jobs, args.timeout, args.threads,
+                              args.force, record=not args.no_record)
+    print(f"🔍 Validating {len(roots)} projects, {runner.jobs} at a time...", flush=True)
+    start = time.perf_counter()
+    with open(args.stream, "a") if args.stream else contextlib.nullcontext() as stream:
+        def on_result(run: ValidationRun):
+            print_result(run)
+            if stream:
+                stream.write(json.dumps(run.to_dict()) + "\n")
+                stream.flush()
+
+        runs = runner.run(on_result)
+    elapsed = time.perf_counter() - start
+    write_reports(runs, args.json, args.junit)
+
+    failed = [run for run in runs if not run.success]
+    recorded = sum(1 for run_id in runner.recorded.values() if run_id is not None)
+    print(f"\n📊 {len(runs) - len(failed)}/{len(runs)} projects passed in {elapsed:.1f}s "
+          f"(sum of project times {sum(run.duration for run in runs):.1f}s); "
+          f"{recorded} runs recorded")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
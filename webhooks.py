@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Batched webhook dispatch for orchestrator events
+Subscribes to the event bus and POSTs committed events to configured HTTP
+endpoints as {"events": [...]} batches. Each endpoint has a bounded queue
+and its own sender thread, so publishing never blocks on the network; a
+batch that still fails after its retries (with exponential backoff) is
+written to the webhook_dead_letters table.
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import deque
+from queue import Empty, Full, Queue
+from typing import Dict, List, Optional, Tuple
+
+from event_bus import EventBus, Subscription, bus as default_bus
+from metrics import registry as metrics
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 0.5   # seconds a partial batch waits for company
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 0.5          # first retry delay; doubles up to BACKOFF_MAX
+BACKOFF_MAX = 30.0
+DEFAULT_TIMEOUT = 5.0
+
+# Client errors that retrying cannot fix
+_PERMANENT_STATUSES = frozenset(range(400, 500)) - {408, 425, 429}
+
+
+class WebhookError(ValueError):
+    """Raised when the webhook configuration is invalid"""
+    pass
+
+
+class Endpoint:
+    """One configured webhook target"""
+
+    __slots__ = ("url", "event_types", "headers", "batch_size", "timeout")
+
+    def __init__(self, url: str, event_types: Optional[List[str]] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, timeout: float = DEFAULT_TIMEOUT):
+        self.url = url
+        self.event_types = event_types
+        self.headers = headers or {}
+        self.batch_size = batch_size
+        self.timeout = timeout
+
+
+def parse_webhook_config(raw) -> List[Endpoint]:
+    """orchestration.webhooks: a list of URLs or {url, events, headers, batch_size, timeout}"""
+    if not isinstance(raw, list):
+        raise WebhookError("webhooks must be a list of endpoints")
+    endpoints = []
+    for i, entry in enumerate(raw, 1):
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if not isinstance(entry, dict):
+            raise WebhookError(f"webhook #{i} must be a URL or a mapping")
+        unknown = set(entry) - {"url", "events", "headers", "batch_size", "timeout"}
+        if unknown:
+            raise WebhookError(f"webhook #{i}: unknown keys {', '.join(sorted(unknown))}")
+        url = entry.get("url")
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            raise WebhookError(f"webhook #{i}: url must be an http(s) URL, got {url!r}")
+        events = entry.get("events")
+        if events is not None and (not isinstance(events, list)
+                                   or not all(isinstance(e, str) for e in events)):
+            raise WebhookError(f"webhook #{i}: events must be a list of event types")
+        headers = entry.get("headers") or {}
+        if not isinstance(headers, dict):
+            raise WebhookError(f"webhook #{i}: headers must be a mapping")
+        batch_size = entry.get("batch_size", DEFAULT_BATCH_SIZE)
+        timeout = entry.get("timeout", DEFAULT_TIMEOUT)
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise WebhookError(f"webhook #{i}: batch_size must be a positive integer")
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise WebhookError(f"webhook #{i}: timeout must be a positive number")
+        endpoints.append(Endpoint(url, events, {str(k): str(v) for k, v in headers.items()},
+                                  batch_size, float(timeout)))
+    return endpoints
+
+
+def post_batch(endpoint: Endpoint, events: List[Dict]) -> Tuple[bool, bool, str]:
+    """POST one batch; returns (delivered, retryable, error)"""
+    body = json.dumps({"events": events}).encode()
+    request = urllib.request.Request(endpoint.url, data=body, method="POST", headers={
+        "Content-Type": "application/json", **endpoint.headers})
+    try:
+        with urllib.request.urlopen(request, timeout=endpoint.timeout) as response:
+            response.read()
+        return (True, False, "")
+    except urllib.error.HTTPError as e:
+        return (False, e.code not in _PERMANENT_STATUSES, f"HTTP {e.code}")
+    except (urllib.error.URLError, OSError) as e:
+        return (False, True, str(getattr(e, "reason", e)))
+
+
+class _Sender:
+    """Queue and delivery thread for one endpoint"""
+
+    def __init__(self, dispatcher: "WebhookDispatcher", endpoint: Endpoint):
+        self.dispatcher = dispatcher
+        self.endpoint = endpoint
+        self.queue: Queue = Queue(maxsize=dispatcher.queue_size)
+        # Events the full queue turned away, dead-lettered by the sender;
+        # beyond this too, events are dropped (and counted)
+        self.overflow: deque = deque()
+        self.thread = threading.Thread(target=self.run, daemon=True,
+                                       name=f"webhook-{endpoint.url}")
+
+    def offer(self, event: Dict):
+        """Called on the publishing thread: never blocks"""
+        try:
+            self.queue.put_nowait(event)
+        except Full:
+            if len(self.overflow) < self.dispatcher.queue_size:
+                self.overflow.append(event)
+            else:
+                self.dispatcher._count("dropped", 1)
+
+    def next_batch(self) -> List[Dict]:
+        """Wait for one event, then up to flush_interval for a full batch"""
+        dispatcher = self.dispatcher
+        try:
+            batch = [self.queue.get(timeout=dispatcher.flush_interval)]
+        except Empty:
+            return []
+        deadline = time.monotonic() + dispatcher.flush_interval
+        while len(batch) < self.endpoint.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or dispatcher._stopping.is_set():
+                remaining = 0
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining else self.queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def deliver(self, batch: List[Dict]):
+        dispatcher = self.dispatcher
+        delay = dispatcher.backoff
+        error = ""
+        for attempt in range(1, dispatcher.max_attempts + 1):
+            start = time.perf_counter()
+            delivered, retryable, error = dispatcher.post(self.endpoint, batch)
+            metrics.observe("orchestrator_webhook_post_seconds", time.perf_counter() - start)
+            if delivered:
+                dispatcher._count("delivered", len(batch))
+                return
+            if not retryable or attempt == dispatcher.max_attempts:
+                break
+            # Full jitter; a shutdown cuts the wait short but not the attempts
+            if dispatcher._stopping.wait(random.uniform(0, delay)):
+                delay = 0
+            delay = min(delay * 2, BACKOFF_MAX)
+        dispatcher._dead_letter(self.endpoint, batch, error, attempt)
+
+    def run(self):
+        dispatcher = self.dispatcher
+        while True:
+            if self.overflow:
+                dropped = []
+                while self.overflow:
+                    dropped.append(self.overflow.popleft())
+                dispatcher._dead_letter(self.endpoint, dropped, "queue full", 0)
+            batch = self.next_batch()
+            if batch:
+                self.deliver(batch)
+            elif dispatcher._stopping.is_set() and self.queue.empty() and not self.overflow:
+                return
+
+
+class WebhookDispatcher:
+    """Forwards bus events to webhook endpoints in batches
+
+    The bus handler only filters and enqueues. Delivery, retries and
+    dead-lettering happen on one sender thread per endpoint; close() flushes
+    what is queued within a deadline.
+    """
+
+    def __init__(self, db, endpoints: List[Endpoint], event_bus: Optional[EventBus] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS, backoff: float = DEFAULT_BACKOFF,
+                 post=post_batch):
+        self.db = db
+        self.bus = event_bus or default_bus
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.post = post
+        self.stats = {"delivered": 0, "dead_lettered": 0, "dropped": 0}
+        self._stats_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._senders = [_Sender(self, endpoint) for endpoint in endpoints]
+        self._subscriptions: List[Subscription] = []
+
+    def start(self) -> "WebhookDispatcher":
+        for sender in self._senders:
+            sender.thread.start()
+            self._subscriptions.append(self.bus.subscribe(
+                lambda event, sender=sender: sender.offer(event.to_dict()),
+                event_types=sender.endpoint.event_types))
+        return self
+
+    def close(self, timeout: float = 10.0):
+        """Stop accepting events and flush the queues (at most timeout seconds)"""
+        for subscription in self._subscriptions:
+            self.bus.unsubscribe(subscription)
+        self._subscriptions = []
+        self._stopping.set()
+        deadline = time.monotonic() + timeout
+        for sender in self._senders:
+            if sender.thread.is_alive():
+                sender.thread.join(max(deadline - time.monotonic(), 0))
+
+    def __enter__(self) -> "WebhookDispatcher":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _count(self, outcome: str, n: int):
+        with self._stats_lock:
+            self.stats[outcome] += n
+        metrics.inc("orchestrator_webhook_events_total", n, outcome=outcome)
+
+    def _dead_letter(self, endpoint: Endpoint, events: List[Dict], error: str, attempts: int):
+        try:
+            self.db.record_dead_letters(endpoint.url, events, error, attempts)
+        except Exception as e:
+            # Losing the database too: the events are still in the audit log
+            print(f"⚠️  Warning: could not dead-letter {len(events)} webhook events: {e}")
+        self._count("dead_lettered", len(events))